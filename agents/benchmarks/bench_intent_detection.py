@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the walrus agent's intent detection.
+
+Runs every message of a labeled corpus through the chat path's
+detect_intent_and_clarify and reports accuracy (overall and per category),
+which stage answered (rules, intent cache, offline classifier, LLM), p50/p90/p99
+latency, and LLM calls per 1k messages. By default the LLM is a local fake
+OpenAI-compatible server with configurable latency, so runs are offline,
+free and repeatable:
+
+    python bench_intent_detection.py
+    python bench_intent_detection.py --llm-latency-ms 1500 --passes 3 --json
+    python bench_intent_detection.py --concurrency 32   # bursts, exercising LLM batching
+    python bench_intent_detection.py --real-llm   # uses OPENAI_API_KEY
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+from fake_openai_server import FakeOpenAIServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS = os.path.join(BENCH_DIR, "intent_corpus_v1.jsonl")
+WALRUS_DIR = os.path.join(BENCH_DIR, "..", "walrus")
+
+
+def load_corpus(path: str) -> List[Dict[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _counters(detection) -> Dict[str, int]:
+    """Snapshot of the per-stage counters kept by intent_detection."""
+    local = detection.local_classifier.stats()["hits"] if detection.local_classifier is not None else 0
+    return {
+        "rules": sum(detection.intent_rules.rule_hits.values()),
+        "cache": detection.intent_cache.hits,
+        "local": local,
+        "llm": detection.intent_rules.llm_fallbacks,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    corpus = load_corpus(args.corpus)
+
+    server = None
+    if not args.real_llm:
+        server = FakeOpenAIServer({row["text"]: row["intent"] for row in corpus},
+                                  args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate, args.seed)
+        os.environ["OPENAI_BASE_URL"] = await server.start()
+        os.environ["OPENAI_API_KEY"] = "fake-key"
+    # Start from an empty, in-memory intent cache
+    os.environ["WALRUS_INTENT_CACHE_PATH"] = ""
+
+    sys.path.insert(0, WALRUS_DIR)
+    import intent_detection
+
+    latencies: List[float] = []
+    correct_by_category: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    clarifications = 0
+
+    async def classify(row: Dict[str, str]) -> None:
+        nonlocal clarifications
+        started = time.perf_counter()
+        result, clarification = await intent_detection.detect_intent_and_clarify(row["text"])
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        clarifications += clarification is not None
+        tally = correct_by_category[row.get("category", "all")]
+        tally[0] += result.get("intent") == row["intent"]
+        tally[1] += 1
+
+    # Messages are sent in bursts of `concurrency`, each burst waiting for the previous one
+    rows = corpus * args.passes
+    before = _counters(intent_detection)
+    try:
+        for start in range(0, len(rows), args.concurrency):
+            await asyncio.gather(*(classify(row) for row in rows[start:start + args.concurrency]))
+    finally:
+        await intent_detection.client.close()
+        if server is not None:
+            await server.stop()
+
+    after = _counters(intent_detection)
+    stages = Counter({stage: after[stage] - before[stage] for stage in after})
+    messages = len(latencies)
+    correct = sum(tally[0] for tally in correct_by_category.values())
+    report: Dict[str, Any] = {
+        "corpus": os.path.basename(args.corpus),
+        "messages": messages,
+        "accuracy": correct / messages,
+        "accuracy_by_category": {
+            category: tally[0] / tally[1] for category, tally in sorted(correct_by_category.items())
+        },
+        "stage_ratio": {stage: stages[stage] / messages for stage in ("rules", "cache", "local", "llm")},
+        "clarifications": clarifications,
+        "latency_ms": {
+            "mean": statistics.mean(latencies),
+            "p50": _percentile(latencies, 0.50),
+            "p90": _percentile(latencies, 0.90),
+            "p99": _percentile(latencies, 0.99),
+        },
+        "speculation": intent_detection.speculation.stats(),
+    }
+    if server is not None:
+        llm_calls = server.classification_calls + server.clarification_calls
+        report["llm_calls_per_1k"] = llm_calls * 1000 / messages
+        report["llm_classification_calls"] = server.classification_calls
+        report["llm_classified_messages"] = server.classified_messages
+        report["llm_clarification_calls"] = server.clarification_calls
+        report["llm_tokens"] = server.tokens
+    else:
+        report["llm_classification_calls_per_1k"] = stages["llm"] * 1000 / messages
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"Intent detection benchmark: {report['corpus']}, {report['messages']} messages")
+    print(f"  accuracy:        {report['accuracy']:.1%}")
+    for category, accuracy in report["accuracy_by_category"].items():
+        print(f"    {category:<13} {accuracy:.1%}")
+    ratios = report["stage_ratio"]
+    print(f"  answered by:     rules {ratios['rules']:.1%}, cache {ratios['cache']:.1%}, "
+          f"local model {ratios['local']:.1%}, LLM {ratios['llm']:.1%}")
+    latency = report["latency_ms"]
+    print(f"  latency (ms):    mean {latency['mean']:.2f}, p50 {latency['p50']:.2f}, "
+          f"p90 {latency['p90']:.2f}, p99 {latency['p99']:.2f}")
+    if "llm_calls_per_1k" in report:
+        print(f"  LLM calls / 1k:  {report['llm_calls_per_1k']:.0f} "
+              f"({report['llm_classification_calls']} classification for {report['llm_classified_messages']} messages, "
+              f"{report['llm_clarification_calls']} clarification, {report['llm_tokens']} tokens)")
+    else:
+        print(f"  LLM classifications / 1k: {report['llm_classification_calls_per_1k']:.0f}")
+    print(f"  clarifications:  {report['clarifications']}, speculation {report['speculation']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSON-lines corpus of {text, intent, category}")
+    parser.add_argument("--concurrency", type=int, default=1, help="messages classified at the same time")
+    parser.add_argument("--passes", type=int, default=1, help="run the corpus this many times (later passes hit the cache)")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="mean latency of the fake LLM")
+    parser.add_argument("--llm-jitter-ms", type=float, default=200.0, help="standard deviation of the fake LLM latency")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="share of fake LLM classifications that are wrong")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--real-llm", action="store_true", help="call the real OpenAI API instead of the fake server")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Local stand-in for the OpenAI chat completions API, for benchmarking the
+walrus agent's intent detection without network access or API spend.
+
+Classification requests, single or batched, are answered from a label map
+(the benchmark corpus), so the fake behaves like an LLM that is always right,
+unless an error rate is set. Clarification requests get a canned reply. Every
+response waits for a configurable latency and reports token usage like the
+real API.
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Dict, Optional
+
+from aiohttp import web
+
+INTENTS = ("upload_file", "upload_text", "download_blob", "list_blobs", "help", "unknown")
+
+_ANALYZE_RE = re.compile(r"^Analyze this message: '(.*)'$", re.DOTALL)
+_ANALYZE_BATCH_RE = re.compile(r"^Analyze these messages: (\[.*\])$", re.DOTALL)
+
+
+class FakeOpenAIServer:
+    """Serves POST /v1/chat/completions on localhost."""
+
+    def __init__(self, labels: Dict[str, str], latency_ms: float = 800.0, jitter_ms: float = 200.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.labels = labels
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.classification_calls = 0
+        self.classified_messages = 0
+        self.clarification_calls = 0
+        self.tokens = 0
+        self._random = random.Random(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL to hand to the OpenAI client."""
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{bound_port}/v1"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _classify(self, message: str) -> Dict[str, object]:
+        intent = self.labels.get(message, "unknown")
+        if self.error_rate and self._random.random() < self.error_rate:
+            intent = self._random.choice([other for other in INTENTS if other != intent])
+        confidence = 0.3 if intent == "unknown" else 0.9
+        return {
+            "intent": intent,
+            "confidence": confidence,
+            "extracted_data": {"blob_id": None, "url": None, "description": None},
+        }
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+
+        match = _ANALYZE_RE.match(prompt)
+        batch_match = _ANALYZE_BATCH_RE.match(prompt)
+        if match:
+            self.classification_calls += 1
+            self.classified_messages += 1
+            content = json.dumps(self._classify(match.group(1)))
+        elif batch_match:
+            messages = json.loads(batch_match.group(1))
+            self.classification_calls += 1
+            self.classified_messages += len(messages)
+            content = json.dumps({"results": [self._classify(message) for message in messages]})
+        else:
+            self.clarification_calls += 1
+            content = "🤔 Could you tell me whether you want to upload, download or list blobs?"
+
+        delay = max(0.0, self._random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+
+        prompt_tokens = sum(len(m["content"].split()) for m in body["messages"])
+        completion_tokens = len(content.split())
+        self.tokens += prompt_tokens + completion_tokens
+        return web.json_response({
+            "id": f"chatcmpl-fake-{self.classification_calls + self.clarification_calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
@@ -165,6 +165,45 @@ async def test_walrus_agent():
     else:
         print(f"⏭️ Skipping binary upload test - test file not found: {test_file_path}")
     
+    # Test 5: Batch upload and batch download
+    print("\n5️⃣ Testing batch upload and download...")
+    batch_payload = {
+        "items": [{"text": f"Batch test item {i}"} for i in range(5)]
+    }
+    
+    try:
+        response = requests.post(
+            "http://localhost:8001/upload-batch",
+            json=batch_payload,
+            headers={"Content-Type": "application/json"},
+            timeout=60
+        )
+        
+        if response.status_code == 200:
+            result = response.json()
+            print(f"✅ Batch upload: {result['succeeded']} succeeded, {result['failed']} failed")
+            blob_ids = [item["blob_id"] for item in result["results"] if item["success"]]
+            
+            response = requests.post(
+                "http://localhost:8001/download-batch",
+                json={"blob_ids": blob_ids, "request_id": "test-batch-download-123"},
+                headers={"Content-Type": "application/json"},
+                timeout=60
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                print(f"✅ Batch download: {result['succeeded']} succeeded, {result['failed']} failed")
+            else:
+                print(f"❌ Batch download request failed: {response.status_code}")
+                print(f"📄 Response: {response.text}")
+        else:
+            print(f"❌ Batch upload request failed: {response.status_code}")
+            print(f"📄 Response: {response.text}")
+            
+    except Exception as e:
+        print(f"❌ Batch test failed: {e}")
+    
     print("\n🎉 Walrus Agent REST endpoint tests completed!")
 
 if __name__ == "__main__":
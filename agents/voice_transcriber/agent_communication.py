@@ -38,15 +38,16 @@ async def handle_transcription_request(ctx: Context, sender: str, msg: AudioTran
             "contents": msg.audio_data_base64  # Already base64 encoded
         }]
         
-        transcript = get_audio_transcription(content)
+        result = get_audio_transcription(content)
         
         # Clean up temporary file
         os.remove(tmp.name)
         
-        # Send success response
+        # Send response
         response = AudioTranscriptionResponse(
-            transcript=transcript,
-            success=True,
+            transcript=result.transcript,
+            success=result.success,
+            error_message=None if result.success else result.error,
             source_blob_id=msg.source_blob_id
         )
         
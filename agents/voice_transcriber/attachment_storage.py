@@ -0,0 +1,51 @@
+"""
+Retrieval of chat attachments from Agentverse external storage.
+
+One ExternalStorage client is kept per agent identity instead of building a
+new one for every attachment. Its downloads are blocking HTTP calls, so they
+run in worker threads, a bounded number at a time, and all attachments of a
+message are fetched concurrently.
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, List, Union
+
+from uagents_core.storage import ExternalStorage
+
+STORAGE_URL = os.getenv("AGENTVERSE_URL", "https://agentverse.ai") + "/v1/storage"
+
+# Attachments downloaded in parallel, across all messages being handled
+ATTACHMENT_DOWNLOAD_CONCURRENCY = int(os.getenv("ATTACHMENT_DOWNLOAD_CONCURRENCY", "4"))
+
+
+class AttachmentStore:
+    """Shared ExternalStorage clients with bounded, off-loop concurrent downloads."""
+
+    def __init__(self, storage_url: str = STORAGE_URL, max_concurrency: int = ATTACHMENT_DOWNLOAD_CONCURRENCY):
+        self.storage_url = storage_url
+        self._clients: Dict[str, ExternalStorage] = {}
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    def _client(self, identity) -> ExternalStorage:
+        client = self._clients.get(identity.address)
+        if client is None:
+            client = ExternalStorage(identity=identity, storage_url=self.storage_url)
+            self._clients[identity.address] = client
+        return client
+
+    async def download(self, identity, resource_id: str) -> Dict[str, Any]:
+        """Download one attachment; returns the storage payload with "mime_type" and base64 "contents"."""
+        client = self._client(identity)
+        async with self._semaphore:
+            return await asyncio.to_thread(client.download, resource_id)
+
+    async def download_all(self, identity, resource_ids: List[str]) -> List[Union[Dict[str, Any], Exception]]:
+        """Download attachments concurrently; results (or the exception raised) keep the input order."""
+        return list(await asyncio.gather(
+            *(self.download(identity, resource_id) for resource_id in resource_ids),
+            return_exceptions=True,
+        ))
+
+
+attachment_store = AttachmentStore()
@@ -10,11 +10,14 @@ pip install openai requests python-dotenv
 import base64
 import os
 import tempfile
+import time
 from typing import Any, List, Dict
 import requests
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from results import TranscriptionResult
+
 load_dotenv()                               # ← reads ../.env into env vars
 client = OpenAI()                                    # uses OPENAI_API_KEY
 
@@ -40,14 +43,15 @@ def _transcribe_file(path: str) -> str:
     return resp.text if hasattr(resp, "text") else resp
 
 
-def get_audio_transcription(content: List[Dict[str, Any]]) -> str:
+def get_audio_transcription(content: List[Dict[str, Any]]) -> TranscriptionResult:
     """
-    Accepts ChatMessage `content` list and returns the combined transcript.
+    Accepts ChatMessage `content` list and returns the transcripts of every audio input.
     Supports:
       • {"type": "resource", "mime_type": "audio/…", "contents": <base64>}
       • {"type": "text", "text": "https://example.com/file.mp3"}
     """
-    transcripts = []
+    started = time.perf_counter()
+    result = TranscriptionResult()
 
     for item in content:
         if item.get("type") == "resource" and item.get("mime_type", "").startswith("audio/"):
@@ -61,7 +65,7 @@ def get_audio_transcription(content: List[Dict[str, Any]]) -> str:
                 ext = "." + mime_type.split("/")[-1]
             
             path = _save_to_temp(audio_bytes, ext)
-            transcripts.append(_transcribe_file(path))
+            result.transcripts.append(_transcribe_file(path))
             os.remove(path)
 
         # ── URL pasted as plain text ─────────────────────────────────────────────
@@ -84,11 +88,12 @@ def get_audio_transcription(content: List[Dict[str, Any]]) -> str:
                             suffix = '.webm'
                         path   = _save_to_temp(r.content, suffix)
                 except requests.exceptions.RequestException as exc:
-                    transcripts.append(f"❌ Could not download audio → {exc}")
+                    result.errors.append(f"Could not download audio → {exc}")
                     continue
 
-                transcripts.append(_transcribe_file(path))
+                result.transcripts.append(_transcribe_file(path))
                 os.remove(path)
 
 
-    return "\n".join(transcripts) if transcripts else "No valid audio found."
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    return result
@@ -7,7 +7,6 @@ Same flow as your image agent:
   • call get_audio_transcription
 """
 
-import os
 from datetime import datetime
 from uuid import uuid4
 
@@ -21,12 +20,10 @@ from uagents_core.contrib.protocols.chat import (
     TextContent,
     chat_protocol_spec,
 )
-from uagents_core.storage import ExternalStorage
 
+from attachment_storage import attachment_store
 from audio_analysis import get_audio_transcription
 
-STORAGE_URL = os.getenv("AGENTVERSE_URL", "https://agentverse.ai") + "/v1/storage"
-
 
 def _chat(text: str) -> ChatMessage:
     return ChatMessage(
@@ -54,6 +51,8 @@ async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
                                               acknowledged_msg_id=msg.msg_id))
 
     prompt_content = []
+    # Positions in prompt_content waiting for an attachment, and the attachment IDs
+    resource_slots, resource_ids = [], []
 
     for item in msg.content:
         if isinstance(item, StartSessionContent):
@@ -64,22 +63,27 @@ async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
             prompt_content.append({"type": "text", "text": item.text})
 
         elif isinstance(item, ResourceContent):
-            try:
-                storage = ExternalStorage(identity=ctx.agent.identity,
-                                          storage_url=STORAGE_URL)
-                data = storage.download(str(item.resource_id))
-                prompt_content.append({
-                    "type": "resource",
-                    "mime_type": data["mime_type"],
-                    "contents": data["contents"],
-                })
-            except Exception as exc:
-                ctx.logger.error(f"download error: {exc}")
-                await ctx.send(sender, _chat("Failed to download the attachment."))
+            resource_slots.append(len(prompt_content))
+            resource_ids.append(str(item.resource_id))
+            prompt_content.append(None)
+
+    # Download all attachments concurrently and put each one back in its place
+    downloads = await attachment_store.download_all(ctx.agent.identity, resource_ids)
+    for slot, data in zip(resource_slots, downloads):
+        if isinstance(data, Exception):
+            ctx.logger.error(f"download error: {data}")
+            await ctx.send(sender, _chat("Failed to download the attachment."))
+            continue
+        prompt_content[slot] = {
+            "type": "resource",
+            "mime_type": data["mime_type"],
+            "contents": data["contents"],
+        }
+    prompt_content = [item for item in prompt_content if item is not None]
 
     if prompt_content:
-        transcript = get_audio_transcription(prompt_content)
-        await ctx.send(sender, _chat(transcript))
+        result = get_audio_transcription(prompt_content)
+        await ctx.send(sender, _chat(result.to_markdown()))
 
 
 @chat_proto.on_message(ChatAcknowledgement)
@@ -41,12 +41,13 @@ async def handle_transcription_rest(ctx, req: AudioTranscriptionRequest) -> Audi
         }]
         
         # Transcribe the audio
-        transcript = get_audio_transcription(content)
+        result = get_audio_transcription(content)
         
-        # Return success response
+        # Return response
         return AudioTranscriptionResponse(
-            transcript=transcript,
-            success=True,
+            transcript=result.transcript,
+            success=result.success,
+            error_message=None if result.success else result.error,
             source_blob_id=req.source_blob_id
         )
         
@@ -0,0 +1,32 @@
+"""
+Typed results returned by the audio analysis.
+
+Callers read fields directly; markdown is rendered only when replying over chat.
+"""
+
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class TranscriptionResult:
+    """Combined transcript of every audio input in a message."""
+    transcripts: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return bool(self.transcripts)
+
+    @property
+    def transcript(self) -> str:
+        return "\n".join(self.transcripts)
+
+    @property
+    def error(self) -> str:
+        return "\n".join(self.errors) if self.errors else "No valid audio found."
+
+    def to_markdown(self) -> str:
+        lines = self.transcripts + [f"❌ {error}" for error in self.errors]
+        return "\n".join(lines) if lines else "No valid audio found."
@@ -28,6 +28,14 @@ class BlobDownloadRequest(Model):
     request_id: str
 
 
+class BlobRangeRequest(Model):
+    """Request model for downloading a byte range of a blob; `length` None reads to the end."""
+    blob_id: str
+    request_id: str
+    offset: int = 0
+    length: Optional[int] = None
+
+
 class BlobDownloadResponse(Model):
     """Response model for blob download."""
     blob_data_base64: str  # Base64 encoded blob data
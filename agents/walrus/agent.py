@@ -5,11 +5,16 @@ Walrus Blob Storage uAgent entrypoint.
 from uagents import Agent
 from chat_proto import chat_proto
 from agent_communication import agent_comm_proto
+from walrus_operations import HEALTH_PROBE_INTERVAL
 from shared_models import (
     BlobUploadRequest, BlobUploadResponse,
     BlobUploadFromUrlRequest, BlobUploadFromUrlResponse,
     TextUploadRequest, TextUploadResponse,
-    BlobDownloadRequest, BlobDownloadResponse
+    BlobDownloadRequest, BlobDownloadResponse, BlobRangeRequest,
+    BlobMetadataRequest, BlobMetadataResponse,
+    BatchUploadRequest, BatchUploadResult, BatchUploadResponse,
+    BatchDownloadRequest, BatchDownloadResponse,
+    IntentStatsResponse, BlobCacheStatsResponse, EndpointStatsResponse
 )
 
 # Configure agent for mailbox mode
@@ -28,6 +33,37 @@ agent.include(chat_proto, publish_manifest=True)
 # Include agent communication protocol
 agent.include(agent_comm_proto)
 
+
+@agent.on_interval(period=HEALTH_PROBE_INTERVAL)
+async def probe_walrus_endpoints(ctx):
+    """Refresh latency and health of the configured publishers and aggregators."""
+    from walrus_operations import client
+    await client.probe_endpoints()
+
+
+@agent.on_event("startup")
+async def start_binary_api(ctx):
+    """Serve the raw octet-stream upload/download API next to the JSON endpoints."""
+    import binary_api
+    await binary_api.start()
+
+
+@agent.on_event("shutdown")
+async def close_walrus_client(ctx):
+    """
+    Stop the binary API, store any pending packed texts and cached intents and
+    close the pooled Walrus and OpenAI HTTP sessions.
+    """
+    import binary_api
+    from intent_detection import client as openai_client, intent_cache
+    from walrus_operations import client, text_packer
+    await binary_api.stop()
+    if text_packer is not None:
+        await text_packer.flush()
+    await intent_cache.flush()
+    await client.close()
+    await openai_client.close()
+
 # Add REST endpoints for direct testing
 
 @agent.on_rest_post("/upload", BlobUploadRequest, BlobUploadResponse)
@@ -43,32 +79,13 @@ async def handle_upload_rest(ctx, req: BlobUploadRequest) -> BlobUploadResponse:
         data = base64.b64decode(req.data_base64)
         
         # Upload to walrus
-        result = _upload_resource(data, req.mime_type)
-        
-        # Parse the result to extract blob_id and url
-        if "✅ File uploaded successfully!" in result:
-            # Extract blob_id and url from the result string
-            lines = result.split('\n')
-            blob_id = None
-            blob_url = None
-            for line in lines:
-                if line.startswith("Blob ID: "):
-                    blob_id = line.replace("Blob ID: ", "").strip()
-                elif line.startswith("View at: "):
-                    blob_url = line.replace("View at: ", "").strip()
-            
-            if blob_id and blob_url:
-                return BlobUploadResponse(
-                    blob_id=blob_id,
-                    blob_url=blob_url,
-                    success=True
-                )
+        result = await _upload_resource(data, req.mime_type, description=req.description)
         
         return BlobUploadResponse(
-            blob_id="",
-            blob_url="",
-            success=False,
-            error_message=result
+            blob_id=result.blob_id,
+            blob_url=result.blob_url,
+            success=result.success,
+            error_message=result.error
         )
         
     except Exception as exc:
@@ -90,31 +107,13 @@ async def handle_upload_url_rest(ctx, req: BlobUploadFromUrlRequest) -> BlobUplo
         from walrus_operations import _upload_file_from_url
         
         # Upload from URL
-        result = _upload_file_from_url(req.url)
-        
-        # Parse the result to extract blob_id and url
-        if "✅ File uploaded successfully!" in result:
-            lines = result.split('\n')
-            blob_id = None
-            blob_url = None
-            for line in lines:
-                if line.startswith("Blob ID: "):
-                    blob_id = line.replace("Blob ID: ", "").strip()
-                elif line.startswith("View at: "):
-                    blob_url = line.replace("View at: ", "").strip()
-            
-            if blob_id and blob_url:
-                return BlobUploadFromUrlResponse(
-                    blob_id=blob_id,
-                    blob_url=blob_url,
-                    success=True
-                )
+        result = await _upload_file_from_url(req.url, description=req.description)
         
         return BlobUploadFromUrlResponse(
-            blob_id="",
-            blob_url="",
-            success=False,
-            error_message=result
+            blob_id=result.blob_id,
+            blob_url=result.blob_url,
+            success=result.success,
+            error_message=result.error
         )
         
     except Exception as exc:
@@ -133,18 +132,16 @@ async def handle_upload_text_rest(ctx, req: TextUploadRequest) -> TextUploadResp
     ctx.logger.info(f"Received REST text upload request")
     
     try:
-        from walrus_operations import client
+        from walrus_operations import _upload_text
         
-        # Upload text as blob
-        blob_data = req.text.encode('utf-8')
-        response = client.put_blob(data=blob_data)
-        blob_id = response['newlyCreated']['blobObject']['blobId']
-        blob_url = f"https://walruscan.com/testnet/blob/{blob_id}"
+        # Upload text as blob (identical text is served from the dedup index)
+        result = await _upload_text(req.text, description=req.description)
         
         return TextUploadResponse(
-            blob_id=blob_id,
-            blob_url=blob_url,
-            success=True
+            blob_id=result.blob_id,
+            blob_url=result.blob_url,
+            success=result.success,
+            error_message=result.error
         )
         
     except Exception as exc:
@@ -167,7 +164,7 @@ async def handle_download_rest(ctx, req: BlobDownloadRequest) -> BlobDownloadRes
         from walrus_operations import _download_blob_data
         
         # Download blob data
-        blob_data, mime_type = _download_blob_data(req.blob_id)
+        blob_data, mime_type = await _download_blob_data(req.blob_id)
         
         # Encode as base64
         blob_data_base64 = base64.b64encode(blob_data).decode('utf-8')
@@ -191,6 +188,180 @@ async def handle_download_rest(ctx, req: BlobDownloadRequest) -> BlobDownloadRes
             error_message=str(exc)
         )
 
+
+@agent.on_rest_post("/download-range", BlobRangeRequest, BlobDownloadResponse)
+async def handle_download_range_rest(ctx, req: BlobRangeRequest) -> BlobDownloadResponse:
+    """REST endpoint for downloading a byte range of a blob."""
+    ctx.logger.info(f"Received REST range request for blob {req.blob_id} (offset {req.offset}, length {req.length})")
+    
+    try:
+        import base64
+        from walrus_operations import _download_blob_data
+        
+        blob_data, mime_type = await _download_blob_data(req.blob_id, req.offset, req.length)
+        return BlobDownloadResponse(
+            blob_data_base64=base64.b64encode(blob_data).decode('utf-8'),
+            mime_type=mime_type,
+            blob_id=req.blob_id,
+            request_id=req.request_id,
+            success=True
+        )
+        
+    except Exception as exc:
+        ctx.logger.error(f"Range download failed for blob {req.blob_id}: {exc}")
+        return BlobDownloadResponse(
+            blob_data_base64="",
+            mime_type="",
+            blob_id=req.blob_id,
+            request_id=req.request_id,
+            success=False,
+            error_message=str(exc)
+        )
+
+
+@agent.on_rest_post("/metadata", BlobMetadataRequest, BlobMetadataResponse)
+async def handle_metadata_rest(ctx, req: BlobMetadataRequest) -> BlobMetadataResponse:
+    """REST endpoint for a blob's size and MIME type, without transferring its body."""
+    ctx.logger.info(f"Received REST metadata request for blob {req.blob_id}")
+    
+    from walrus_operations import _get_blob_metadata
+    
+    metadata = await _get_blob_metadata(req.blob_id)
+    return BlobMetadataResponse(
+        blob_id=req.blob_id,
+        size=metadata.size,
+        mime_type=metadata.mime_type,
+        chunked=metadata.chunked,
+        encoding=metadata.encoding,
+        success=metadata.success,
+        error_message=metadata.error
+    )
+
+
+@agent.on_rest_get("/intent-stats", IntentStatsResponse)
+async def handle_intent_stats_rest(ctx) -> IntentStatsResponse:
+    """
+    REST endpoint for how many messages were classified by rule, from the
+    cache, by the offline classifier or by the LLM.
+    """
+    from intent_detection import intent_cache, intent_rules, llm_batcher, local_classifier, speculation
+    cache = intent_cache.stats()
+    local = local_classifier.stats() if local_classifier is not None else {"hits": 0, "abstentions": 0}
+    return IntentStatsResponse(**intent_rules.stats(), cache_hits=cache["hits"], cache_misses=cache["misses"],
+                               cache_hit_rate=cache["hit_rate"], local_model_hits=local["hits"],
+                               local_model_abstentions=local["abstentions"],
+                               speculative_clarifications=speculation.stats(),
+                               llm_batches=llm_batcher.batches if llm_batcher is not None else 0,
+                               llm_batched_messages=llm_batcher.messages if llm_batcher is not None else 0)
+
+
+@agent.on_rest_get("/cache-stats", BlobCacheStatsResponse)
+async def handle_cache_stats_rest(ctx) -> BlobCacheStatsResponse:
+    """REST endpoint for how often downloads were served from the local blob cache."""
+    from walrus_operations import blob_cache
+    return BlobCacheStatsResponse(**blob_cache.stats())
+
+
+@agent.on_rest_get("/endpoint-stats", EndpointStatsResponse)
+async def handle_endpoint_stats_rest(ctx) -> EndpointStatsResponse:
+    """REST endpoint for the latency and health of each publisher and aggregator, and hedged reads."""
+    from walrus_operations import client
+    return EndpointStatsResponse(**client.stats())
+
+
+@agent.on_rest_post("/upload-batch", BatchUploadRequest, BatchUploadResponse)
+async def handle_upload_batch_rest(ctx, req: BatchUploadRequest) -> BatchUploadResponse:
+    """REST endpoint for uploading many files, URLs and texts in one call."""
+    ctx.logger.info(f"Received REST batch upload request with {len(req.items)} items")
+    
+    import base64
+    from results import UploadResult
+    from walrus_operations import (
+        BATCH_CONCURRENCY, BATCH_MAX_ITEMS, _gather_bounded,
+        _upload_file_from_url, _upload_resource, _upload_text
+    )
+    
+    if len(req.items) > BATCH_MAX_ITEMS:
+        error = f"Batch has {len(req.items)} items, the maximum is {BATCH_MAX_ITEMS}"
+        results = [BatchUploadResult(index=i, blob_id="", blob_url="", success=False, error_message=error)
+                   for i in range(len(req.items))]
+        return BatchUploadResponse(results=results, succeeded=0, failed=len(results))
+    
+    async def upload_item(item) -> UploadResult:
+        try:
+            if item.data_base64 is not None:
+                return await _upload_resource(base64.b64decode(item.data_base64),
+                                              item.mime_type or "application/octet-stream",
+                                              description=item.description)
+            if item.url is not None:
+                return await _upload_file_from_url(item.url, description=item.description)
+            if item.text is not None:
+                return await _upload_text(item.text, description=item.description)
+            return UploadResult(success=False, error="Item needs one of data_base64, url or text")
+        except Exception as exc:
+            return UploadResult(success=False, error=str(exc))
+    
+    # Items run concurrently; results keep the request order
+    uploads = await _gather_bounded([upload_item(item) for item in req.items], BATCH_CONCURRENCY)
+    
+    results = [
+        BatchUploadResult(
+            index=i,
+            blob_id=result.blob_id,
+            blob_url=result.blob_url,
+            success=result.success,
+            deduplicated=result.deduplicated,
+            error_message=result.error
+        )
+        for i, result in enumerate(uploads)
+    ]
+    succeeded = sum(1 for result in results if result.success)
+    return BatchUploadResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+@agent.on_rest_post("/download-batch", BatchDownloadRequest, BatchDownloadResponse)
+async def handle_download_batch_rest(ctx, req: BatchDownloadRequest) -> BatchDownloadResponse:
+    """REST endpoint for downloading many blobs in one call."""
+    ctx.logger.info(f"Received REST batch download request for {len(req.blob_ids)} blobs")
+    
+    import base64
+    from walrus_operations import BATCH_CONCURRENCY, BATCH_MAX_ITEMS, _download_blob_data, _gather_bounded
+    
+    if len(req.blob_ids) > BATCH_MAX_ITEMS:
+        error = f"Batch has {len(req.blob_ids)} blob IDs, the maximum is {BATCH_MAX_ITEMS}"
+        results = [BlobDownloadResponse(blob_data_base64="", mime_type="", blob_id=blob_id,
+                                        request_id=req.request_id, success=False, error_message=error)
+                   for blob_id in req.blob_ids]
+        return BatchDownloadResponse(results=results, request_id=req.request_id,
+                                     succeeded=0, failed=len(results))
+    
+    async def download_item(blob_id: str) -> BlobDownloadResponse:
+        try:
+            blob_data, mime_type = await _download_blob_data(blob_id)
+            return BlobDownloadResponse(
+                blob_data_base64=base64.b64encode(blob_data).decode('utf-8'),
+                mime_type=mime_type,
+                blob_id=blob_id,
+                request_id=req.request_id,
+                success=True
+            )
+        except Exception as exc:
+            return BlobDownloadResponse(
+                blob_data_base64="",
+                mime_type="",
+                blob_id=blob_id,
+                request_id=req.request_id,
+                success=False,
+                error_message=str(exc)
+            )
+    
+    # Blobs download concurrently; results keep the request order
+    results = await _gather_bounded([download_item(blob_id) for blob_id in req.blob_ids], BATCH_CONCURRENCY)
+    
+    succeeded = sum(1 for result in results if result.success)
+    return BatchDownloadResponse(results=results, request_id=req.request_id,
+                                 succeeded=succeeded, failed=len(results) - succeeded)
+
 # Copy the address shown below
 print(f"Your agent's address is: {agent.address}")
 
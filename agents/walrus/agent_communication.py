@@ -3,11 +3,15 @@ Agent-to-agent communication protocol for the Walrus Agent.
 """
 
 import os
-import requests
+import time
+import aiohttp
+from typing import Optional
 from uagents import Context, Protocol
-from walrus_operations import _download_blob_data
+from walrus_operations import _download_blob_data, _open_blob_stream, client
+from mime_sniffer import is_audio_mime
+from results import TranscriptionResult
 
-from shared_models import BlobDownloadRequest, BlobDownloadResponse, AudioTranscriptionRequest, AudioTranscriptionResponse, BlobTranscriptionRequest, BlobTranscriptionResponse
+from shared_models import BlobDownloadRequest, BlobDownloadResponse, BlobRangeRequest, AudioTranscriptionRequest, AudioTranscriptionResponse, BlobTranscriptionRequest, BlobTranscriptionResponse
 
 # Import config to get the agent address
 try:
@@ -27,14 +31,12 @@ def is_localhost_address(address: str) -> bool:
     return address.startswith(("http://localhost", "http://127.0.0.1")) or "localhost" in address
 
 
-@agent_comm_proto.on_message(model=BlobDownloadRequest)
-async def handle_blob_download_request(ctx: Context, sender: str, msg: BlobDownloadRequest):
-    """Handle blob download requests from other agents."""
-    ctx.logger.info(f"Received blob download request from {sender} for blob {msg.blob_id}")
-    
+async def _send_blob(ctx: Context, sender: str, blob_id: str, request_id: str,
+                     offset: int = 0, length: Optional[int] = None):
+    """Download a blob, or a byte range of it, and send it back as a BlobDownloadResponse."""
     try:
         # Download the blob data
-        blob_data, mime_type = _download_blob_data(msg.blob_id)
+        blob_data, mime_type = await _download_blob_data(blob_id, offset, length)
         
         # Encode blob data as base64
         import base64
@@ -44,23 +46,23 @@ async def handle_blob_download_request(ctx: Context, sender: str, msg: BlobDownl
         response = BlobDownloadResponse(
             blob_data_base64=blob_data_base64,
             mime_type=mime_type,
-            blob_id=msg.blob_id,
-            request_id=msg.request_id,
+            blob_id=blob_id,
+            request_id=request_id,
             success=True
         )
         
         await ctx.send(sender, response)
-        ctx.logger.info(f"Blob download completed for {msg.blob_id}")
+        ctx.logger.info(f"Blob download completed for {blob_id}")
         
     except Exception as exc:
-        ctx.logger.error(f"Blob download failed for {msg.blob_id}: {exc}")
+        ctx.logger.error(f"Blob download failed for {blob_id}: {exc}")
         
         # Send error response
         response = BlobDownloadResponse(
             blob_data_base64="",
             mime_type="",
-            blob_id=msg.blob_id,
-            request_id=msg.request_id,
+            blob_id=blob_id,
+            request_id=request_id,
             success=False,
             error_message=str(exc)
         )
@@ -68,56 +70,57 @@ async def handle_blob_download_request(ctx: Context, sender: str, msg: BlobDownl
         await ctx.send(sender, response)
 
 
+@agent_comm_proto.on_message(model=BlobDownloadRequest)
+async def handle_blob_download_request(ctx: Context, sender: str, msg: BlobDownloadRequest):
+    """Handle blob download requests from other agents."""
+    ctx.logger.info(f"Received blob download request from {sender} for blob {msg.blob_id}")
+    await _send_blob(ctx, sender, msg.blob_id, msg.request_id)
+
+
+@agent_comm_proto.on_message(model=BlobRangeRequest)
+async def handle_blob_range_request(ctx: Context, sender: str, msg: BlobRangeRequest):
+    """Handle requests from other agents for a byte range of a blob."""
+    ctx.logger.info(f"Received blob range request from {sender} for blob {msg.blob_id} "
+                    f"(offset {msg.offset}, length {msg.length})")
+    await _send_blob(ctx, sender, msg.blob_id, msg.request_id, msg.offset, msg.length)
+
+
 @agent_comm_proto.on_message(model=BlobTranscriptionRequest)
 async def handle_blob_transcription_request(ctx: Context, sender: str, msg: BlobTranscriptionRequest):
     """Handle blob transcription requests from other agents."""
     ctx.logger.info(f"Received blob transcription request from {sender} for blob {msg.blob_id}")
     
     try:
-        # Download the blob data
-        blob_data, mime_type = _download_blob_data(msg.blob_id)
-        
-        # Check if it's an audio file
-        if not mime_type.startswith('audio/'):
-            response = BlobTranscriptionResponse(
-                transcript="",
-                blob_id=msg.blob_id,
-                request_id=msg.request_id,
-                success=False,
-                error_message=f"Blob is not an audio file (mime_type: {mime_type})"
-            )
-            await ctx.send(sender, response)
-            return
+        # Open the blob and check its type from the first chunk only
+        async with _open_blob_stream(msg.blob_id) as stream:
+            mime_type = stream.mime_type
+            
+            # Check if it's an audio file before transferring the rest
+            if not is_audio_mime(mime_type):
+                response = BlobTranscriptionResponse(
+                    transcript="",
+                    blob_id=msg.blob_id,
+                    request_id=msg.request_id,
+                    success=False,
+                    error_message=f"Blob is not an audio file (mime_type: {mime_type})"
+                )
+                await ctx.send(sender, response)
+                return
+            
+            blob_data = await stream.read()
         
         # Request transcription from voice-to-text agent
         transcription_result = await request_audio_transcription(
             ctx, blob_data, mime_type, msg.blob_id, f"Transcription request for blob {msg.blob_id}"
         )
         
-        # Extract transcript from the result
-        if "Transcription Complete!" in transcription_result:
-            # Extract the transcript from the formatted result
-            lines = transcription_result.split('\n')
-            transcript = ""
-            for line in lines:
-                if line.strip() and not line.startswith('📝') and not line.startswith('**'):
-                    transcript = line.strip()
-                    break
-            
-            response = BlobTranscriptionResponse(
-                transcript=transcript,
-                blob_id=msg.blob_id,
-                request_id=msg.request_id,
-                success=True
-            )
-        else:
-            response = BlobTranscriptionResponse(
-                transcript="",
-                blob_id=msg.blob_id,
-                request_id=msg.request_id,
-                success=False,
-                error_message=transcription_result
-            )
+        response = BlobTranscriptionResponse(
+            transcript=transcription_result.transcript,
+            blob_id=msg.blob_id,
+            request_id=msg.request_id,
+            success=transcription_result.success,
+            error_message=transcription_result.error
+        )
         
         await ctx.send(sender, response)
         ctx.logger.info(f"Blob transcription completed for {msg.blob_id}")
@@ -148,17 +151,21 @@ async def handle_transcription_response(ctx: Context, sender: str, msg: AudioTra
         ctx.logger.error(f"Transcription failed: {msg.error_message}")
 
 
-async def request_audio_transcription(ctx: Context, audio_data: bytes, mime_type: str, blob_id: str, description: str = None):
+async def request_audio_transcription(ctx: Context, audio_data: bytes, mime_type: str, blob_id: str, description: str = None) -> TranscriptionResult:
     """Request audio transcription from the voice-to-text agent."""
+    started = time.perf_counter()
     
     # Check if we're using localhost (REST) or remote agent (agent-to-agent)
     if is_localhost_address(VOICE_TO_TEXT_AGENT_ADDRESS):
-        return await _request_transcription_via_rest(ctx, audio_data, mime_type, blob_id, description)
+        result = await _request_transcription_via_rest(ctx, audio_data, mime_type, blob_id, description)
     else:
-        return await _request_transcription_via_agent(ctx, audio_data, mime_type, blob_id, description)
+        result = await _request_transcription_via_agent(ctx, audio_data, mime_type, blob_id, description)
+    
+    result.elapsed_ms = (time.perf_counter() - started) * 1000
+    return result
 
 
-async def _request_transcription_via_rest(ctx: Context, audio_data: bytes, mime_type: str, blob_id: str, description: str = None):
+async def _request_transcription_via_rest(ctx: Context, audio_data: bytes, mime_type: str, blob_id: str, description: str = None) -> TranscriptionResult:
     """Request audio transcription via REST endpoint (for localhost)."""
     try:
         # Encode audio data as base64
@@ -175,58 +182,38 @@ async def _request_transcription_via_rest(ctx: Context, audio_data: bytes, mime_
         
         ctx.logger.info(f"Sending transcription request to voice-to-text agent REST endpoint for blob {blob_id}")
         
-        # Make HTTP POST request to the REST endpoint
-        response = requests.post(
+        # Make HTTP POST request to the REST endpoint over the pooled session
+        async with client.http_session().post(
             VOICE_TO_TEXT_AGENT_ADDRESS,
             json=request_payload,
             headers={"Content-Type": "application/json"},
-            timeout=60.0
-        )
+            timeout=aiohttp.ClientTimeout(total=60.0)
+        ) as response:
+            status_code = response.status
+            response_data = await response.json(content_type=None) if status_code == 200 else None
+            response_text = await response.text() if status_code != 200 else ""
         
-        if response.status_code == 200:
-            response_data = response.json()
-            
+        if status_code == 200:
             if response_data.get("success"):
-                transcript = response_data.get("transcript", "")
                 ctx.logger.info(f"Transcription completed for blob {blob_id}")
-                return f"""
-
-📝 **Transcription Complete!**
-
-{transcript}"""
+                return TranscriptionResult(success=True, transcript=response_data.get("transcript", ""))
             else:
                 error_message = response_data.get("error_message", "Unknown error")
                 ctx.logger.error(f"Transcription failed for blob {blob_id}: {error_message}")
-                return f"""
-
-❌ **Transcription Failed**
-
-Error: {error_message}"""
+                return TranscriptionResult(success=False, error=error_message)
         else:
-            ctx.logger.error(f"Transcription request failed with status {response.status_code}: {response.text}")
-            return f"""
-
-❌ **Transcription Request Failed**
-
-HTTP Status: {response.status_code}"""
+            ctx.logger.error(f"Transcription request failed with status {status_code}: {response_text}")
+            return TranscriptionResult(success=False, error=f"HTTP Status: {status_code}")
         
-    except requests.exceptions.ConnectionError:
+    except aiohttp.ClientConnectionError:
         ctx.logger.error(f"Connection failed to voice-to-text agent at {VOICE_TO_TEXT_AGENT_ADDRESS}")
-        return f"""
-
-❌ **Transcription Request Failed**
-
-Connection error - make sure voice-to-text agent is running"""
+        return TranscriptionResult(success=False, error="Connection error - make sure voice-to-text agent is running")
     except Exception as exc:
         ctx.logger.error(f"Failed to send transcription request: {exc}")
-        return f"""
-
-❌ **Transcription Request Failed**
+        return TranscriptionResult(success=False, error=str(exc))
 
-Error: {exc}"""
 
-
-async def _request_transcription_via_agent(ctx: Context, audio_data: bytes, mime_type: str, blob_id: str, description: str = None):
+async def _request_transcription_via_agent(ctx: Context, audio_data: bytes, mime_type: str, blob_id: str, description: str = None) -> TranscriptionResult:
     """Request audio transcription via agent-to-agent communication (for remote agents)."""
     try:
         # Encode audio data as base64
@@ -253,31 +240,15 @@ async def _request_transcription_via_agent(ctx: Context, audio_data: bytes, mime
         if isinstance(response, AudioTranscriptionResponse):
             if response.success:
                 ctx.logger.info(f"Transcription completed for blob {blob_id}")
-                return f"""
-
-📝 **Transcription Complete!**
-
-{response.transcript}"""
+                return TranscriptionResult(success=True, transcript=response.transcript)
             else:
                 error_message = response.error_message or "Unknown error"
                 ctx.logger.error(f"Transcription failed for blob {blob_id}: {error_message}")
-                return f"""
-
-❌ **Transcription Failed**
-
-Error: {error_message}"""
+                return TranscriptionResult(success=False, error=error_message)
         else:
             ctx.logger.error(f"Failed to receive response from voice-to-text agent: {status}")
-            return f"""
-
-❌ **Transcription Request Failed**
-
-Status: {status}"""
+            return TranscriptionResult(success=False, error=f"Status: {status}")
         
     except Exception as exc:
         ctx.logger.error(f"Failed to send transcription request to agent: {exc}")
-        return f"""
-
-❌ **Transcription Request Failed**
-
-Error: {exc}""" 
\ No newline at end of file
+        return TranscriptionResult(success=False, error=str(exc))
@@ -0,0 +1,305 @@
+"""
+Asyncio Walrus client with pooled keep-alive connections.
+
+Requirements
+------------
+pip install aiohttp
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Optional, Sequence, Tuple, Union
+
+import aiohttp
+
+from endpoint_pool import Endpoint, EndpointPool
+
+
+class WalrusRequestError(Exception):
+    """Raised when a publisher or aggregator request fails."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Whether another endpoint might succeed where this request failed."""
+    if isinstance(exc, WalrusRequestError) and exc.status is not None:
+        return exc.status >= 500 or exc.status in (408, 429)
+    return True
+
+
+class _StreamedBody:
+    """
+    Async iterable request body that records whether a request started reading it.
+
+    A streamed body can be sent only once, but a publisher that fails before
+    reading any of it (connection refused, DNS failure) leaves it untouched,
+    so the upload can still fail over to the next publisher.
+    """
+
+    def __init__(self, chunks: AsyncIterable[bytes]):
+        self._chunks = chunks
+        self.started = False
+
+    async def __aiter__(self):
+        self.started = True
+        async for chunk in self._chunks:
+            yield chunk
+
+
+def _discard_response(task: "asyncio.Task") -> None:
+    """Release the connection of a request that lost a hedge race."""
+    if not task.cancelled() and task.exception() is None:
+        task.result().release()
+
+
+class AsyncWalrusClient:
+    """
+    Client for the Walrus publisher/aggregator HTTP API built on one shared
+    aiohttp session, so connections are kept alive and reused across requests.
+
+    Publishers and aggregators are pools of endpoints: requests go to the
+    fastest healthy endpoint and fail over to the next one on connection
+    errors or 5xx responses. Blob reads are hedged: if no response headers
+    arrive within the aggregators' p95 latency, the same read is sent to a
+    second aggregator and whichever answers first wins.
+
+    Concurrent uploads and downloads are capped separately so a burst of large
+    transfers cannot exhaust the connection pool.
+    """
+
+    def __init__(
+        self,
+        publisher_urls: Sequence[str],
+        aggregator_urls: Sequence[str],
+        connect_timeout: float = 10,
+        read_timeout: float = 60,
+        max_connections: int = 32,
+        max_concurrent_uploads: int = 4,
+        max_concurrent_downloads: int = 8,
+        keepalive_timeout: float = 30,
+        hedged_reads: bool = True,
+        initial_hedge_delay: float = 2.0,
+        probe_timeout: float = 5,
+    ):
+        self.publishers = EndpointPool(publisher_urls, initial_hedge_delay=initial_hedge_delay)
+        self.aggregators = EndpointPool(aggregator_urls, initial_hedge_delay=initial_hedge_delay)
+        self.timeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=read_timeout)
+        self.hedged_reads = hedged_reads
+        self.probe_timeout = probe_timeout
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+        self._max_connections = max_connections
+        self._keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._upload_slots = asyncio.Semaphore(max_concurrent_uploads)
+        self._download_slots = asyncio.Semaphore(max_concurrent_downloads)
+
+    def http_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use inside the event loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self._max_connections,
+                keepalive_timeout=self._keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled session and its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @staticmethod
+    async def _raise_for_status(response: aiohttp.ClientResponse, context: str) -> None:
+        if response.status < 400:
+            return
+        try:
+            body = await response.json(content_type=None)
+            message = body.get("error", {}).get("message") or str(body)
+        except Exception:
+            message = response.reason or "UNKNOWN"
+        raise WalrusRequestError(f"{context}: HTTP {response.status} - {message}", response.status)
+
+    async def _send(self, pool: EndpointPool, endpoint: Endpoint, method: str, path: str,
+                    context: str, **kwargs: Any) -> aiohttp.ClientResponse:
+        """Send one request to an endpoint and return the response once its headers arrive."""
+        started = time.perf_counter()
+        try:
+            response = await self.http_session().request(method, f"{endpoint.url}{path}", **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            pool.record_failure(endpoint)
+            raise WalrusRequestError(f"{context}: {exc}") from exc
+
+        try:
+            await self._raise_for_status(response, context)
+        except WalrusRequestError as exc:
+            response.release()
+            if _is_retryable(exc):
+                pool.record_failure(endpoint)
+            raise
+
+        pool.record_success(endpoint, time.perf_counter() - started)
+        return response
+
+    async def put_blob(
+        self,
+        data: Union[bytes, AsyncIterable[bytes]],
+        epochs: Optional[int] = None,
+        deletable: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        Upload a blob to the publisher.
+
+        `data` may be bytes or an async iterable of chunks; the latter is sent
+        with chunked transfer encoding without being buffered. Bytes fail over
+        to the next publisher on any retryable error. A streamed body cannot
+        be replayed, so it fails over only while no publisher has started
+        reading it; a failure mid-body is raised to the caller.
+        """
+        params = {}
+        if epochs is not None:
+            params["epochs"] = str(epochs)
+        if deletable is not None:
+            params["deletable"] = "true" if deletable else "false"
+
+        body = data if isinstance(data, (bytes, bytearray, memoryview)) else _StreamedBody(data)
+
+        async with self._upload_slots:
+            last_error: Optional[WalrusRequestError] = None
+            for endpoint in self.publishers.candidates():
+                try:
+                    response = await self._send(
+                        self.publishers, endpoint, "PUT", "/v1/blobs", "Error uploading blob",
+                        data=body,
+                        params=params,
+                        headers={"Content-Type": "application/octet-stream"},
+                    )
+                    async with response:
+                        return await response.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                    last_error = WalrusRequestError(f"Error uploading blob: {exc}")
+                except WalrusRequestError as exc:
+                    if not _is_retryable(exc):
+                        raise
+                    last_error = exc
+                if isinstance(body, _StreamedBody) and body.started:
+                    # Part of the body may already be gone, so it cannot be sent again
+                    break
+                print(f"[walrus-agent] Publisher {endpoint.url} failed ({last_error}), trying next")
+            raise last_error
+
+    async def _hedged_get(self, path: str, context: str,
+                          headers: Optional[Dict[str, str]] = None) -> aiohttp.ClientResponse:
+        """
+        GET `path` from the aggregators, hedging slow requests and failing over on errors.
+
+        At most two requests are in flight: the second one starts when the
+        first has not produced response headers within the hedge deadline, or
+        right away when the first one fails. The loser is cancelled.
+        """
+        pool = self.aggregators
+        remaining = pool.candidates()
+        tasks: Dict["asyncio.Task", Tuple[Endpoint, float]] = {}
+        first_endpoint = remaining[0]
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            endpoint = remaining.pop(0)
+            task = asyncio.ensure_future(self._send(pool, endpoint, "GET", path, context, headers=headers))
+            tasks[task] = (endpoint, time.perf_counter())
+
+        launch()
+        try:
+            while tasks:
+                can_hedge = self.hedged_reads and len(tasks) == 1 and remaining
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=pool.hedge_delay() if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    self.hedged_requests += 1
+                    launch()
+                    continue
+
+                for task in done:
+                    endpoint, _ = tasks.pop(task)
+                    if task.exception() is None:
+                        if endpoint is not first_endpoint and len(tasks) > 0:
+                            self.hedge_wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    if not _is_retryable(last_error):
+                        raise last_error
+
+                if not tasks and remaining:
+                    # Fail over to the next aggregator
+                    launch()
+            raise last_error
+        finally:
+            for task, (endpoint, started) in tasks.items():
+                if not task.done():
+                    pool.record_abandoned(endpoint, time.perf_counter() - started)
+                task.cancel()
+                task.add_done_callback(_discard_response)
+
+    @asynccontextmanager
+    async def open_blob(self, blob_id: str,
+                        byte_range: Optional[Tuple[int, Optional[int]]] = None) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Open a streaming GET for a blob; the body is read from the yielded response.
+
+        `byte_range` is an inclusive (first, last) pair, `last` None meaning to
+        the end. Aggregators that support it answer 206 with just those bytes;
+        others answer 200 with the whole blob, so callers must check the status.
+        """
+        headers = None
+        if byte_range is not None:
+            first, last = byte_range
+            headers = {"Range": f"bytes={first}-{'' if last is None else last}"}
+
+        async with self._download_slots:
+            response = await self._hedged_get(f"/v1/blobs/{blob_id}", f"Error retrieving blob {blob_id}", headers)
+            try:
+                async with response:
+                    yield response
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                raise WalrusRequestError(f"Error retrieving blob {blob_id}: {exc}") from exc
+
+    async def probe_endpoints(self, path: str = "/v1/api") -> None:
+        """Probe every publisher and aggregator once, updating their latency and health."""
+        timeout = aiohttp.ClientTimeout(total=self.probe_timeout)
+
+        async def probe(pool: EndpointPool, endpoint: Endpoint) -> None:
+            started = time.perf_counter()
+            try:
+                async with self.http_session().get(f"{endpoint.url}{path}", timeout=timeout) as response:
+                    healthy = response.status < 500
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                healthy = False
+
+            if healthy:
+                pool.record_success(endpoint, time.perf_counter() - started, probe=True)
+            else:
+                pool.record_failure(endpoint, probe=True)
+
+        await asyncio.gather(*(
+            probe(pool, endpoint)
+            for pool in (self.publishers, self.aggregators)
+            for endpoint in pool.endpoints
+        ))
+
+    def stats(self) -> Dict[str, Any]:
+        """Endpoint health and hedging counters."""
+        return {
+            "publishers": self.publishers.stats(),
+            "aggregators": self.aggregators.stats(),
+            "hedged_requests": self.hedged_requests,
+            "hedge_wins": self.hedge_wins,
+        }
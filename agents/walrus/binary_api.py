@@ -0,0 +1,183 @@
+"""
+Raw binary HTTP API for the Walrus agent.
+
+The JSON REST endpoints carry blob contents as base64 strings; these endpoints
+stream raw `application/octet-stream` bodies instead, with metadata in headers:
+
+    PUT  /blobs              body = raw bytes, Content-Type = MIME type
+                             -> JSON {blob_id, blob_url, size, ...}, X-Blob-Id header
+    GET  /blobs/{blob_id}    -> raw bytes, Content-Type = sniffed MIME type,
+                                X-Blob-Id header, chunked when the size is unknown;
+                                a single `Range: bytes=a-b` answers 206 with that slice
+    HEAD /blobs/{blob_id}    -> the same headers (Content-Length = blob size) without
+                                the body; only the first bytes of the blob are read
+
+Uploads send `X-Upload-Key` to make a large upload resumable: retrying with
+the same key skips the parts that were already stored, and `X-Description`
+to describe the blob in the catalog.
+"""
+
+import os
+from typing import Optional, Tuple
+
+from aiohttp import web
+
+from async_walrus_client import WalrusRequestError
+from walrus_operations import (
+    RangeNotSatisfiableError, UploadTooLargeError, _blob_layout, _blob_url, _catalog_upload, _open_blob_stream,
+    _put_stream
+)
+
+BINARY_API_HOST = os.getenv("WALRUS_BINARY_API_HOST", "0.0.0.0")
+BINARY_API_PORT = int(os.getenv("WALRUS_BINARY_API_PORT", "8011"))
+
+_runner: Optional[web.AppRunner] = None
+
+
+async def handle_upload(request: web.Request) -> web.Response:
+    """Stream the request body into a Walrus upload."""
+    mime_type = request.headers.get("Content-Type", "application/octet-stream")
+    resume_key = request.headers.get("X-Upload-Key")
+    print(f"[walrus-agent] Binary upload ({mime_type}, {request.content_length or 'chunked'} bytes)")
+
+    try:
+        result = await _put_stream(request.content, request.content_length,
+                                   f"upload:{resume_key}" if resume_key else None, mime_type)
+        _catalog_upload(result, None, request.headers.get("X-Description"))
+    except UploadTooLargeError as exc:
+        return web.json_response({"success": False, "error_message": str(exc)}, status=413)
+    except Exception as exc:
+        return web.json_response({"success": False, "error_message": str(exc)}, status=502)
+
+    return web.json_response(
+        {
+            "success": True,
+            "blob_id": result.blob_id,
+            "blob_url": result.blob_url,
+            "size": result.size,
+            "mime_type": result.mime_type,
+        },
+        headers={"X-Blob-Id": result.blob_id},
+    )
+
+
+def _error_status(exc: Exception) -> int:
+    """404 when the aggregator does not know the blob, 502 for any other upstream failure."""
+    for error in (exc, exc.__cause__):
+        if isinstance(error, WalrusRequestError) and error.status == 404:
+            return 404
+    return 502
+
+
+async def _requested_range(request: web.Request, blob_id: str) -> Optional[Tuple[int, Optional[int], Optional[int]]]:
+    """
+    Parse a single-range `Range` header into (offset, length, blob size).
+
+    Returns None when there is no usable Range header, so the whole blob is sent.
+    """
+    if "Range" not in request.headers:
+        return None
+    try:
+        requested = request.http_range
+    except ValueError:
+        return None
+
+    layout = await _blob_layout(blob_id)
+    start, stop = requested.start, requested.stop
+    if start is None or start < 0:
+        # Suffix ranges ("bytes=-N") are relative to the blob size
+        if layout.size is None:
+            return None
+        start = max(layout.size - (-start if start is not None else stop), 0)
+        return start, layout.size - start, layout.size
+
+    return start, None if stop is None else stop - start, layout.size
+
+
+async def handle_metadata(request: web.Request) -> web.Response:
+    """Answer HEAD with the blob's size and MIME type, reading only its first bytes."""
+    blob_id = request.match_info["blob_id"]
+    try:
+        layout = await _blob_layout(blob_id)
+    except Exception as exc:
+        return web.Response(status=_error_status(exc))
+
+    headers = {
+        "Content-Type": layout.mime_type,
+        "Accept-Ranges": "bytes",
+        "X-Blob-Id": blob_id,
+        "X-Blob-Url": _blob_url(blob_id),
+    }
+    if layout.size is not None:
+        headers["Content-Length"] = str(layout.size)
+    return web.Response(headers=headers)
+
+
+async def handle_download(request: web.Request) -> web.StreamResponse:
+    """Stream a blob, or one byte range of it, to the client without buffering it."""
+    blob_id = request.match_info["blob_id"]
+    response = None
+
+    try:
+        byte_range = await _requested_range(request, blob_id)
+        offset, length, total = byte_range if byte_range else (0, None, None)
+
+        async with _open_blob_stream(blob_id, offset, length) as stream:
+            response = web.StreamResponse(headers={
+                "Content-Type": stream.mime_type,
+                "Accept-Ranges": "bytes",
+                "X-Blob-Id": blob_id,
+                "X-Blob-Url": _blob_url(blob_id),
+            })
+            if byte_range:
+                response.set_status(206)
+                last = offset + stream.size - 1 if stream.size is not None else ""
+                response.headers["Content-Range"] = f"bytes {offset}-{last}/{total if total is not None else '*'}"
+            if stream.size is not None:
+                response.content_length = stream.size
+            else:
+                response.enable_chunked_encoding()
+
+            await response.prepare(request)
+            async for chunk in stream:
+                await response.write(chunk)
+            await response.write_eof()
+            return response
+
+    except RangeNotSatisfiableError as exc:
+        return web.json_response({"success": False, "blob_id": blob_id, "error_message": str(exc)}, status=416)
+    except Exception as exc:
+        if response is not None and response.prepared:
+            # Headers are already out; all we can do is drop the connection
+            raise
+        return web.json_response({"success": False, "blob_id": blob_id, "error_message": str(exc)},
+                                 status=_error_status(exc))
+
+
+def create_app() -> web.Application:
+    app = web.Application()
+    app.router.add_put("/blobs", handle_upload)
+    app.router.add_post("/blobs", handle_upload)
+    app.router.add_get("/blobs/{blob_id}", handle_download, allow_head=False)
+    app.router.add_head("/blobs/{blob_id}", handle_metadata)
+    return app
+
+
+async def start(host: str = BINARY_API_HOST, port: int = BINARY_API_PORT) -> None:
+    """Start serving the binary API on the running event loop."""
+    global _runner
+    if _runner is not None:
+        return
+    runner = web.AppRunner(create_app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    _runner = runner
+    print(f"[walrus-agent] Binary API listening on http://{host}:{port}")
+
+
+async def stop() -> None:
+    """Stop the binary API server."""
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
@@ -0,0 +1,167 @@
+"""
+Disk-backed LRU cache for Walrus blobs.
+
+Walrus blobs are immutable by ID, so a cached copy never goes stale. Entries
+are written atomically (temp file + rename) and evicted least-recently-used
+first once the cache exceeds its byte budget.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Optional
+
+
+class BlobCacheWriter:
+    """Incrementally writes one blob into the cache; nothing is visible until `commit()`."""
+
+    def __init__(self, cache: "BlobCache", blob_id: str):
+        self._cache = cache
+        self._blob_id = blob_id
+        fd, self._tmp_path = tempfile.mkstemp(dir=cache.directory, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+        self.size = 0
+        self._done = False
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        self._file.close()
+        self._cache._commit(self._blob_id, self._tmp_path, self.size)
+
+    def abort(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+class BlobCache:
+    """Size-bounded, disk-backed LRU cache keyed by blob ID."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        """Rebuild the LRU index from the files already on disk."""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".part"):
+                # Leftover from an interrupted write
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def _key(blob_id: str) -> str:
+        return hashlib.sha256(blob_id.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def open(self, blob_id: str, count: bool = True) -> Optional[BinaryIO]:
+        """
+        Return an open file for a cached blob, or None on a miss.
+
+        With `count=False` the lookup does not touch the hit/miss counters; use
+        it for probes and for reads that are part of a fetch already counted.
+        """
+        key = self._key(blob_id)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += count
+                return None
+            try:
+                f = open(self._path(key), "rb")
+            except OSError:
+                # File vanished underneath us; forget the entry
+                self._total_bytes -= self._entries.pop(key)
+                self.misses += count
+                return None
+
+            self.hits += count
+            self._entries.move_to_end(key)
+        try:
+            # Persist recency so LRU order survives restarts
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        return f
+
+    def writer(self, blob_id: str) -> BlobCacheWriter:
+        """Start writing a blob into the cache."""
+        return BlobCacheWriter(self, blob_id)
+
+    def _commit(self, blob_id: str, tmp_path: str, size: int) -> None:
+        if size > self.max_bytes:
+            os.remove(tmp_path)
+            return
+
+        key = self._key(blob_id)
+        with self._lock:
+            os.replace(tmp_path, self._path(key))
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until the cache fits its budget."""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
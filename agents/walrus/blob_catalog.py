@@ -0,0 +1,96 @@
+"""
+Local catalog of blobs uploaded through the agent.
+
+Every successful upload is recorded with its hash, size, MIME type,
+description and the address of the sender that uploaded it, so blob listings
+are a local indexed query and downloads know the MIME type without sniffing.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+@dataclass
+class CatalogEntry:
+    """One uploaded blob."""
+    blob_id: str
+    sha256: str
+    size: int
+    mime_type: str
+    description: Optional[str]
+    sender: str
+    created_at: float
+
+
+class BlobCatalog:
+    """SQLite-backed catalog of uploaded blobs, indexed by sender and upload time."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # Rows are ordered by id, which increases with upload time
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    blob_id TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mime_type TEXT NOT NULL,
+                    description TEXT,
+                    sender TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    UNIQUE (sender, blob_id)
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_blobs_sender_id ON blobs (sender, id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_blobs_blob_id ON blobs (blob_id)")
+
+    def add(self, blob_id: str, sha256: str, size: int, mime_type: str,
+            description: Optional[str] = None, sender: Optional[str] = None) -> None:
+        """Record an upload; uploading the same blob again moves it to the top of the sender's list."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO blobs (blob_id, sha256, size, mime_type, description, sender, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (blob_id, sha256, size, mime_type, description, sender or "", time.time()),
+            )
+
+    def mime_type(self, blob_id: str) -> Optional[str]:
+        """Return the MIME type recorded for a blob, if it was uploaded through this agent."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mime_type FROM blobs WHERE blob_id = ? ORDER BY id DESC LIMIT 1", (blob_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def list(self, sender: Optional[str] = None, limit: int = 10, offset: int = 0) -> Tuple[List[CatalogEntry], int]:
+        """
+        Return one page of blobs, newest first, and the total number of matching blobs.
+
+        With `sender`, only blobs uploaded by that address are listed.
+        """
+        where, params = ("WHERE sender = ?", [sender]) if sender is not None else ("", [])
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT blob_id, sha256, size, mime_type, description, sender, created_at
+                FROM blobs {where} ORDER BY id DESC LIMIT ? OFFSET ?
+                """,
+                params + [limit, offset],
+            ).fetchall()
+            total = self._conn.execute(f"SELECT COUNT(*) FROM blobs {where}", params).fetchone()[0]
+        return [CatalogEntry(*row) for row in rows], total
@@ -0,0 +1,136 @@
+"""
+Transparent compression of compressible blobs.
+
+Text, JSON and similar payloads are compressed before upload when that makes
+them smaller. The stored blob starts with a small header naming the encoding
+and the original size, so any download of the blob (whoever uploaded it) can
+recognise it from its first bytes and decompress it on the fly:
+
+    WALRUSZ\\0 | encoding (1 byte) | original size (8 bytes, big-endian) | payload
+
+Uploads whose raw bytes happen to begin with the magic are never stored as a
+plain blob, so a blob starting with it always carries a real header.
+
+gzip is always available; zstd is used when the `zstandard` package is
+installed. Media that is already compressed (MP3, WebM, PNG, ...) is never
+recompressed.
+"""
+
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is used instead
+    zstandard = None
+
+MAGIC = b"WALRUSZ\x00"
+HEADER = struct.Struct(">8sBQ")
+HEADER_SIZE = HEADER.size
+
+GZIP = 1
+ZSTD = 2
+ENCODING_NAMES = {GZIP: "gzip", ZSTD: "zstd"}
+
+# MIME types worth compressing; everything else is stored as-is
+COMPRESSIBLE_MIME_PREFIXES = ("text/",)
+COMPRESSIBLE_MIME_TYPES = {
+    "application/json",
+    "application/ld+json",
+    "application/xml",
+    "application/javascript",
+    "application/x-ndjson",
+    "application/yaml",
+    "application/x-yaml",
+    "application/csv",
+    "image/svg+xml",
+}
+
+
+@dataclass
+class CompressionHeader:
+    """Encoding and original size of a compressed blob."""
+    encoding: int
+    size: int
+
+    @property
+    def encoding_name(self) -> str:
+        return ENCODING_NAMES[self.encoding]
+
+
+def is_compressible_mime(mime_type: str) -> bool:
+    """Whether blobs of this MIME type are worth compressing."""
+    mime_type = mime_type.split(";")[0].strip().lower()
+    return mime_type.startswith(COMPRESSIBLE_MIME_PREFIXES) or mime_type in COMPRESSIBLE_MIME_TYPES
+
+
+def encoding_for(name: str) -> Optional[int]:
+    """Map a configured encoding name to its header code; None disables compression."""
+    name = name.strip().lower()
+    if name == "zstd":
+        if zstandard is None:
+            print("[walrus-agent] zstandard is not installed, compressing with gzip instead")
+            return GZIP
+        return ZSTD
+    if name == "gzip":
+        return GZIP
+    return None
+
+
+def parse_header(prefix: bytes) -> Optional[CompressionHeader]:
+    """Read the compression header from a blob's first bytes; None for uncompressed blobs."""
+    if len(prefix) < HEADER_SIZE or not prefix.startswith(MAGIC):
+        return None
+    _, encoding, size = HEADER.unpack_from(prefix)
+    if encoding not in ENCODING_NAMES:
+        return None
+    return CompressionHeader(encoding, size)
+
+
+def compress_blob(data: bytes, encoding: int, level: int = 6) -> Optional[bytes]:
+    """Compress `data` behind a header; None when that would not make it smaller."""
+    if encoding == ZSTD:
+        payload = zstandard.ZstdCompressor(level=level).compress(data)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        payload = compressor.compress(data) + compressor.flush()
+
+    if HEADER_SIZE + len(payload) >= len(data):
+        return None
+    return HEADER.pack(MAGIC, encoding, len(data)) + payload
+
+
+def _decompressor(encoding: int):
+    if encoding == ZSTD:
+        if zstandard is None:
+            raise ValueError("Blob is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(31)
+
+
+async def iter_decompressed(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Strip the header from a compressed blob's chunks and yield the original bytes."""
+    head = b""
+    header = None
+    decompressor = None
+    async for chunk in chunks:
+        if decompressor is None:
+            head += chunk
+            if len(head) < HEADER_SIZE:
+                continue
+            header = parse_header(head)
+            if header is None:
+                raise ValueError("Blob is missing its compression header")
+            decompressor = _decompressor(header.encoding)
+            chunk = head[HEADER_SIZE:]
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+
+    if decompressor is None:
+        raise ValueError("Compressed blob is truncated")
+    tail = decompressor.flush()
+    if tail:
+        yield tail
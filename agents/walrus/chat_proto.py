@@ -4,10 +4,11 @@ Chat protocol for the Walrus Blob Storage Agent.
 Flow:
   • announce attachment support
   • pull file data (resource or URL string)
-  • call walrus operations (upload/download)
+  • call walrus operations (upload/download), streaming status updates while
+    they run and sending each result as soon as it is ready
 """
 
-import os
+import re
 from datetime import datetime
 from uuid import uuid4
 
@@ -21,12 +22,10 @@ from uagents_core.contrib.protocols.chat import (
     TextContent,
     chat_protocol_spec,
 )
-from uagents_core.storage import ExternalStorage
 
-from walrus_operations import handle_walrus_operation
-from intent_detection import detect_intent, get_help_message, generate_clarification_message
-
-STORAGE_URL = os.getenv("AGENTVERSE_URL", "https://agentverse.ai") + "/v1/storage"
+from attachment_storage import attachment_store
+from walrus_operations import _list_blobs, handle_walrus_operation
+from intent_detection import detect_intent_and_clarify, get_help_message, needs_clarification
 
 
 def _chat(text: str) -> ChatMessage:
@@ -58,6 +57,8 @@ async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
     has_attachment = False
     user_message = ""
 
+    resource_ids = []
+
     # First pass: collect content and check for attachments
     for item in msg.content:
         if isinstance(item, StartSessionContent):
@@ -69,33 +70,32 @@ async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
 
         elif isinstance(item, ResourceContent):
             has_attachment = True
-            try:
-                storage = ExternalStorage(identity=ctx.agent.identity,
-                                          storage_url=STORAGE_URL)
-                data = storage.download(str(item.resource_id))
-                prompt_content.append({
-                    "type": "resource",
-                    "mime_type": data["mime_type"],
-                    "contents": data["contents"],
-                })
-            except Exception as exc:
-                ctx.logger.error(f"download error: {exc}")
-                await ctx.send(sender, _chat("Failed to download the attachment."))
+            resource_ids.append(str(item.resource_id))
+
+    # Download all attachments concurrently, keeping their order
+    for data in await attachment_store.download_all(ctx.agent.identity, resource_ids):
+        if isinstance(data, Exception):
+            ctx.logger.error(f"download error: {data}")
+            await ctx.send(sender, _chat("Failed to download the attachment."))
+            continue
+        prompt_content.append({
+            "type": "resource",
+            "mime_type": data["mime_type"],
+            "contents": data["contents"],
+        })
 
     # Detect intent using OpenAI
     user_message = user_message.strip()
-    intent_result = detect_intent(user_message, has_attachment)
+    # An unclear intent comes back with a clarification, generated alongside the classification
+    intent_result, clarification = await detect_intent_and_clarify(user_message, has_attachment)
     
     ctx.logger.info(f"Detected intent: {intent_result['intent']} (confidence: {intent_result['confidence']})")
     
-    # Check if intent is unclear (low confidence or unknown)
-    confidence = intent_result.get('confidence', 0.0)
     intent = intent_result.get('intent', 'unknown')
     
     # If confidence is low or intent is unknown, ask for clarification
-    if confidence < 0.6 or intent == 'unknown':
-        if user_message:  # Only ask for clarification if there's a message
-            clarification = generate_clarification_message(user_message)
+    if needs_clarification(intent_result):
+        if clarification is not None:
             await ctx.send(sender, _chat(clarification))
         else:
             await ctx.send(sender, _chat("No message provided. Try sending a message or attaching a file!"))
@@ -107,7 +107,10 @@ async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
         return
     
     elif intent == 'list_blobs':
-        await ctx.send(sender, _chat("📋 Blob listing feature coming soon! For now, you can use the blob ID from previous uploads to download files."))
+        # "/list 2" asks for the second page
+        page_match = re.search(r"(\d+)\s*$", user_message)
+        page = int(page_match.group(1)) if page_match else 1
+        await ctx.send(sender, _chat(_list_blobs(sender, page).to_markdown()))
         return
     
     # For upload and download operations, add text content if needed
@@ -117,8 +120,14 @@ async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
     
     # Handle the operation based on intent
     if prompt_content or intent in ['upload_text', 'download_blob']:
-        result = await handle_walrus_operation(prompt_content, intent_result, ctx)
-        await ctx.send(sender, _chat(result))
+        async def send_progress(text: str) -> None:
+            await ctx.send(sender, _chat(text))
+
+        async def send_result(result) -> None:
+            await ctx.send(sender, _chat(result.to_markdown()))
+
+        await handle_walrus_operation(prompt_content, intent_result, ctx, sender,
+                                      progress=send_progress, on_result=send_result)
     else:
         await ctx.send(sender, _chat("No content provided. Try attaching a file or sending a message!"))
 
@@ -0,0 +1,274 @@
+"""
+Chunked, resumable uploads for large Walrus blobs.
+
+Large inputs are split into fixed-size parts, each uploaded as its own blob
+with retries. Progress is recorded in a JSON manifest after every part, so an
+upload that fails or is interrupted resumes from the last completed part the
+next time the same content (or URL) is uploaded. Once every part is stored, a
+small JSON index blob listing the parts is uploaded; its blob ID is the one
+handed back to the user, and downloads reassemble the parts from it.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import AsyncIterable, Awaitable, Callable, List, Optional, Tuple
+
+INDEX_TYPE = "walrus-chunked-index"
+INDEX_VERSION = 1
+
+# Index blobs are serialized compactly with "type" first, so they can be
+# recognised from the first bytes of a download. Uploads whose own bytes start
+# with this prefix are stored behind a genuine index, never as a plain blob.
+INDEX_PREFIX = b'{"type":"' + INDEX_TYPE.encode("ascii") + b'"'
+
+
+@dataclass
+class ChunkPart:
+    """One uploaded part of a chunked blob."""
+    size: int
+    sha256: str
+    blob_id: str
+
+
+@dataclass
+class ChunkedIndex:
+    """Parsed index blob: the parts that make up a chunked blob, in order."""
+    size: int
+    sha256: str
+    part_size: int
+    parts: List[ChunkPart]
+
+
+def is_chunked_index(prefix: bytes) -> bool:
+    """Whether a blob, judged by its first bytes, is a chunked-upload index."""
+    return prefix.startswith(INDEX_PREFIX)
+
+
+def build_index(index: ChunkedIndex) -> bytes:
+    """Serialize an index blob."""
+    body = {
+        "type": INDEX_TYPE,
+        "version": INDEX_VERSION,
+        "size": index.size,
+        "sha256": index.sha256,
+        "part_size": index.part_size,
+        "parts": [asdict(part) for part in index.parts],
+    }
+    return json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+
+def parse_index(data: bytes) -> ChunkedIndex:
+    """Parse an index blob, raising ValueError if it is malformed."""
+    try:
+        body = json.loads(data)
+        if body.get("type") != INDEX_TYPE or body.get("version") != INDEX_VERSION:
+            raise ValueError(f"unsupported index {body.get('type')!r} v{body.get('version')}")
+        return ChunkedIndex(
+            size=int(body["size"]),
+            sha256=body["sha256"],
+            part_size=int(body["part_size"]),
+            parts=[ChunkPart(int(p["size"]), p["sha256"], p["blob_id"]) for p in body["parts"]],
+        )
+    except (KeyError, TypeError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Malformed chunked index: {exc}")
+
+
+class UploadManifest:
+    """Progress of one chunked upload, persisted as JSON after every part."""
+
+    def __init__(self, path: Optional[str], key: str, part_size: int):
+        self.path = path
+        self.key = key
+        self.part_size = part_size
+        self.parts: List[Optional[ChunkPart]] = []
+
+    @classmethod
+    def load(cls, directory: str, key: str, part_size: int) -> "UploadManifest":
+        """Load the manifest for `key`, or start an empty one."""
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+        manifest = cls(os.path.join(directory, name), key, part_size)
+        try:
+            with open(manifest.path, "r", encoding="utf-8") as f:
+                body = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+
+        # A different part size means none of the recorded parts line up
+        if body.get("key") == key and body.get("part_size") == part_size:
+            manifest.parts = [ChunkPart(**part) if part else None for part in body.get("parts", [])]
+        return manifest
+
+    def completed(self, number: int, sha256: str) -> Optional[ChunkPart]:
+        """Return part `number` if it was already uploaded with the same content."""
+        if number < len(self.parts):
+            part = self.parts[number]
+            if part is not None and part.sha256 == sha256:
+                return part
+        return None
+
+    def record(self, number: int, part: ChunkPart) -> None:
+        """Mark a part as uploaded and persist the manifest."""
+        if number >= len(self.parts):
+            self.parts.extend([None] * (number + 1 - len(self.parts)))
+        self.parts[number] = part
+        self._save()
+
+    def truncate(self, num_parts: int) -> None:
+        """Drop parts beyond the end of the source (it got shorter since last time)."""
+        del self.parts[num_parts:]
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        body = {
+            "key": self.key,
+            "part_size": self.part_size,
+            "parts": [asdict(part) if part else None for part in self.parts],
+        }
+        directory = os.path.dirname(self.path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(body, f)
+        os.replace(tmp_path, self.path)
+
+    def remove(self) -> None:
+        """Delete the manifest once the upload is complete."""
+        if self.path is None:
+            return
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+async def _iter_parts(chunks: AsyncIterable[bytes], part_size: int):
+    """Regroup a stream of arbitrarily sized chunks into parts of `part_size` bytes."""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= part_size:
+            yield bytes(buffer[:part_size])
+            del buffer[:part_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+class ChunkedUploader:
+    """
+    Uploads large inputs as fixed-size parts plus an index blob.
+
+    `put_blob` stores one blob and returns its ID; it is retried up to
+    `max_retries` times per part with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        put_blob: Callable[[bytes], Awaitable[str]],
+        manifest_dir: str,
+        part_size: int,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        concurrency: int = 4,
+    ):
+        self._put_blob = put_blob
+        self.manifest_dir = manifest_dir
+        self.part_size = part_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.concurrency = concurrency
+        os.makedirs(manifest_dir, exist_ok=True)
+
+    async def _put_with_retry(self, data: bytes, label: str) -> str:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._put_blob(data)
+            except Exception as exc:
+                if attempt == self.max_retries:
+                    raise Exception(f"Uploading {label} failed after {attempt + 1} attempts: {exc}")
+                delay = self.retry_backoff * (2 ** attempt)
+                print(f"[walrus-agent] Uploading {label} failed ({exc}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _upload_part(self, manifest: UploadManifest, number: int, data: bytes) -> ChunkPart:
+        sha256 = hashlib.sha256(data).hexdigest()
+        part = manifest.completed(number, sha256)
+        if part is None:
+            blob_id = await self._put_with_retry(data, f"part {number + 1}")
+            part = ChunkPart(size=len(data), sha256=sha256, blob_id=blob_id)
+            manifest.record(number, part)
+        return part
+
+    async def _finish(self, manifest: UploadManifest, parts: List[ChunkPart], size: int, sha256: str,
+                      always_index: bool = False) -> Tuple[str, List[ChunkPart]]:
+        manifest.truncate(len(parts))
+        if len(parts) == 1 and not always_index:
+            # A single part is the whole blob, no index needed
+            blob_id = parts[0].blob_id
+        else:
+            index = ChunkedIndex(size=size, sha256=sha256, part_size=self.part_size, parts=parts)
+            blob_id = await self._put_with_retry(build_index(index), "index")
+        manifest.remove()
+        return blob_id, parts
+
+    async def upload_bytes(self, data: bytes, always_index: bool = False) -> Tuple[str, List[ChunkPart]]:
+        """
+        Upload in-memory bytes in parts, several at a time.
+
+        With `always_index`, an index blob is written even for a single part.
+        Returns the blob ID to hand out and the parts it is made of.
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        manifest = UploadManifest.load(self.manifest_dir, f"sha256:{sha256}", self.part_size)
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        view = memoryview(data)
+
+        async def upload(number: int) -> ChunkPart:
+            async with semaphore:
+                start = number * self.part_size
+                return await self._upload_part(manifest, number, bytes(view[start:start + self.part_size]))
+
+        num_parts = max(1, -(-len(data) // self.part_size))
+        tasks = [asyncio.ensure_future(upload(number)) for number in range(num_parts)]
+        try:
+            parts = await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop the remaining parts; finished ones are kept in the manifest
+            for task in tasks:
+                task.cancel()
+            raise
+        return await self._finish(manifest, list(parts), len(data), sha256, always_index)
+
+    async def upload_stream(self, key: Optional[str], chunks: AsyncIterable[bytes],
+                            always_index: bool = False) -> Tuple[str, List[ChunkPart], int, str]:
+        """
+        Upload a stream in parts as it is read; only one part is buffered at a time.
+
+        `key` identifies the source (e.g. its URL) so an interrupted upload can be
+        resumed: parts whose content matches the manifest are not uploaded again.
+        Without a key, progress is not persisted. With `always_index`, an index
+        blob is written even for a single part.
+        Returns the blob ID, the parts, the total size and its sha256.
+        """
+        if key is None:
+            manifest = UploadManifest(None, "", self.part_size)
+        else:
+            manifest = UploadManifest.load(self.manifest_dir, key, self.part_size)
+        hasher = hashlib.sha256()
+        parts: List[ChunkPart] = []
+        size = 0
+
+        async for data in _iter_parts(chunks, self.part_size):
+            hasher.update(data)
+            size += len(data)
+            parts.append(await self._upload_part(manifest, len(parts), data))
+
+        if not parts:
+            parts.append(await self._upload_part(manifest, 0, b""))
+
+        sha256 = hasher.hexdigest()
+        blob_id, parts = await self._finish(manifest, parts, size, sha256, always_index)
+        return blob_id, parts, size, sha256
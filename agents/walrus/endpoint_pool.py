@@ -0,0 +1,143 @@
+"""
+Health-scored pool of Walrus publisher or aggregator endpoints.
+
+Each endpoint keeps an exponentially weighted moving average of its latency,
+fed by real requests and by periodic health probes. Requests go to endpoints
+picked at random with weights inversely proportional to that latency, and
+endpoints that keep failing are tried only after the healthy ones.
+"""
+
+import math
+import random
+import time
+from collections import deque
+from typing import Deque, List, Optional, Sequence
+
+
+class Endpoint:
+    """One publisher or aggregator base URL and its observed health."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.latency: Optional[float] = None  # EWMA, seconds
+        self.consecutive_failures = 0
+        self.last_failure = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def __repr__(self) -> str:
+        return f"Endpoint({self.url!r})"
+
+
+class EndpointPool:
+    """
+    Latency-weighted endpoint selection with failover ordering.
+
+    An endpoint is considered unhealthy after `unhealthy_after` consecutive
+    failures; it goes back to the healthy set on its next success, or becomes
+    eligible for a retry once `retry_after` seconds have passed.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        ewma_alpha: float = 0.3,
+        unhealthy_after: int = 3,
+        retry_after: float = 30,
+        initial_hedge_delay: float = 2.0,
+        min_hedge_delay: float = 0.05,
+        latency_window: int = 200,
+    ):
+        if not urls:
+            raise ValueError("EndpointPool needs at least one URL")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.ewma_alpha = ewma_alpha
+        self.unhealthy_after = unhealthy_after
+        self.retry_after = retry_after
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self._recent: Deque[float] = deque(maxlen=latency_window)
+
+    def is_healthy(self, endpoint: Endpoint) -> bool:
+        if endpoint.consecutive_failures < self.unhealthy_after:
+            return True
+        return time.monotonic() - endpoint.last_failure >= self.retry_after
+
+    def candidates(self) -> List[Endpoint]:
+        """
+        Return every endpoint in the order it should be tried.
+
+        Healthy endpoints come first, drawn without replacement with weight
+        1 / latency; endpoints without samples are weighted like the fastest
+        known one so they get explored. Unhealthy endpoints follow, least
+        recently failed first.
+        """
+        healthy = [e for e in self.endpoints if self.is_healthy(e)]
+        unhealthy = sorted((e for e in self.endpoints if not self.is_healthy(e)), key=lambda e: e.last_failure)
+
+        known = [e.latency for e in healthy if e.latency is not None]
+        default_latency = min(known) if known else 1.0
+
+        ordered = []
+        weights = [1.0 / max(e.latency if e.latency is not None else default_latency, 1e-3) for e in healthy]
+        while healthy:
+            pick = random.choices(range(len(healthy)), weights=weights)[0]
+            ordered.append(healthy.pop(pick))
+            weights.pop(pick)
+        return ordered + unhealthy
+
+    def record_success(self, endpoint: Endpoint, latency: float, probe: bool = False) -> None:
+        """
+        Feed a successful request's latency into the endpoint's EWMA.
+
+        Probe latencies only update the EWMA; the hedge deadline is based on
+        real requests.
+        """
+        if not probe:
+            endpoint.requests += 1
+            self._recent.append(latency)
+        endpoint.consecutive_failures = 0
+        self._update_latency(endpoint, latency)
+
+    def _update_latency(self, endpoint: Endpoint, latency: float) -> None:
+        if endpoint.latency is None:
+            endpoint.latency = latency
+        else:
+            endpoint.latency += self.ewma_alpha * (latency - endpoint.latency)
+
+    def record_abandoned(self, endpoint: Endpoint, latency: float) -> None:
+        """
+        Feed the time a request ran before it was cancelled (e.g. it lost a
+        hedge race) into the EWMA. It is a lower bound, but keeps a slow
+        endpoint from looking unexplored forever.
+        """
+        if endpoint.latency is None or latency > endpoint.latency:
+            self._update_latency(endpoint, latency)
+
+    def record_failure(self, endpoint: Endpoint, probe: bool = False) -> None:
+        if not probe:
+            endpoint.requests += 1
+            endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+        endpoint.last_failure = time.monotonic()
+
+    def hedge_delay(self) -> float:
+        """p95 of recent request latencies: how long to wait before sending a hedged request."""
+        if len(self._recent) < 20:
+            return self.initial_hedge_delay
+        samples = sorted(self._recent)
+        p95 = samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)]
+        return max(p95, self.min_hedge_delay)
+
+    def stats(self) -> List[dict]:
+        """Per-endpoint latency and failure counters."""
+        return [
+            {
+                "url": e.url,
+                "healthy": self.is_healthy(e),
+                "latency_ms": round(e.latency * 1000, 1) if e.latency is not None else None,
+                "requests": e.requests,
+                "failures": e.failures,
+            }
+            for e in self.endpoints
+        ]
@@ -0,0 +1,87 @@
+"""
+Micro-batching of LLM intent classifications.
+
+Under a burst of chat messages, each one that needs the LLM would otherwise
+make its own completion request. The batcher collects such messages for a
+few milliseconds (or until the batch is full), classifies them with a single
+request, and hands each waiting caller its own result.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+IntentResult = Optional[Dict[str, Any]]
+
+
+class IntentBatcher:
+    """
+    Coalesces classification requests into batches.
+
+    The first message added after a flush starts a `window`-second timer;
+    everything added before it fires is classified together. A batch is sent
+    early once it holds `max_batch` messages.
+    """
+
+    def __init__(
+        self,
+        classify_batch: Callable[[List[str]], Awaitable[List[IntentResult]]],
+        window: float = 0.005,
+        max_batch: int = 16,
+    ):
+        self._classify_batch = classify_batch
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.messages = 0
+
+        self._pending: List[Tuple[str, "asyncio.Future[IntentResult]"]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set["asyncio.Task"] = set()
+
+    async def classify(self, message: str) -> IntentResult:
+        """Queue a message for the current batch and return its classification once the batch is answered."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((message, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Hand the pending messages to a background task that classifies them in one request."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        # Callers that were cancelled while waiting no longer need an answer
+        batch = [(message, future) for message, future in batch if not future.done()]
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[str, "asyncio.Future[IntentResult]"]]) -> None:
+        try:
+            results = await self._classify_batch([message for message, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.messages += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, float]:
+        """Number of LLM requests made and the average number of messages per request."""
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "mean_batch_size": self.messages / self.batches if self.batches else 0.0,
+        }
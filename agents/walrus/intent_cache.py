@@ -0,0 +1,198 @@
+"""
+Cache of LLM intent classifications.
+
+Messages are normalized before lookup: case, whitespace and punctuation are
+ignored, and URLs and blob IDs are replaced by numbered placeholders. The
+cached result stores the placeholders too, and a hit substitutes the new
+message's URLs and blob IDs back in, so "Download <id A>!" and "download <id B>"
+share one entry. Entries expire after a TTL and the least recently used are
+evicted first. With a path, entries are also kept in SQLite and survive
+restarts; lookups never touch the database, and writes are queued and
+committed in batches by a worker thread so the event loop never waits on disk.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from intent_rules import BLOB_ID, URL
+
+_PLACEHOLDER_RE = re.compile(rf"({URL})|(?<![A-Za-z0-9_-])({BLOB_ID})(?![A-Za-z0-9_-])")
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Return the cache key for a message and the (placeholder, value) pairs
+    substituted for its URLs and blob IDs, in order of appearance.
+    """
+    substitutions: List[Tuple[str, str]] = []
+    counts = {"url": 0, "blob": 0}
+
+    def placeholder(match: "re.Match") -> str:
+        kind = "url" if match.group(1) else "blob"
+        name = f"__{kind}{counts[kind]}__"
+        counts[kind] += 1
+        substitutions.append((name, match.group(0)))
+        return f" {name} "
+
+    key = _PLACEHOLDER_RE.sub(placeholder, message)
+    key = _PUNCTUATION_RE.sub(" ", key.lower())
+    return _WHITESPACE_RE.sub(" ", key).strip(), substitutions
+
+
+def _substitute(value: Any, pairs: List[Tuple[str, str]]) -> Any:
+    """Replace each `old` with `new` in every string of a JSON-like value."""
+    if isinstance(value, str):
+        for old, new in pairs:
+            value = value.replace(old, new)
+        return value
+    if isinstance(value, dict):
+        return {k: _substitute(v, pairs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_substitute(v, pairs) for v in value]
+    return value
+
+
+class IntentCache:
+    """LRU + TTL cache of intent results keyed by normalized message, optionally persisted in SQLite."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Database writes not yet committed: (key, serialized result, expires_at), or (key, None, None) to delete
+        self._pending: List[Tuple[str, Optional[str], Optional[float]]] = []
+        self._db_lock = threading.Lock()
+        self._writer: Optional["asyncio.Future"] = None
+        if path:
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS intents (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("DELETE FROM intents WHERE expires_at <= ?", (time.time(),))
+
+        rows = self._conn.execute(
+            "SELECT key, result, expires_at FROM intents ORDER BY expires_at DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        for key, result, expires_at in reversed(rows):
+            self._entries[key] = (expires_at, json.loads(result))
+
+    def get(self, message: str) -> Optional[Dict[str, Any]]:
+        """Return the cached intent for a message with its own URLs and blob IDs filled in, if any."""
+        key, substitutions = normalize_message(message)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            self._schedule_write()
+            return None
+        return _substitute(copy.deepcopy(entry[1]), substitutions)
+
+    def put(self, message: str, result: Dict[str, Any]) -> None:
+        """Cache the intent classified for a message."""
+        key, substitutions = normalize_message(message)
+        # Swap the message's values for placeholders, longest first so overlapping values stay intact
+        pairs = sorted(((value, name) for name, value in substitutions), key=lambda p: len(p[0]), reverse=True)
+        stored = _substitute(copy.deepcopy(result), pairs)
+        expires_at = time.time() + self.ttl
+
+        with self._lock:
+            self._entries[key] = (expires_at, stored)
+            self._entries.move_to_end(key)
+            if self._conn is not None:
+                self._pending.append((key, json.dumps(stored), expires_at))
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        self._schedule_write()
+
+    def _remove(self, key: str) -> None:
+        """Drop an entry; the caller holds the lock and schedules the write."""
+        self._entries.pop(key, None)
+        if self._conn is not None:
+            self._pending.append((key, None, None))
+
+    def _schedule_write(self) -> None:
+        """Commit queued writes in a worker thread, or right away when no event loop is running."""
+        if self._conn is None or not self._pending or (self._writer is not None and not self._writer.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_pending()
+            return
+        self._writer = loop.run_in_executor(None, self._write_pending)
+        # Writes queued while the worker was finishing go out with the next batch
+        self._writer.add_done_callback(lambda _: self._schedule_write())
+
+    def _write_pending(self) -> None:
+        """Commit every queued write in one transaction, until the queue stays empty."""
+        with self._db_lock:
+            while True:
+                with self._lock:
+                    batch, self._pending = self._pending, []
+                if not batch:
+                    return
+                with self._conn:
+                    for key, result, expires_at in batch:
+                        if result is None:
+                            self._conn.execute("DELETE FROM intents WHERE key = ?", (key,))
+                        else:
+                            self._conn.execute(
+                                "INSERT OR REPLACE INTO intents (key, result, expires_at) VALUES (?, ?, ?)",
+                                (key, result, expires_at),
+                            )
+
+    async def flush(self) -> None:
+        """Wait until every queued write is committed."""
+        if self._writer is not None and not self._writer.done():
+            await self._writer
+        if self._pending:
+            await asyncio.to_thread(self._write_pending)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and expiry counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
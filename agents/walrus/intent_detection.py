@@ -6,14 +6,85 @@ Requirements
 pip install openai python-dotenv
 """
 
+import asyncio
+import json
 import os
-from typing import Dict, Any, List
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
+
+from intent_batcher import IntentBatcher
+from intent_cache import IntentCache, normalize_message
+from intent_rules import IntentRules, intent_result
+from local_intent_model import DEFAULT_MODEL_PATH, load_model
 
 load_dotenv()
 
-client = OpenAI()
+# One shared async client: its HTTP connections are kept alive between calls,
+# and awaiting a call never blocks the agent's event loop
+OPENAI_TIMEOUT = float(os.getenv("WALRUS_OPENAI_TIMEOUT", "15"))
+OPENAI_MAX_RETRIES = int(os.getenv("WALRUS_OPENAI_MAX_RETRIES", "1"))
+
+client = AsyncOpenAI(timeout=OPENAI_TIMEOUT, max_retries=OPENAI_MAX_RETRIES)
+
+# Cache of LLM classifications; set WALRUS_INTENT_CACHE_PATH to persist it across restarts
+INTENT_CACHE_ENTRIES = int(os.getenv("WALRUS_INTENT_CACHE_ENTRIES", "1024"))
+INTENT_CACHE_TTL = float(os.getenv("WALRUS_INTENT_CACHE_TTL", "3600"))
+INTENT_CACHE_PATH = os.getenv("WALRUS_INTENT_CACHE_PATH") or None
+
+# Rule hit and LLM fallback counters are kept on this instance
+intent_rules = IntentRules()
+intent_cache = IntentCache(INTENT_CACHE_ENTRIES, INTENT_CACHE_TTL, INTENT_CACHE_PATH)
+
+# Optional offline classifier consulted before the LLM, loaded from weights saved by train_intent_model.py.
+# The threshold keeps it to answers it was right about in cross-validation (100% precision at 0.95).
+LOCAL_INTENT_MODEL = os.getenv("WALRUS_LOCAL_INTENT", "false").lower() == "true"
+LOCAL_INTENT_THRESHOLD = float(os.getenv("WALRUS_LOCAL_INTENT_THRESHOLD", "0.95"))
+LOCAL_INTENT_MODEL_PATH = os.getenv("WALRUS_LOCAL_INTENT_MODEL_PATH") or DEFAULT_MODEL_PATH
+
+local_classifier = load_model(LOCAL_INTENT_MODEL_PATH) if LOCAL_INTENT_MODEL else None
+
+# Messages that need the LLM within INTENT_BATCH_WINDOW_MS of each other are classified in one request
+INTENT_BATCHING = os.getenv("WALRUS_INTENT_BATCHING", "true").lower() == "true"
+INTENT_BATCH_WINDOW_MS = float(os.getenv("WALRUS_INTENT_BATCH_WINDOW_MS", "5"))
+INTENT_BATCH_MAX = int(os.getenv("WALRUS_INTENT_BATCH_MAX", "16"))
+
+# Results below this confidence (or "unknown") are answered with a clarification message
+CLARIFICATION_THRESHOLD = 0.6
+
+# Start generating the clarification alongside the LLM classification instead of after it. Off by
+# default: every message that reaches the LLM then pays for a clarification it usually does not need.
+SPECULATIVE_CLARIFICATION = os.getenv("WALRUS_SPECULATIVE_CLARIFICATION", "false").lower() == "true"
+
+# Completion budget of a clarification request
+CLARIFICATION_MAX_TOKENS = 300
+
+
+@dataclass
+class SpeculationStats:
+    """Outcome of speculative clarification requests and the tokens they cost."""
+    started: int = 0
+    used: int = 0
+    cancelled: int = 0
+    discarded: int = 0
+    used_tokens: int = 0
+    # Tokens of clarifications that completed but were not needed, plus CLARIFICATION_MAX_TOKENS for
+    # every cancelled one: the provider may have generated (and billed) the completion regardless
+    wasted_tokens: int = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "started": self.started,
+            "used": self.used,
+            "cancelled": self.cancelled,
+            "discarded": self.discarded,
+            "used_tokens": self.used_tokens,
+            "wasted_tokens": self.wasted_tokens,
+        }
+
+
+speculation = SpeculationStats()
 
 # Intent categories
 INTENTS = {
@@ -51,6 +122,12 @@ Return a JSON object with:
 Be reasonable with confidence scores. Give high confidence (>0.8) when the intent is clear, and medium confidence (0.6-0.8) when the intent is likely but not certain. For download operations with blob IDs, give high confidence.
 """
 
+# System prompt for classifying a batch of messages in one request
+INTENT_BATCH_SYSTEM_PROMPT = INTENT_SYSTEM_PROMPT + """
+You will receive a JSON array of separate user messages. Classify each one independently and return a JSON object
+{"results": [...]} holding one object of the shape above per message, in the same order as the input.
+"""
+
 # System prompt for generating clarification messages
 CLARIFICATION_SYSTEM_PROMPT = """
 You are a helpful Walrus blob storage agent assistant. The user's message is unclear, and you need to ask for clarification.
@@ -72,10 +149,15 @@ Keep the message concise but helpful. Use emojis to make it friendly.
 """
 
 
-def detect_intent(message: str, has_attachment: bool = False) -> Dict[str, Any]:
+async def detect_intent(message: str, has_attachment: bool = False) -> Dict[str, Any]:
     """
     Detect user intent from message text and attachment status.
     
+    Rules, the intent cache and the offline classifier are tried in turn; the
+    LLM is only called when none of them is confident. The LLM call is awaited
+    on the shared async client, so other chat sessions keep being served
+    meanwhile; cancelling the caller cancels the request.
+    
     Args:
         message: User's message text
         has_attachment: Whether the message has a file attachment
@@ -84,110 +166,120 @@ def detect_intent(message: str, has_attachment: bool = False) -> Dict[str, Any]:
         Dict with intent classification and extracted data
     """
     
-    # If there's an attachment, it's definitely an upload
-    if has_attachment:
-        return {
-            "intent": "upload_file",
-            "confidence": 1.0,
-            "extracted_data": {
-                "blob_id": None,
-                "url": None,
-                "description": message.strip() if message.strip() else None
-            }
-        }
+    result = _detect_without_llm(message, has_attachment)
+    if result is None:
+        result = await _detect_with_llm(message)
+    return result
+
+
+def needs_clarification(result: Dict[str, Any]) -> bool:
+    """Whether an intent result is too unclear to act on."""
+    return result.get("confidence", 0.0) < CLARIFICATION_THRESHOLD or result.get("intent", "unknown") == "unknown"
+
+
+async def detect_intent_and_clarify(message: str, has_attachment: bool = False) -> Tuple[Dict[str, Any], Optional[str]]:
+    """
+    Detect user intent and, when it is unclear, a clarification message to send instead.
     
-    # Check for explicit commands first
-    message_lower = message.lower().strip()
+    When the message has to go to the LLM, the clarification is requested
+    speculatively at the same time as the classification, so unclear messages
+    cost one LLM round trip instead of two. The speculative request is
+    cancelled as soon as a confident intent arrives.
     
-    if message_lower.startswith("/download"):
-        blob_id = message[10:].strip() if len(message) > 10 else ""
-        return {
-            "intent": "download_blob",
-            "confidence": 1.0,
-            "extracted_data": {
-                "blob_id": blob_id if blob_id else None,
-                "url": None,
-                "description": None
-            }
-        }
+    Returns:
+        The intent result and the clarification message, or None when the intent is clear
+    """
+    result = _detect_without_llm(message, has_attachment)
     
-    if message_lower.startswith("/upload"):
-        description = message[8:].strip() if len(message) > 8 else ""
-        return {
-            "intent": "upload_text" if description else "upload_file",
-            "confidence": 1.0,
-            "extracted_data": {
-                "blob_id": None,
-                "url": None,
-                "description": description if description else None
-            }
-        }
+    if result is None and SPECULATIVE_CLARIFICATION and message.strip():
+        clarification = asyncio.ensure_future(_request_clarification(message))
+        speculation.started += 1
+        try:
+            result = await _detect_with_llm(message)
+        except BaseException:
+            clarification.cancel()
+            raise
+        
+        if needs_clarification(result):
+            text, tokens = await clarification
+            speculation.used += 1
+            speculation.used_tokens += tokens
+            return result, text
+        
+        if clarification.done():
+            speculation.discarded += 1
+            speculation.wasted_tokens += clarification.result()[1]
+        else:
+            clarification.cancel()
+            speculation.cancelled += 1
+            speculation.wasted_tokens += CLARIFICATION_MAX_TOKENS
+        return result, None
     
-    if message_lower.startswith(("/help", "/?", "help")):
-        return {
-            "intent": "help",
-            "confidence": 1.0,
-            "extracted_data": {
-                "blob_id": None,
-                "url": None,
-                "description": None
-            }
-        }
+    if result is None:
+        result = await _detect_with_llm(message)
+    if needs_clarification(result) and message.strip():
+        return result, await generate_clarification_message(message)
+    return result, None
+
+
+def _detect_without_llm(message: str, has_attachment: bool) -> Optional[Dict[str, Any]]:
+    """Classify a message by attachment, rules, the intent cache or the offline classifier, if any is confident."""
+    # If there's an attachment, it's definitely an upload
+    if has_attachment:
+        return intent_result("upload_file", 1.0, description=message.strip() or None)
     
-    if message_lower.startswith(("/list", "/blobs", "list")):
-        return {
-            "intent": "list_blobs",
-            "confidence": 1.0,
-            "extracted_data": {
-                "blob_id": None,
-                "url": None,
-                "description": None
-            }
-        }
+    # Commands, URLs, blob IDs and common phrasings are matched by precompiled rules
+    result = intent_rules.match(message)
+    if result is not None:
+        return result
     
-    # Check for URLs
-    if message.strip().startswith(("http://", "https://")):
-        return {
-            "intent": "upload_file",
-            "confidence": 0.95,
-            "extracted_data": {
-                "blob_id": None,
-                "url": message.strip(),
-                "description": None
-            }
-        }
+    # Messages phrased like an earlier one reuse its classification
+    result = intent_cache.get(message)
+    if result is not None:
+        return result
     
-    # Check for blob IDs (alphanumeric strings that look like blob IDs)
-    import re
-    blob_id_pattern = r'^[A-Za-z0-9_-]{20,}$'
-    if re.match(blob_id_pattern, message.strip()):
-        return {
-            "intent": "download_blob",
-            "confidence": 0.95,
-            "extracted_data": {
-                "blob_id": message.strip(),
-                "url": None,
-                "description": None
-            }
-        }
+    # Confident predictions of the offline classifier skip the LLM
+    if local_classifier is not None:
+        local = local_classifier.classify(message, LOCAL_INTENT_THRESHOLD)
+        if local is not None:
+            return _local_result(message, *local)
     
-    # Check for "download" followed by blob ID
-    download_pattern = r'^download\s+([A-Za-z0-9_-]{20,})$'
-    download_match = re.match(download_pattern, message.strip(), re.IGNORECASE)
-    if download_match:
-        return {
-            "intent": "download_blob",
-            "confidence": 0.98,
-            "extracted_data": {
-                "blob_id": download_match.group(1),
-                "url": None,
-                "description": None
-            }
-        }
+    return None
+
+
+async def _detect_with_llm(message: str) -> Dict[str, Any]:
+    """Classify a message with the LLM, falling back to heuristics when the call fails."""
+    intent_rules.record_llm_fallback()
+    if llm_batcher is not None:
+        result = await llm_batcher.classify(message)
+    else:
+        result = await classify_with_llm(message)
+    if result is not None:
+        intent_cache.put(message, result)
+        return result
     
-    # Use OpenAI GPT-4 for more complex intent detection
+    message_lower = message.lower().strip()
+    
+    # Fallback: if message is short and looks like text, assume upload_text
+    if len(message.strip()) < 100 and not any(word in message_lower for word in ["download", "get", "fetch", "retrieve"]):
+        return intent_result("upload_text", 0.7)
+    
+    # Default to unknown
+    return intent_result("unknown", 0.5)
+
+
+def _local_result(message: str, intent: str, confidence: float) -> Dict[str, Any]:
+    """Intent result for an offline prediction, with the message's first URL and blob ID extracted."""
+    _, found = normalize_message(message)
+    url = next((value for name, value in found if name.startswith("__url")), None)
+    blob_id = next((value for name, value in found if name.startswith("__blob")), None)
+    return intent_result(intent, confidence, blob_id=blob_id, url=url)
+
+
+async def classify_with_llm(message: str) -> Optional[Dict[str, Any]]:
+    """Classify a message with GPT-4o; None when the call fails or the reply is not JSON."""
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o",  # Upgraded to GPT-4
             messages=[
                 {"role": "system", "content": INTENT_SYSTEM_PROMPT},
@@ -199,42 +291,58 @@ def detect_intent(message: str, has_attachment: bool = False) -> Dict[str, Any]:
         
         # Parse the response
         content = response.choices[0].message.content
-        import json
         try:
-            result = json.loads(content)
-            return result
+            return json.loads(content)
         except json.JSONDecodeError:
             # Fallback if JSON parsing fails
-            pass
+            return None
             
     except Exception as e:
         print(f"OpenAI intent detection failed: {e}")
+        return None
+
+
+async def classify_batch_with_llm(messages: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Classify several messages with one GPT-4o request, returning one result (or None) per message.
     
-    # Fallback: if message is short and looks like text, assume upload_text
-    if len(message.strip()) < 100 and not any(word in message_lower for word in ["download", "get", "fetch", "retrieve"]):
-        return {
-            "intent": "upload_text",
-            "confidence": 0.7,
-            "extracted_data": {
-                "blob_id": None,
-                "url": None,
-                "description": None
-            }
-        }
+    If the reply does not hold exactly one result per message, each message is
+    classified on its own instead.
+    """
+    if len(messages) == 1:
+        return [await classify_with_llm(messages[0])]
     
-    # Default to unknown
-    return {
-        "intent": "unknown",
-        "confidence": 0.5,
-        "extracted_data": {
-            "blob_id": None,
-            "url": None,
-            "description": None
-        }
-    }
+    try:
+        response = await client.chat.completions.create(
+            model="gpt-4o",
+            messages=[
+                {"role": "system", "content": INTENT_BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Analyze these messages: {json.dumps(messages)}"}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            max_tokens=120 * len(messages) + 50
+        )
+    except Exception as e:
+        print(f"OpenAI batch intent detection failed: {e}")
+        return [None] * len(messages)
+    
+    try:
+        results = json.loads(response.choices[0].message.content)["results"]
+        if isinstance(results, list) and len(results) == len(messages) and all(isinstance(r, dict) for r in results):
+            return results
+    except (json.JSONDecodeError, KeyError, TypeError):
+        pass
+    print(f"OpenAI batch intent detection returned a malformed reply, classifying {len(messages)} messages one by one")
+    return list(await asyncio.gather(*(classify_with_llm(message) for message in messages)))
+
+
+llm_batcher = (
+    IntentBatcher(classify_batch_with_llm, INTENT_BATCH_WINDOW_MS / 1000, INTENT_BATCH_MAX) if INTENT_BATCHING else None
+)
 
 
-def generate_clarification_message(user_message: str) -> str:
+async def generate_clarification_message(user_message: str) -> str:
     """
     Generate a clarification message when user intent is unclear.
     
@@ -244,23 +352,33 @@ def generate_clarification_message(user_message: str) -> str:
     Returns:
         A helpful clarification message
     """
+    text, _ = await _request_clarification(user_message)
+    return text
+
+
+async def _request_clarification(user_message: str) -> Tuple[str, int]:
+    """Generate a clarification message; returns it with the tokens the call used."""
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o",  # Using GPT-4 for better clarification
             messages=[
                 {"role": "system", "content": CLARIFICATION_SYSTEM_PROMPT},
                 {"role": "user", "content": f"User message: '{user_message}'\n\nGenerate a clarification message."}
             ],
             temperature=0.7,
-            max_tokens=300
+            max_tokens=CLARIFICATION_MAX_TOKENS
         )
         
-        return response.choices[0].message.content.strip()
+        tokens = response.usage.total_tokens if response.usage else 0
+        return response.choices[0].message.content.strip(), tokens
         
     except Exception as e:
         print(f"Failed to generate clarification message: {e}")
         # Fallback clarification message
-        return """🤔 I'm not quite sure what you'd like me to do!
+        return FALLBACK_CLARIFICATION, 0
+
+
+FALLBACK_CLARIFICATION = """🤔 I'm not quite sure what you'd like me to do!
 
 I can help you with:
 • 📤 **Upload files** - Attach a file or send me a URL
@@ -291,11 +409,13 @@ def get_help_message() -> str:
 
 **Other Commands:**
 • `/help` - Show this help message
-• `/list` - List your blobs (coming soon)
+• `/list [page]` - List the blobs you uploaded, newest first, with their ID, type, size, upload time and description; add a page number (e.g. `/list 2`) for older ones
 
 **Examples:**
 • `https://example.com/file.mp3` - Upload from URL
 • `Hello world!` - Upload as text blob
 • `/download Y3XBOEfW77JAon9Kl-pRDy0kRWTgqjxzjYEv0yMfO24` - Download blob
+• `/list 2` - Show the second page of your uploads
+
+The agent will automatically detect your intent and perform the appropriate operation! 🚀""" 
 
-The agent will automatically detect your intent and perform the appropriate operation! 🚀""" 
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Rule-based intent classification for the Walrus agent.
+
+Commands, URLs, blob IDs and common "download X" / "upload X" / "list my
+blobs" phrasings are recognised by rules compiled once at import, so most
+messages are classified in microseconds. Only messages no rule matches are
+sent to the LLM. Counters record how often each rule fires versus how often
+the LLM is needed.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+BLOB_ID = r"[A-Za-z0-9_-]{20,}(?::\d+:\d+)?"
+URL = r"https?://\S+"
+
+# Keyword rules only apply to short messages; longer ones are likely content to upload
+KEYWORD_MAX_TOKENS = 8
+
+# Messages naming another action ("upload my files", "delete my blobs") are
+# never classified by keyword; the nouns alone say nothing about the intent
+ACTION_VERBS = frozenset({
+    "upload", "download", "store", "save", "delete", "remove", "erase", "fetch", "retrieve",
+    "send", "share", "rename", "put", "add",
+})
+
+# Words that ask to see something, required by the list rules
+LIST_WORDS = frozenset({"list", "show", "see", "view", "display", "overview", "page", "what", "which"})
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def intent_result(intent: str, confidence: float, blob_id: Optional[str] = None,
+                  url: Optional[str] = None, description: Optional[str] = None) -> Dict[str, Any]:
+    """Build an intent result in the shape detect_intent returns."""
+    return {
+        "intent": intent,
+        "confidence": confidence,
+        "extracted_data": {
+            "blob_id": blob_id,
+            "url": url,
+            "description": description,
+        },
+    }
+
+
+def _download(match: "re.Match") -> Dict[str, Any]:
+    return intent_result("download_blob", 1.0, blob_id=match.group(1).strip() or None)
+
+
+def _upload(match: "re.Match") -> Dict[str, Any]:
+    description = match.group(1).strip()
+    return intent_result("upload_text" if description else "upload_file", 1.0, description=description or None)
+
+
+def _fixed(intent: str, confidence: float = 1.0) -> Callable[["re.Match"], Dict[str, Any]]:
+    return lambda match: intent_result(intent, confidence)
+
+
+# Explicit commands, checked by prefix on the lowercased message. The handler
+# gets a match of the pattern against the original message.
+COMMANDS: Tuple[Tuple[Tuple[str, ...], "re.Pattern", Callable[["re.Match"], Dict[str, Any]]], ...] = (
+    (("/download",), re.compile(r"^/download\b\s*(.*)$", re.IGNORECASE | re.DOTALL), _download),
+    (("/upload",), re.compile(r"^/upload\b\s*(.*)$", re.IGNORECASE | re.DOTALL), _upload),
+    # Bare "help" and "list" only count as commands on their own, not as the start of "listen to ..."
+    (("/help", "/?", "help"), re.compile(r"^(?:/help\b.*|/\?.*|help[\s!?.]*)$", re.IGNORECASE | re.DOTALL),
+     _fixed("help")),
+    (("/list", "/blobs", "list"), re.compile(r"^(?:/list\b.*|/blobs\b.*|list(?:\s+\d+)?)$", re.IGNORECASE | re.DOTALL),
+     _fixed("list_blobs")),
+)
+
+
+@dataclass(frozen=True)
+class PatternRule:
+    """A precompiled regex over the whole (stripped) message."""
+    name: str
+    pattern: "re.Pattern"
+    build: Callable[["re.Match"], Dict[str, Any]]
+
+
+# Checked in order after the command prefixes
+PATTERNS = (
+    PatternRule("url", re.compile(rf"^({URL})$"),
+                lambda m: intent_result("upload_file", 0.95, url=m.group(1))),
+    PatternRule("blob_id", re.compile(rf"^({BLOB_ID})$"),
+                lambda m: intent_result("download_blob", 0.95, blob_id=m.group(1))),
+    PatternRule("download_phrase", re.compile(
+        rf"^(?:please\s+)?(?:download|get|fetch|retrieve)\s+(?:the\s+)?(?:blob\s+|file\s+)?(?:id\s+)?:?\s*({BLOB_ID})$",
+        re.IGNORECASE), lambda m: intent_result("download_blob", 0.98, blob_id=m.group(1))),
+    PatternRule("upload_url_phrase", re.compile(
+        rf"^(?:please\s+)?(?:upload|store|save)\s+(?:this\s+|the\s+)?(?:file\s+)?(?:from\s+)?({URL})$",
+        re.IGNORECASE), lambda m: intent_result("upload_file", 0.95, url=m.group(1))),
+    # The text follows a colon or is at least two words, so "upload this text please" is not a text of "please"
+    PatternRule("upload_text_phrase", re.compile(
+        r"^(?:please\s+)?(?:upload|store|save)\s+(?:this\s+|the\s+following\s+)?text"
+        r"(?:\s*:\s*(\S.*)|\s+(\S+\s+\S.*))$",
+        re.IGNORECASE | re.DOTALL),
+        lambda m: intent_result("upload_text", 0.95, description=(m.group(1) or m.group(2)).strip())),
+)
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    """
+    Fires when every keyword, and at least one of `any_of` (if given), appears
+    among the message's tokens and no ACTION_VERBS do.
+    """
+    name: str
+    keywords: FrozenSet[str]
+    intent: str
+    confidence: float = 0.9
+    any_of: FrozenSet[str] = frozenset()
+
+
+KEYWORDS = (
+    KeywordRule("list_my_blobs", frozenset({"my", "blobs"}), "list_blobs", any_of=LIST_WORDS),
+    KeywordRule("list_my_files", frozenset({"my", "files"}), "list_blobs", any_of=LIST_WORDS),
+    KeywordRule("list_my_uploads", frozenset({"my", "uploads"}), "list_blobs", any_of=LIST_WORDS),
+    KeywordRule("show_blobs", frozenset({"show", "blobs"}), "list_blobs"),
+    KeywordRule("what_can_you_do", frozenset({"what", "can", "you", "do"}), "help"),
+    KeywordRule("how_does_it_work", frozenset({"how", "does", "work"}), "help"),
+    KeywordRule("which_commands", frozenset({"commands"}), "help", 0.8,
+                any_of=frozenset({"what", "which", "show", "list", "available"})),
+)
+
+
+class IntentRules:
+    """Compiled rule engine with per-rule hit counters and an LLM fallback counter."""
+
+    def __init__(self, commands=COMMANDS, patterns=PATTERNS, keywords=KEYWORDS):
+        self._commands = commands
+        self._patterns = patterns
+        self._keywords = keywords
+        # All command prefixes in one tuple for a single startswith() check
+        self._command_prefixes = tuple(prefix for prefixes, _, _ in commands for prefix in prefixes)
+        self.rule_hits: Dict[str, int] = {}
+        self.llm_fallbacks = 0
+
+    def _hit(self, name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        self.rule_hits[name] = self.rule_hits.get(name, 0) + 1
+        return result
+
+    def match(self, message: str) -> Optional[Dict[str, Any]]:
+        """Classify a message by rule, or return None when the LLM is needed."""
+        text = message.strip()
+        lowered = text.lower()
+
+        if lowered.startswith(self._command_prefixes):
+            for prefixes, pattern, build in self._commands:
+                if lowered.startswith(prefixes):
+                    match = pattern.match(text)
+                    if match:
+                        return self._hit(f"command:{prefixes[0]}", build(match))
+
+        for rule in self._patterns:
+            match = rule.pattern.match(text)
+            if match:
+                return self._hit(rule.name, rule.build(match))
+
+        tokens = _TOKEN_RE.findall(lowered)
+        if 0 < len(tokens) <= KEYWORD_MAX_TOKENS:
+            token_set = set(tokens)
+            if token_set & ACTION_VERBS:
+                return None
+            for rule in self._keywords:
+                if rule.keywords <= token_set and (not rule.any_of or rule.any_of & token_set):
+                    return self._hit(rule.name, intent_result(rule.intent, rule.confidence))
+        return None
+
+    def record_llm_fallback(self) -> None:
+        self.llm_fallbacks += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Rule hits, LLM fallbacks and the share of messages classified by rule."""
+        hits = sum(self.rule_hits.values())
+        total = hits + self.llm_fallbacks
+        return {
+            "rule_hits": hits,
+            "llm_fallbacks": self.llm_fallbacks,
+            "hit_rate": hits / total if total else 0.0,
+            "hits_by_rule": dict(self.rule_hits),
+        }
@@ -0,0 +1,141 @@
+"""
+Offline intent classifier for the Walrus agent.
+
+Messages are turned into hashed bag-of-n-gram vectors (word unigrams and
+bigrams plus character trigrams, with URLs and blob IDs collapsed into
+placeholder tokens) and scored by a multinomial logistic regression trained
+with NumPy. The model is trained offline with train_intent_model.py, which
+writes its weights to an .npz file; the agent only loads that file, so nothing
+is trained at startup. No network access is needed for training or prediction.
+
+Requirements
+------------
+pip install numpy
+"""
+
+import json
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from intent_cache import normalize_message
+
+# Number of hashed feature buckets
+FEATURE_DIM = 2 ** 14
+
+# Where train_intent_model.py saves the model and the agent loads it from by default
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_model.npz")
+
+_NUMBERED_PLACEHOLDER_RE = re.compile(r"__(url|blob)\d+__")
+
+
+def _ngrams(message: str) -> List[str]:
+    key, _ = normalize_message(message)
+    key = _NUMBERED_PLACEHOLDER_RE.sub(r"__\1__", key)
+    words = key.split()
+    grams = [f"w:{w}" for w in words]
+    grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    padded = f" {key} "
+    grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return grams
+
+
+def featurize(message: str, dim: int = FEATURE_DIM) -> np.ndarray:
+    """Hashed, L2-normalized n-gram counts of one message."""
+    indices = np.fromiter((zlib.crc32(gram.encode("utf-8")) % dim for gram in _ngrams(message)), dtype=np.int64)
+    vector = np.bincount(indices, minlength=dim).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def featurize_all(messages: Iterable[str], dim: int = FEATURE_DIM) -> np.ndarray:
+    return np.stack([featurize(message, dim) for message in messages])
+
+
+def load_examples(path: str) -> Tuple[List[str], List[str]]:
+    """Read a JSON-lines file of {"text": ..., "intent": ...} examples."""
+    texts, intents = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                example = json.loads(line)
+                texts.append(example["text"])
+                intents.append(example["intent"])
+    return texts, intents
+
+
+class LocalIntentClassifier:
+    """Softmax regression over hashed n-gram features."""
+
+    def __init__(self, labels: Sequence[str], weights: np.ndarray, bias: np.ndarray):
+        self.labels = list(labels)
+        self.weights = weights
+        self.bias = bias
+        self.hits = 0
+        self.abstentions = 0
+
+    @classmethod
+    def train(cls, texts: Sequence[str], intents: Sequence[str], epochs: int = 300,
+              learning_rate: float = 5.0, l2: float = 1e-4, dim: int = FEATURE_DIM) -> "LocalIntentClassifier":
+        """Fit the model with full-batch gradient descent on the cross-entropy loss."""
+        labels = sorted(set(intents))
+        X = featurize_all(texts, dim)
+        Y = np.zeros((len(texts), len(labels)), dtype=np.float32)
+        Y[np.arange(len(texts)), [labels.index(intent) for intent in intents]] = 1.0
+
+        weights = np.zeros((dim, len(labels)), dtype=np.float32)
+        bias = np.zeros(len(labels), dtype=np.float32)
+        for _ in range(epochs):
+            error = (_softmax(X @ weights + bias) - Y) / len(texts)
+            weights -= learning_rate * (X.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        return cls(labels, weights, bias)
+
+    @classmethod
+    def load(cls, path: str) -> "LocalIntentClassifier":
+        with np.load(path) as data:
+            return cls([str(label) for label in data["labels"]], data["weights"], data["bias"])
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, labels=np.array(self.labels), weights=self.weights, bias=self.bias)
+
+    def predict_proba(self, message: str) -> Dict[str, float]:
+        """Probability of each intent for one message."""
+        probs = _softmax(featurize(message, self.weights.shape[0]) @ self.weights + self.bias)
+        return dict(zip(self.labels, probs.tolist()))
+
+    def predict(self, message: str) -> Tuple[str, float]:
+        """Most likely intent and its probability."""
+        probs = _softmax(featurize(message, self.weights.shape[0]) @ self.weights + self.bias)
+        best = int(np.argmax(probs))
+        return self.labels[best], float(probs[best])
+
+    def classify(self, message: str, threshold: float) -> Optional[Tuple[str, float]]:
+        """Return (intent, confidence) when confident enough, otherwise None and count an abstention."""
+        intent, confidence = self.predict(message)
+        if confidence < threshold:
+            self.abstentions += 1
+            return None
+        self.hits += 1
+        return intent, confidence
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "abstentions": self.abstentions}
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+def load_model(model_path: str) -> Optional[LocalIntentClassifier]:
+    """Load the weights saved by train_intent_model.py, or None if there are none."""
+    try:
+        return LocalIntentClassifier.load(model_path)
+    except FileNotFoundError:
+        print(f"[walrus-agent] No intent model at {model_path}; run train_intent_model.py to create it. "
+              "The local intent classifier is disabled.")
+        return None
@@ -0,0 +1,125 @@
+"""
+Magic-byte MIME sniffing for Walrus blobs.
+
+Only the first SNIFF_BYTES of a blob are needed, so streaming downloads can be
+classified from their first chunk before the rest of the body is transferred.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Number of leading bytes the sniffer looks at
+SNIFF_BYTES = 64
+
+DEFAULT_MIME_TYPE = "application/octet-stream"
+
+
+def _refine_riff(prefix: bytes) -> Optional[str]:
+    form_type = prefix[8:12]
+    if form_type == b"WAVE":
+        return "audio/wav"
+    if form_type == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _refine_ogg(prefix: bytes) -> str:
+    # The first page carries the codec identification header
+    if b"OpusHead" in prefix or b"\x01vorbis" in prefix or b"\x7fFLAC" in prefix:
+        return "audio/ogg"
+    if b"\x80theora" in prefix:
+        return "video/ogg"
+    return "application/ogg"
+
+
+def _refine_ftyp(prefix: bytes) -> str:
+    brand = prefix[8:12]
+    if brand in (b"M4A ", b"M4B ", b"M4P "):
+        return "audio/mp4"
+    if brand == b"qt  ":
+        return "video/quicktime"
+    return "video/mp4"
+
+
+def _refine_ebml(prefix: bytes) -> str:
+    # The EBML header names the DocType ("webm" or "matroska")
+    if b"webm" in prefix:
+        return "audio/webm"
+    return "video/x-matroska"
+
+
+@dataclass(frozen=True)
+class Signature:
+    """Magic bytes expected at `offset`, mapping to a MIME type or a refinement."""
+    offset: int
+    magic: bytes
+    mime_type: Optional[str] = None
+    refine: Optional[Callable[[bytes], Optional[str]]] = None
+
+
+# Checked in order; the first signature whose magic matches wins
+SIGNATURES = (
+    Signature(0, b"ID3", "audio/mpeg"),
+    Signature(0, b"RIFF", refine=_refine_riff),
+    Signature(0, b"OggS", refine=_refine_ogg),
+    Signature(0, b"fLaC", "audio/flac"),
+    Signature(4, b"ftyp", refine=_refine_ftyp),
+    Signature(0, b"\x1a\x45\xdf\xa3", refine=_refine_ebml),
+    Signature(0, b"%PDF-", "application/pdf"),
+    Signature(0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    Signature(0, b"\xff\xd8\xff", "image/jpeg"),
+    Signature(0, b"GIF87a", "image/gif"),
+    Signature(0, b"GIF89a", "image/gif"),
+)
+
+
+def _sniff_mpeg_audio(prefix: bytes) -> Optional[str]:
+    """Recognise a raw MPEG audio frame or AAC ADTS header (11/12-bit sync word)."""
+    if len(prefix) < 2 or prefix[0] != 0xFF:
+        return None
+    if prefix[1] & 0xF6 == 0xF0:
+        return "audio/aac"
+    if prefix[1] & 0xE0 == 0xE0 and prefix[1] & 0x06:
+        return "audio/mpeg"
+    return None
+
+
+def _sniff_text(prefix: bytes) -> Optional[str]:
+    """Recognise JSON or UTF-8 text, tolerating a multi-byte character cut off at the end."""
+    if prefix.startswith(b"\xef\xbb\xbf"):
+        prefix = prefix[3:]
+
+    text = None
+    for cut in range(4):
+        try:
+            text = prefix[:len(prefix) - cut].decode("utf-8")
+            break
+        except UnicodeDecodeError:
+            continue
+    if not text:
+        return None
+
+    if any(ord(ch) < 32 and ch not in "\t\n\r\f" for ch in text):
+        return None
+
+    if text.lstrip()[:1] in ("{", "["):
+        return "application/json"
+    return "text/plain"
+
+
+def sniff_mime_type(prefix: bytes) -> str:
+    """Classify a blob from its first SNIFF_BYTES bytes."""
+    prefix = prefix[:SNIFF_BYTES]
+
+    for signature in SIGNATURES:
+        if prefix[signature.offset:signature.offset + len(signature.magic)] == signature.magic:
+            mime_type = signature.refine(prefix) if signature.refine else signature.mime_type
+            if mime_type:
+                return mime_type
+
+    return _sniff_mpeg_audio(prefix) or _sniff_text(prefix) or DEFAULT_MIME_TYPE
+
+
+def is_audio_mime(mime_type: str) -> bool:
+    """Whether a MIME type is something the voice-to-text agent can transcribe."""
+    return mime_type.startswith("audio/")
@@ -0,0 +1,51 @@
+"""
+Progress updates for long-running chat operations.
+
+Operations take an optional `progress` callback, an async function sending a
+short status line to the user (the chat protocol wraps it in a ChatMessage).
+Stage changes are reported as they happen; byte counts during a transfer are
+throttled so a large upload does not flood the chat.
+"""
+
+import time
+from typing import Awaitable, Callable, Optional
+
+from results import format_size
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+
+async def report(progress: Optional[ProgressCallback], text: str) -> None:
+    """Send a status line if a progress callback is set; a failed send never fails the operation."""
+    if progress is None:
+        return
+    try:
+        await progress(text)
+    except Exception as exc:
+        print(f"[walrus-agent] Could not send progress update: {exc}")
+
+
+class TransferProgress:
+    """Reports bytes transferred at most once every `interval` seconds."""
+
+    def __init__(self, progress: Optional[ProgressCallback], label: str, total: Optional[int] = None,
+                 interval: float = 2.0):
+        self._progress = progress
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self._last_report = time.monotonic()
+
+    async def update(self, transferred: int) -> None:
+        if self._progress is None:
+            return
+        now = time.monotonic()
+        if now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        if self.total:
+            percent = min(100, transferred * 100 // self.total)
+            await report(self._progress, f"⏳ {self.label}: {format_size(transferred)} of "
+                                         f"{format_size(self.total)} ({percent}%)")
+        else:
+            await report(self._progress, f"⏳ {self.label}: {format_size(transferred)}")
@@ -0,0 +1,167 @@
+"""
+Typed results returned by the Walrus operations.
+
+Operations return these objects so REST and agent-to-agent handlers can read
+fields directly; markdown is rendered only when replying over chat.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from blob_catalog import CatalogEntry
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a byte count for display."""
+    if num_bytes > 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.1f} MB"
+    if num_bytes > 1024:
+        return f"{num_bytes / 1024:.1f} KB"
+    return f"{num_bytes} bytes"
+
+
+@dataclass
+class UploadResult:
+    """Outcome of uploading a file, URL or text to Walrus."""
+    success: bool
+    blob_id: str = ""
+    blob_url: str = ""
+    size: int = 0
+    kind: str = "file"  # "file" or "text"
+    mime_type: str = ""
+    sha256: str = ""
+    deduplicated: bool = False
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    def to_markdown(self) -> str:
+        if not self.success:
+            title = "Text Upload Failed" if self.kind == "text" else "Upload Failed"
+            return f"""❌ **{title}**
+
+Error: {self.error}"""
+
+        label = "Text" if self.kind == "text" else "File"
+        return f"""✅ **{label} Uploaded Successfully!**
+
+📋 **Details:**
+• **Blob ID:** `{self.blob_id}`
+• **View at:** {self.blob_url}"""
+
+
+@dataclass
+class TranscriptionResult:
+    """Outcome of a transcription request to the voice-to-text agent."""
+    success: bool
+    transcript: str = ""
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    def to_markdown(self) -> str:
+        if self.success:
+            return f"""📝 **Transcription Complete!**
+
+{self.transcript}"""
+        return f"""❌ **Transcription Failed**
+
+Error: {self.error}"""
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of downloading a blob, with its transcription for audio blobs."""
+    success: bool
+    blob_id: str
+    size: int = 0
+    mime_type: str = ""
+    is_audio: bool = False
+    transcription: Optional[TranscriptionResult] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    def to_markdown(self) -> str:
+        if not self.success:
+            return f"❌ **Download Failed**\n\nError: {self.error}"
+
+        text = f"""✅ **Blob Downloaded Successfully!**
+
+📋 **Details:**
+• **Blob ID:** `{self.blob_id}`
+• **File Size:** {format_size(self.size)}
+• **MIME Type:** {self.mime_type}"""
+
+        if self.is_audio and self.transcription is not None:
+            text += f"""
+
+🎵 **Audio File Detected!**
+Requesting transcription...
+
+{self.transcription.to_markdown()}"""
+        return text
+
+
+@dataclass
+class BlobMetadata:
+    """Size and MIME type of a blob, looked up without downloading its body."""
+    success: bool
+    blob_id: str
+    size: Optional[int] = None
+    mime_type: str = ""
+    chunked: bool = False
+    encoding: Optional[str] = None  # "gzip" or "zstd" when stored compressed
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    def to_markdown(self) -> str:
+        if not self.success:
+            return f"❌ **Metadata Lookup Failed**\n\nError: {self.error}"
+
+        size = format_size(self.size) if self.size is not None else "unknown"
+        return f"""📋 **Blob Metadata**
+• **Blob ID:** `{self.blob_id}`
+• **File Size:** {size}
+• **MIME Type:** {self.mime_type}"""
+
+
+@dataclass
+class BlobListResult:
+    """One page of the blobs a sender uploaded, newest first."""
+    entries: List[CatalogEntry] = field(default_factory=list)
+    page: int = 1
+    page_size: int = 10
+    total: int = 0
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.total // self.page_size))
+
+    def to_markdown(self) -> str:
+        if not self.total:
+            return "📋 **No blobs yet.** Attach a file or send some text to upload your first blob!"
+        if not self.entries:
+            return f"📋 Page {self.page} is empty. You have {self.pages} page(s) of blobs."
+
+        lines = [f"📋 **Your Blobs** (page {self.page} of {self.pages}, {self.total} total)", ""]
+        for entry in self.entries:
+            uploaded = datetime.fromtimestamp(entry.created_at, tz=timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+            line = f"• `{entry.blob_id}` - {entry.mime_type}, {format_size(entry.size)}, {uploaded}"
+            if entry.description:
+                line += f" - {entry.description}"
+            lines.append(line)
+        if self.page < self.pages:
+            lines += ["", f"Send `/list {self.page + 1}` for the next page."]
+        return "\n".join(lines)
+
+
+@dataclass
+class OperationError:
+    """A request that could not be turned into an operation."""
+    title: str
+    message: str
+    success: bool = False
+
+    def to_markdown(self) -> str:
+        return f"""❌ **{self.title}**
+
+{self.message}"""
@@ -3,7 +3,7 @@ Shared models for agent-to-agent communication.
 """
 
 from uagents import Model
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 
 class AudioTranscriptionRequest(Model):
@@ -28,6 +28,20 @@ class BlobDownloadRequest(Model):
     request_id: str
 
 
+class BlobRangeRequest(Model):
+    """
+    Request model for downloading a byte range of a blob; `length` None reads to the end.
+
+    A separate model rather than new fields on BlobDownloadRequest, whose
+    schema digest deployed peers already match on. Answered with a
+    BlobDownloadResponse.
+    """
+    blob_id: str
+    request_id: str
+    offset: int = 0
+    length: Optional[int] = None
+
+
 class BlobDownloadResponse(Model):
     """Response model for blob download."""
     blob_data_base64: str  # Base64 encoded blob data
@@ -38,6 +52,22 @@ class BlobDownloadResponse(Model):
     error_message: Optional[str] = None
 
 
+class BlobMetadataRequest(Model):
+    """Request model for looking up a blob's size and MIME type without downloading it."""
+    blob_id: str
+
+
+class BlobMetadataResponse(Model):
+    """Response model for blob metadata."""
+    blob_id: str
+    size: Optional[int] = None
+    mime_type: str = ""
+    chunked: bool = False
+    encoding: Optional[str] = None
+    success: bool
+    error_message: Optional[str] = None
+
+
 class BlobUploadRequest(Model):
     """Request model for blob upload."""
     data_base64: str  # Base64 encoded data
@@ -93,4 +123,84 @@ class BlobTranscriptionResponse(Model):
     blob_id: str
     request_id: str
     success: bool
-    error_message: Optional[str] = None 
\ No newline at end of file
+    error_message: Optional[str] = None 
+
+
+class BatchUploadItem(Model):
+    """One item of a batch upload; set exactly one of data_base64, url or text."""
+    data_base64: Optional[str] = None  # Base64 encoded data
+    mime_type: Optional[str] = None
+    url: Optional[str] = None
+    text: Optional[str] = None
+    description: Optional[str] = None
+
+
+class BatchUploadRequest(Model):
+    """Request model for uploading several items in one call."""
+    items: List[BatchUploadItem]
+
+
+class BatchUploadResult(Model):
+    """Result for one item of a batch upload, in request order."""
+    index: int
+    blob_id: str
+    blob_url: str
+    success: bool
+    deduplicated: bool = False
+    error_message: Optional[str] = None
+
+
+class BatchUploadResponse(Model):
+    """Response model for batch upload."""
+    results: List[BatchUploadResult]
+    succeeded: int
+    failed: int
+
+
+class BatchDownloadRequest(Model):
+    """Request model for downloading several blobs in one call."""
+    blob_ids: List[str]
+    request_id: str
+
+
+class BatchDownloadResponse(Model):
+    """Response model for batch download; one BlobDownloadResponse per blob ID, in request order."""
+    results: List[BlobDownloadResponse]
+    request_id: str
+    succeeded: int
+    failed: int
+
+
+class IntentStatsResponse(Model):
+    """Response model for intent classification counters."""
+    rule_hits: int
+    llm_fallbacks: int
+    hit_rate: float
+    hits_by_rule: Dict[str, int]
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_hit_rate: float = 0.0
+    local_model_hits: int = 0
+    local_model_abstentions: int = 0
+    speculative_clarifications: Dict[str, int] = {}
+    llm_batches: int = 0
+    llm_batched_messages: int = 0
+
+
+class BlobCacheStatsResponse(Model):
+    """Response model for the local blob cache counters."""
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+
+class EndpointStatsResponse(Model):
+    """Response model for publisher/aggregator health and hedged read counters."""
+    publishers: List[Dict[str, Any]]
+    aggregators: List[Dict[str, Any]]
+    hedged_requests: int
+    hedge_wins: int
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+
+import pytest
+
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The agents are flat script directories sharing module names (results,
+# shared_models, config), so each test module is imported with its own agent
+# first on the path and without another agent's copies of those modules
+SHARED_MODULES = ("results", "shared_models", "config")
+
+
+def _use_agent_modules() -> None:
+    if AGENT_DIR in sys.path:
+        sys.path.remove(AGENT_DIR)
+    sys.path.insert(0, AGENT_DIR)
+    for name in SHARED_MODULES:
+        module = sys.modules.get(name)
+        if module is not None and os.path.dirname(os.path.abspath(getattr(module, "__file__", "") or "")) != AGENT_DIR:
+            del sys.modules[name]
+
+
+def pytest_pycollect_makemodule(module_path, parent):
+    _use_agent_modules()
+
+
+_use_agent_modules()
+
+# Keep the state created when walrus_operations is imported out of the source tree
+_STATE_DIR = tempfile.mkdtemp(prefix="walrus-agent-tests-")
+os.environ.setdefault("WALRUS_DATA_DIR", os.path.join(_STATE_DIR, "data"))
+os.environ.setdefault("WALRUS_CACHE_DIR", os.path.join(_STATE_DIR, "cache"))
+
+from async_walrus_client import WalrusRequestError  # noqa: E402
+
+
+class FakeContent:
+    def __init__(self, body: bytes):
+        self._body = body
+
+    async def iter_chunked(self, size: int):
+        for start in range(0, len(self._body), size):
+            yield self._body[start:start + size]
+
+
+class FakeResponse:
+    def __init__(self, body: bytes, status: int = 200, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.content_length = len(body)
+        self.content = FakeContent(body)
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+
+class FakeWalrusClient:
+    """
+    In-memory publisher and aggregator; aggregator reads honour byte ranges
+    like the real one, and blobs are stored for `storage_epochs` from `epoch`.
+    """
+
+    def __init__(self):
+        self.blobs = {}
+        self.end_epochs = {}
+        self.reads = []
+        self.ranges = []
+        self.puts = 0
+        self.epoch = 10
+        self.storage_epochs = 1
+
+    async def put_blob(self, data):
+        if not isinstance(data, (bytes, bytearray)):
+            data = b"".join([chunk async for chunk in data])
+        self.puts += 1
+        blob_id = hashlib.sha256(data).hexdigest()[:43]
+        if self.end_epochs.get(blob_id, 0) > self.epoch:
+            return {"alreadyCertified": {"blobId": blob_id, "endEpoch": self.end_epochs[blob_id]}}
+        self.blobs[blob_id] = bytes(data)
+        self.end_epochs[blob_id] = self.epoch + self.storage_epochs
+        return {"newlyCreated": {"blobObject": {
+            "blobId": blob_id,
+            "registeredEpoch": self.epoch,
+            "storage": {"startEpoch": self.epoch, "endEpoch": self.end_epochs[blob_id]},
+        }}}
+
+    @asynccontextmanager
+    async def open_blob(self, blob_id, byte_range=None):
+        self.reads.append(blob_id)
+        self.ranges.append(byte_range)
+        if blob_id not in self.blobs:
+            raise WalrusRequestError(f"Error retrieving blob {blob_id}: 404", status=404)
+        body = self.blobs[blob_id]
+        if byte_range is None:
+            yield FakeResponse(body)
+            return
+        first, last = byte_range
+        if first >= len(body):
+            raise WalrusRequestError(f"Error retrieving blob {blob_id}: 416", status=416)
+        last = len(body) - 1 if last is None else min(last, len(body) - 1)
+        yield FakeResponse(body[first:last + 1], 206, {"Content-Range": f"bytes {first}-{last}/{len(body)}"})
+
+
+@pytest.fixture
+def walrus_client():
+    return FakeWalrusClient()
+
+
+@pytest.fixture
+def walrus(monkeypatch, tmp_path, walrus_client):
+    """walrus_operations wired to the fake Walrus client and fresh local state."""
+    import walrus_operations
+    from blob_cache import BlobCache
+    from blob_catalog import BlobCatalog
+    from upload_index import UploadIndex
+
+    monkeypatch.setattr(walrus_operations, "client", walrus_client)
+    monkeypatch.setattr(walrus_operations, "blob_cache", BlobCache(str(tmp_path / "cache"), 64 * 1024 * 1024))
+    monkeypatch.setattr(walrus_operations, "upload_index", UploadIndex(str(tmp_path / "uploads.db")))
+    monkeypatch.setattr(walrus_operations, "blob_catalog", BlobCatalog(str(tmp_path / "catalog.db")))
+    monkeypatch.setattr(walrus_operations, "text_packer", None)
+    monkeypatch.setattr(walrus_operations, "_layouts", type(walrus_operations._layouts)())
+    return walrus_operations
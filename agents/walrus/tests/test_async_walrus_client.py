@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from async_walrus_client import AsyncWalrusClient, WalrusRequestError
+from endpoint_pool import Endpoint
+
+
+class FakeEndpoint:
+    """A publisher and aggregator on a local port; `delay` and `status` simulate a slow or failing one."""
+
+    def __init__(self, blobs: dict, delay: float = 0.0, status: int = None):
+        self.blobs = blobs
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        app = web.Application()
+        app.router.add_put("/v1/blobs", self._put)
+        app.router.add_get("/v1/blobs/{blob_id}", self._get)
+        self.server = TestServer(app)
+
+    @property
+    def url(self) -> str:
+        return str(self.server.make_url(""))
+
+    async def _answer(self, request: web.Request):
+        self.requests.append((request.method, request.headers.get("Range")))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.status is not None:
+            return web.json_response({"error": {"message": "unavailable"}}, status=self.status)
+        return None
+
+    async def _put(self, request: web.Request) -> web.Response:
+        # The body is read before failing, like a publisher that breaks mid-upload
+        data = await request.read()
+        failure = await self._answer(request)
+        if failure is not None:
+            return failure
+        blob_id = hashlib.sha256(data).hexdigest()[:43]
+        self.blobs[blob_id] = data
+        return web.json_response({"newlyCreated": {"blobObject": {"blobId": blob_id, "size": len(data)}}})
+
+    async def _get(self, request: web.Request) -> web.Response:
+        failure = await self._answer(request)
+        if failure is not None:
+            return failure
+        data = self.blobs.get(request.match_info["blob_id"])
+        if data is None:
+            return web.json_response({"error": {"message": "blob not found"}}, status=404)
+        if request.http_range.start is not None:
+            part = data[request.http_range]
+            return web.Response(body=part, status=206, headers={
+                "Content-Range": f"bytes {request.http_range.start}-{request.http_range.start + len(part) - 1}/{len(data)}"})
+        return web.Response(body=data)
+
+
+@asynccontextmanager
+async def walrus_endpoints(*endpoints: FakeEndpoint, **client_options):
+    """Start the endpoints and yield a client using all of them as publishers and aggregators."""
+    for endpoint in endpoints:
+        await endpoint.server.start_server()
+    urls = [endpoint.url for endpoint in endpoints]
+    client = AsyncWalrusClient(urls, urls, **client_options)
+    try:
+        yield client
+    finally:
+        await client.close()
+        for endpoint in endpoints:
+            await endpoint.server.close()
+
+
+async def _read(client: AsyncWalrusClient, blob_id: str, byte_range=None):
+    async with client.open_blob(blob_id, byte_range=byte_range) as response:
+        return response.status, await response.read()
+
+
+def test_put_and_read_back_over_one_session():
+    async def scenario():
+        async with walrus_endpoints(FakeEndpoint({})) as client:
+            stored = await client.put_blob(b"hello walrus")
+            blob_id = stored["newlyCreated"]["blobObject"]["blobId"]
+            session = client.http_session()
+
+            assert await _read(client, blob_id) == (200, b"hello walrus")
+            assert await _read(client, blob_id, (6, None)) == (206, b"walrus")
+            assert await _read(client, blob_id, (0, 4)) == (206, b"hello")
+            # Every request went through the same pooled session
+            assert client.http_session() is session
+
+    asyncio.run(scenario())
+
+
+def test_streamed_upload_is_relayed_chunk_by_chunk():
+    async def scenario():
+        async def chunks():
+            for piece in (b"streamed ", b"without ", b"buffering"):
+                yield piece
+
+        endpoint = FakeEndpoint({})
+        async with walrus_endpoints(endpoint) as client:
+            stored = await client.put_blob(chunks())
+            blob_id = stored["newlyCreated"]["blobObject"]["blobId"]
+            assert endpoint.blobs[blob_id] == b"streamed without buffering"
+
+    asyncio.run(scenario())
+
+
+def test_errors_carry_the_http_status():
+    async def scenario():
+        async with walrus_endpoints(FakeEndpoint({})) as client:
+            with pytest.raises(WalrusRequestError) as error:
+                await _read(client, "missing")
+            assert error.value.status == 404
+            assert "blob not found" in str(error.value)
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_downloads_are_capped():
+    async def scenario():
+        endpoint = FakeEndpoint({"blob": b"data"}, delay=0.05)
+        async with walrus_endpoints(endpoint, max_concurrent_downloads=2, hedged_reads=False) as client:
+            in_flight = 0
+            peak = 0
+
+            async def read():
+                nonlocal in_flight, peak
+                async with client.open_blob("blob") as response:
+                    in_flight += 1
+                    peak = max(peak, in_flight)
+                    await response.read()
+                    await asyncio.sleep(0.01)
+                    in_flight -= 1
+
+            await asyncio.gather(*(read() for _ in range(6)))
+            assert peak <= 2
+            assert len(endpoint.requests) == 6
+
+    asyncio.run(scenario())
+
+
+# Nothing listens here, so connections are refused before any body is sent
+DEAD_URL = "http://127.0.0.1:1"
+
+
+def _in_order(pool, urls):
+    """Make a pool try its endpoints in the given order instead of by weighted draw."""
+    by_url = {endpoint.url: endpoint for endpoint in pool.endpoints}
+    pool.candidates = lambda: [by_url[url.rstrip("/")] for url in urls]
+
+
+@asynccontextmanager
+async def ordered_client(*endpoints, urls=None, **client_options):
+    """Like walrus_endpoints, but endpoints are tried in order; `urls` may add unreachable ones."""
+    async with walrus_endpoints(*endpoints, **client_options) as client:
+        urls = [endpoint.url for endpoint in endpoints] if urls is None else urls(endpoints)
+        for pool in (client.publishers, client.aggregators):
+            known = {endpoint.url for endpoint in pool.endpoints}
+            pool.endpoints.extend(Endpoint(url) for url in urls if url.rstrip("/") not in known)
+            _in_order(pool, urls)
+        yield client
+
+
+def test_read_fails_over_to_the_next_aggregator():
+    async def scenario():
+        broken = FakeEndpoint({"blob": b"data"}, status=503)
+        healthy = FakeEndpoint(broken.blobs)
+        async with ordered_client(broken, healthy, hedged_reads=False) as client:
+            assert await _read(client, "blob") == (200, b"data")
+            assert len(broken.requests) == 1
+            stats = {entry["url"]: entry for entry in client.stats()["aggregators"]}
+            assert stats[broken.url.rstrip("/")]["failures"] == 1
+            assert stats[healthy.url.rstrip("/")]["failures"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_missing_blob_does_not_fail_over():
+    async def scenario():
+        first, second = FakeEndpoint({}), FakeEndpoint({})
+        async with ordered_client(first, second) as client:
+            with pytest.raises(WalrusRequestError) as error:
+                await _read(client, "missing")
+            assert error.value.status == 404
+            assert second.requests == []
+
+    asyncio.run(scenario())
+
+
+def test_slow_read_is_hedged_and_the_faster_answer_wins():
+    async def scenario():
+        slow = FakeEndpoint({"blob": b"data"}, delay=1.0)
+        fast = FakeEndpoint(slow.blobs)
+        async with ordered_client(slow, fast, initial_hedge_delay=0.05) as client:
+            started = asyncio.get_running_loop().time()
+            assert await _read(client, "blob") == (200, b"data")
+            assert asyncio.get_running_loop().time() - started < 0.9
+            stats = client.stats()
+            assert (stats["hedged_requests"], stats["hedge_wins"]) == (1, 1)
+            assert len(fast.requests) == 1
+
+    asyncio.run(scenario())
+
+
+def test_fast_read_is_not_hedged():
+    async def scenario():
+        first, second = FakeEndpoint({"blob": b"data"}), FakeEndpoint({})
+        async with ordered_client(first, second, initial_hedge_delay=0.5) as client:
+            assert await _read(client, "blob") == (200, b"data")
+            assert client.stats()["hedged_requests"] == 0
+            assert second.requests == []
+
+    asyncio.run(scenario())
+
+
+def test_uploads_fail_over_to_the_next_publisher():
+    async def scenario():
+        broken = FakeEndpoint({}, status=503)
+        healthy = FakeEndpoint({})
+        async with ordered_client(broken, healthy) as client:
+            stored = await client.put_blob(b"bytes are replayed")
+            assert stored["newlyCreated"]["blobObject"]["blobId"] in healthy.blobs
+
+    asyncio.run(scenario())
+
+
+def test_streamed_upload_fails_over_only_before_its_body_is_read():
+    async def chunks(*pieces):
+        for piece in pieces:
+            yield piece
+
+    async def scenario():
+        healthy = FakeEndpoint({})
+        async with ordered_client(healthy, urls=lambda endpoints: [DEAD_URL, endpoints[0].url]) as client:
+            stored = await client.put_blob(chunks(b"never ", b"sent twice"))
+            assert healthy.blobs[stored["newlyCreated"]["blobObject"]["blobId"]] == b"never sent twice"
+
+        broken = FakeEndpoint({}, status=503)
+        healthy = FakeEndpoint({})
+        async with ordered_client(broken, healthy) as client:
+            with pytest.raises(WalrusRequestError) as error:
+                await client.put_blob(chunks(b"consumed ", b"by the first publisher"))
+            assert error.value.status == 503
+            assert healthy.requests == []
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+from aiohttp.test_utils import TestClient, TestServer
+
+import binary_api
+
+PNG = b"\x89PNG\r\n\x1a\n" + os.urandom(5000)
+
+
+async def _request(method: str, path: str, **kwargs):
+    async with TestClient(TestServer(binary_api.create_app())) as http:
+        response = await http.request(method, path, **kwargs)
+        return response.status, response.headers, await response.read()
+
+
+def test_raw_upload_and_download_round_trip(walrus):
+    async def scenario():
+        status, headers, body = await _request("PUT", "/blobs", data=PNG,
+                                               headers={"Content-Type": "application/octet-stream",
+                                                        "X-Description": "a picture"})
+        assert status == 200
+        blob_id = headers["X-Blob-Id"]
+
+        status, headers, body = await _request("GET", f"/blobs/{blob_id}")
+        assert status == 200
+        assert body == PNG
+        assert headers["Content-Type"] == "image/png"
+        assert headers["Content-Length"] == str(len(PNG))
+        assert headers["Accept-Ranges"] == "bytes"
+
+        # The upload went into the catalog with its description
+        entries, total = walrus.blob_catalog.list()
+        assert total == 1
+        assert (entries[0].blob_id, entries[0].description) == (blob_id, "a picture")
+
+    asyncio.run(scenario())
+
+
+def test_head_reports_size_and_type_from_the_first_bytes(walrus, walrus_client):
+    async def scenario():
+        upload = await walrus._upload_resource(PNG, "image/png")
+        walrus_client.ranges.clear()
+
+        status, headers, body = await _request("HEAD", f"/blobs/{upload.blob_id}")
+        assert status == 200
+        assert body == b""
+        assert headers["Content-Length"] == str(len(PNG))
+        assert headers["Content-Type"] == "image/png"
+        assert headers["X-Blob-Id"] == upload.blob_id
+        # Only a prefix was requested from the aggregator, never the whole blob
+        assert walrus_client.ranges and None not in walrus_client.ranges
+
+    asyncio.run(scenario())
+
+
+def test_head_and_get_of_an_unknown_blob_are_404(walrus):
+    async def scenario():
+        status, _, _ = await _request("HEAD", "/blobs/does-not-exist")
+        assert status == 404
+        status, _, _ = await _request("GET", "/blobs/does-not-exist")
+        assert status == 404
+
+    asyncio.run(scenario())
+
+
+def test_range_of_a_compressed_blob_is_served_decompressed(walrus):
+    async def scenario():
+        text = ("walrus " * 2000).encode("utf-8")
+        upload = await walrus._upload_text(text.decode("utf-8"))
+        assert (await walrus._get_blob_metadata(upload.blob_id)).encoding == "gzip"
+
+        status, headers, _ = await _request("HEAD", f"/blobs/{upload.blob_id}")
+        assert headers["Content-Length"] == str(len(text))
+
+        status, headers, body = await _request("GET", f"/blobs/{upload.blob_id}", headers={"Range": "bytes=7-20"})
+        assert status == 206
+        assert headers["Content-Range"] == f"bytes 7-20/{len(text)}"
+        assert body == text[7:21]
+
+    asyncio.run(scenario())
+
+
+def test_oversized_upload_is_rejected(walrus, monkeypatch):
+    monkeypatch.setattr(walrus, "MAX_UPLOAD_BYTES", 1000)
+
+    async def scenario():
+        status, _, body = await _request("PUT", "/blobs", data=os.urandom(2000))
+        assert status == 413
+        assert b"maximum upload size" in body
+
+    asyncio.run(scenario())
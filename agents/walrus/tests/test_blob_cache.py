@@ -0,0 +1,92 @@
+import asyncio
+import os
+
+
+def _cache_counts(walrus):
+    stats = walrus.blob_cache.stats()
+    return stats["hits"], stats["misses"]
+
+
+def test_download_counts_one_miss_then_one_hit(walrus):
+    async def scenario():
+        upload = await walrus._upload_resource(os.urandom(3000), "application/octet-stream")
+        assert upload.success, upload.error
+
+        await walrus._download_blob_data(upload.blob_id)
+        assert _cache_counts(walrus) == (0, 1)
+
+        await walrus._download_blob_data(upload.blob_id)
+        assert _cache_counts(walrus) == (1, 1)
+
+        # Metadata lookups only probe the cache
+        await walrus._get_blob_metadata(upload.blob_id)
+        assert _cache_counts(walrus) == (1, 1)
+
+        await walrus._download_blob_data(upload.blob_id, offset=10, length=100)
+        assert _cache_counts(walrus) == (2, 1)
+
+    asyncio.run(scenario())
+
+
+def test_range_read_of_uncached_blob_counts_one_miss(walrus):
+    async def scenario():
+        upload = await walrus._upload_resource(os.urandom(3000), "application/octet-stream")
+        data, _ = await walrus._download_blob_data(upload.blob_id, offset=100, length=50)
+        assert len(data) == 50
+        # The layout probe and the range read are a single logical fetch
+        assert _cache_counts(walrus) == (0, 1)
+
+    asyncio.run(scenario())
+
+
+def test_chunked_download_counts_once(walrus, monkeypatch):
+    monkeypatch.setattr(walrus, "CHUNKED_UPLOAD_THRESHOLD", 2048)
+    monkeypatch.setattr(walrus.chunked_uploader, "part_size", 1024)
+
+    async def scenario():
+        payload = os.urandom(5000)
+        upload = await walrus._upload_resource(payload, "application/octet-stream")
+        data, _ = await walrus._download_blob_data(upload.blob_id)
+        assert data == payload
+        assert _cache_counts(walrus) == (0, 1)
+
+    asyncio.run(scenario())
+
+
+def test_cache_writes_run_off_the_event_loop(walrus, monkeypatch):
+    import threading
+    from blob_cache import BlobCacheWriter
+
+    write_threads = []
+    original_write = BlobCacheWriter.write
+
+    def recording_write(self, chunk):
+        write_threads.append(threading.get_ident())
+        original_write(self, chunk)
+
+    monkeypatch.setattr(BlobCacheWriter, "write", recording_write)
+
+    async def scenario():
+        payload = os.urandom(3000)
+        upload = await walrus._upload_resource(payload, "application/octet-stream")
+        data, _ = await walrus._download_blob_data(upload.blob_id)
+        assert data == payload
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert write_threads
+    assert loop_thread not in write_threads
+    # The committed entry serves the next download
+    assert walrus.blob_cache.stats()["entries"] == 1
+
+
+def test_stats_report_hit_rate(walrus):
+    async def scenario():
+        upload = await walrus._upload_resource(os.urandom(3000), "application/octet-stream")
+        for _ in range(4):
+            await walrus._download_blob_data(upload.blob_id)
+
+    asyncio.run(scenario())
+    stats = walrus.blob_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+    assert stats["hit_rate"] == 0.75
@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import os
+import struct
+
+from blob_compression import GZIP, MAGIC
+from chunked_upload import ChunkedIndex, ChunkPart, build_index
+
+
+class FakeStreamReader:
+    """The part of aiohttp.StreamReader that _put_stream reads from."""
+
+    def __init__(self, body: bytes, chunk_size: int = 7):
+        self._body = body
+        self._chunk_size = chunk_size
+
+    async def iter_chunked(self, size: int):
+        for start in range(0, len(self._body), self._chunk_size):
+            yield self._body[start:start + self._chunk_size]
+
+
+# Raw bytes that look exactly like a gzip compression header followed by a payload
+HEADER_LOOKALIKE = MAGIC + struct.pack(">BQ", GZIP, 4096) + os.urandom(2000)
+
+
+async def _round_trip(walrus, blob_id: str, payload: bytes) -> None:
+    data, _ = await walrus._download_blob_data(blob_id)
+    assert data == payload
+    data, _ = await walrus._download_blob_data(blob_id, offset=5, length=30)
+    assert data == payload[5:35]
+    metadata = await walrus._get_blob_metadata(blob_id)
+    assert metadata.success, metadata.error
+    assert metadata.size == len(payload)
+    assert metadata.encoding is None
+
+
+def test_upload_starting_with_compression_magic_round_trips(walrus):
+    async def scenario():
+        upload = await walrus._upload_resource(HEADER_LOOKALIKE, "application/octet-stream")
+        assert upload.success, upload.error
+        await _round_trip(walrus, upload.blob_id, HEADER_LOOKALIKE)
+
+        text = MAGIC.decode("latin-1") + "\x01 not really compressed"
+        upload = await walrus._upload_text(text)
+        assert upload.success, upload.error
+        data, _ = await walrus._download_blob_data(upload.blob_id)
+        assert data == text.encode("utf-8")
+
+    asyncio.run(scenario())
+
+
+def test_streamed_upload_starting_with_compression_magic_round_trips(walrus):
+    async def scenario():
+        for content_length in (len(HEADER_LOOKALIKE), None):
+            result = await walrus._put_stream(FakeStreamReader(HEADER_LOOKALIKE), content_length, None)
+            assert result.size == len(HEADER_LOOKALIKE)
+            await _round_trip(walrus, result.blob_id, HEADER_LOOKALIKE)
+
+    asyncio.run(scenario())
+
+
+def test_compressed_uploads_still_round_trip(walrus):
+    async def scenario():
+        text = "hello walrus " * 500
+        upload = await walrus._upload_text(text)
+        metadata = await walrus._get_blob_metadata(upload.blob_id)
+        assert metadata.encoding == "gzip"
+        data, _ = await walrus._download_blob_data(upload.blob_id)
+        assert data == text.encode("utf-8")
+
+    asyncio.run(scenario())
+
+
+def test_upload_starting_with_index_prefix_round_trips(walrus):
+    async def scenario():
+        text = '{"type":"walrus-chunked-index","note":"just a JSON document a user wants to keep"}'
+        upload = await walrus._upload_text(text)
+        assert upload.success, upload.error
+        await _round_trip(walrus, upload.blob_id, text.encode("utf-8"))
+
+        result = await walrus._put_stream(FakeStreamReader(text.encode("utf-8")), len(text), None)
+        await _round_trip(walrus, result.blob_id, text.encode("utf-8"))
+
+    asyncio.run(scenario())
+
+
+def test_crafted_index_upload_is_not_followed(walrus, walrus_client):
+    async def scenario():
+        secret = os.urandom(1500)
+        other = await walrus._upload_resource(secret, "application/octet-stream")
+        crafted = build_index(ChunkedIndex(
+            size=len(secret), sha256=hashlib.sha256(secret).hexdigest(), part_size=len(secret),
+            parts=[ChunkPart(size=len(secret), sha256=hashlib.sha256(secret).hexdigest(), blob_id=other.blob_id)],
+        ))
+        upload = await walrus._upload_resource(crafted, "application/json")
+        assert upload.success, upload.error
+
+        walrus_client.reads.clear()
+        data, _ = await walrus._download_blob_data(upload.blob_id)
+        assert data == crafted
+        assert other.blob_id not in walrus_client.reads
+
+    asyncio.run(scenario())
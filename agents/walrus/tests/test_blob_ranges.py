@@ -0,0 +1,58 @@
+import asyncio
+import os
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+import binary_api
+
+
+async def _get(blob_id: str, headers=None):
+    async with TestClient(TestServer(binary_api.create_app())) as http:
+        response = await http.get(f"/blobs/{blob_id}", headers=headers)
+        return response.status, response.headers, await response.read()
+
+
+def test_range_reads_within_the_blob(walrus):
+    async def scenario():
+        payload = os.urandom(2500)
+        upload = await walrus._upload_resource(payload, "application/octet-stream")
+
+        status, headers, body = await _get(upload.blob_id, {"Range": "bytes=10-19"})
+        assert status == 206
+        assert headers["Content-Range"] == "bytes 10-19/2500"
+        assert body == payload[10:20]
+
+        status, headers, body = await _get(upload.blob_id, {"Range": "bytes=2499-"})
+        assert status == 206
+        assert headers["Content-Range"] == "bytes 2499-2499/2500"
+        assert body == payload[-1:]
+
+        status, _, body = await _get(upload.blob_id, {"Range": "bytes=-100"})
+        assert status == 206
+        assert body == payload[-100:]
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("start", [2500, 2501, 10_000])
+def test_range_starting_at_or_past_the_end_is_not_satisfiable(walrus, start):
+    async def scenario():
+        payload = os.urandom(2500)
+        upload = await walrus._upload_resource(payload, "application/octet-stream")
+
+        status, _, _ = await _get(upload.blob_id, {"Range": f"bytes={start}-"})
+        assert status == 416
+        with pytest.raises(walrus.RangeNotSatisfiableError):
+            await walrus._download_blob_data(upload.blob_id, offset=start)
+
+    asyncio.run(scenario())
+
+
+def test_empty_blob_reads_as_empty(walrus):
+    async def scenario():
+        upload = await walrus._upload_resource(b"", "application/octet-stream")
+        data, _ = await walrus._download_blob_data(upload.blob_id, offset=0, length=10)
+        assert data == b""
+
+    asyncio.run(scenario())
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from chunked_upload import ChunkPart, ChunkedUploader, UploadManifest, parse_index
+
+
+class FlakyStore:
+    """put_blob stand-in that fails the uploads whose contents are listed in `fail`."""
+
+    def __init__(self):
+        self.blobs = {}
+        self.puts = []
+        self.fail = set()
+
+    async def put_blob(self, data: bytes) -> str:
+        self.puts.append(data)
+        if data in self.fail:
+            raise ConnectionError("publisher went away")
+        blob_id = hashlib.sha256(data).hexdigest()[:43]
+        self.blobs[blob_id] = data
+        return blob_id
+
+
+def _uploader(store: FlakyStore, manifest_dir, part_size: int = 1000) -> ChunkedUploader:
+    return ChunkedUploader(store.put_blob, str(manifest_dir), part_size, max_retries=0, retry_backoff=0,
+                           concurrency=1)
+
+
+def _reassemble(store: FlakyStore, blob_id: str) -> bytes:
+    index = parse_index(store.blobs[blob_id])
+    return b"".join(store.blobs[part.blob_id] for part in index.parts)
+
+
+async def _chunks(data: bytes, size: int = 300):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def test_upload_resumes_after_a_failed_part(tmp_path):
+    async def scenario():
+        store = FlakyStore()
+        uploader = _uploader(store, tmp_path)
+        data = os.urandom(3500)
+        store.fail.add(data[3000:])
+
+        with pytest.raises(Exception, match="part 4"):
+            await uploader.upload_bytes(data)
+        # Parts before the failed one were kept in the manifest
+        manifest = UploadManifest.load(str(tmp_path), f"sha256:{hashlib.sha256(data).hexdigest()}", 1000)
+        assert [part.size for part in manifest.parts if part] == [1000, 1000, 1000]
+
+        store.fail.clear()
+        store.puts.clear()
+        blob_id, parts = await uploader.upload_bytes(data)
+
+        # Only the failed part and the index were uploaded again
+        assert store.puts[:-1] == [data[3000:]]
+        assert len(parts) == 4
+        assert _reassemble(store, blob_id) == data
+        # The finished upload leaves no manifest behind
+        assert os.listdir(tmp_path) == []
+
+    asyncio.run(scenario())
+
+
+def test_stream_upload_resumes_by_key(tmp_path):
+    async def scenario():
+        store = FlakyStore()
+        uploader = _uploader(store, tmp_path)
+        data = os.urandom(2500)
+        store.fail.add(data[1000:2000])
+
+        with pytest.raises(Exception):
+            await uploader.upload_stream("https://example.com/big.bin", _chunks(data))
+
+        store.fail.clear()
+        store.puts.clear()
+        blob_id, parts, size, sha256 = await uploader.upload_stream("https://example.com/big.bin", _chunks(data))
+
+        assert data[:1000] not in store.puts
+        assert (size, sha256) == (len(data), hashlib.sha256(data).hexdigest())
+        assert [part.size for part in parts] == [1000, 1000, 500]
+        assert _reassemble(store, blob_id) == data
+
+    asyncio.run(scenario())
+
+
+def test_changed_source_only_reuses_matching_parts(tmp_path):
+    async def scenario():
+        store = FlakyStore()
+        uploader = _uploader(store, tmp_path)
+        original = os.urandom(3000)
+        store.fail.add(original[2000:])
+        with pytest.raises(Exception):
+            await uploader.upload_stream("key", _chunks(original))
+
+        # The source changed in its second part before the retry
+        changed = original[:1000] + os.urandom(1000) + original[2000:]
+        store.fail.clear()
+        store.puts.clear()
+        blob_id, _, _, _ = await uploader.upload_stream("key", _chunks(changed))
+
+        assert store.puts[:-1] == [changed[1000:2000], changed[2000:]]
+        assert _reassemble(store, blob_id) == changed
+
+    asyncio.run(scenario())
+
+
+def test_manifest_with_another_part_size_is_ignored(tmp_path):
+    manifest = UploadManifest.load(str(tmp_path), "key", 1000)
+    manifest.record(0, ChunkPart(size=1000, sha256="abc", blob_id="blob"))
+
+    assert UploadManifest.load(str(tmp_path), "key", 1000).completed(0, "abc").blob_id == "blob"
+    assert UploadManifest.load(str(tmp_path), "key", 2000).completed(0, "abc") is None
+
+
+def test_single_part_needs_no_index(tmp_path):
+    async def scenario():
+        store = FlakyStore()
+        uploader = _uploader(store, tmp_path)
+        blob_id, parts = await uploader.upload_bytes(b"small")
+        assert store.blobs[blob_id] == b"small"
+        assert len(parts) == 1
+
+        blob_id, _ = await uploader.upload_bytes(b"small", always_index=True)
+        assert parse_index(store.blobs[blob_id]).parts[0].blob_id == parts[0].blob_id
+
+    asyncio.run(scenario())
+
+
+def test_chunked_blob_downloads_whole_and_in_ranges(walrus, monkeypatch):
+    monkeypatch.setattr(walrus, "CHUNKED_UPLOAD_THRESHOLD", 2048)
+    monkeypatch.setattr(walrus.chunked_uploader, "part_size", 1024)
+
+    async def scenario():
+        payload = os.urandom(5000)
+        upload = await walrus._upload_resource(payload, "application/octet-stream")
+        metadata = await walrus._get_blob_metadata(upload.blob_id)
+        assert metadata.chunked and metadata.size == len(payload)
+
+        data, _ = await walrus._download_blob_data(upload.blob_id)
+        assert data == payload
+        # A range crossing a part boundary
+        data, _ = await walrus._download_blob_data(upload.blob_id, offset=1000, length=100)
+        assert data == payload[1000:1100]
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+import random
+
+import endpoint_pool
+from endpoint_pool import EndpointPool
+
+
+def test_failing_endpoint_is_tried_last_until_it_recovers():
+    pool = EndpointPool(["http://a", "http://b/"], unhealthy_after=2)
+    a, b = pool.endpoints
+    assert b.url == "http://b"
+
+    pool.record_failure(a)
+    assert pool.is_healthy(a)
+    pool.record_failure(a)
+    assert not pool.is_healthy(a)
+    for _ in range(20):
+        assert pool.candidates() == [b, a]
+
+    pool.record_success(a, 0.1)
+    assert pool.is_healthy(a)
+    assert (a.requests, a.failures) == (3, 2)
+
+
+def test_unhealthy_endpoint_is_retried_after_a_while(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(endpoint_pool.time, "monotonic", lambda: now[0])
+    pool = EndpointPool(["http://a"], unhealthy_after=1, retry_after=30)
+    pool.record_failure(pool.endpoints[0])
+    assert not pool.is_healthy(pool.endpoints[0])
+
+    now[0] += 30
+    assert pool.is_healthy(pool.endpoints[0])
+
+
+def test_faster_endpoints_are_picked_more_often():
+    random.seed(7)
+    pool = EndpointPool(["http://fast", "http://slow"])
+    fast, slow = pool.endpoints
+    pool.record_success(fast, 0.01)
+    pool.record_success(slow, 0.5)
+
+    firsts = [pool.candidates()[0] for _ in range(500)]
+    assert firsts.count(fast) > 400
+    assert slow in firsts
+
+
+def test_latency_is_a_moving_average():
+    pool = EndpointPool(["http://a"], ewma_alpha=0.5)
+    endpoint = pool.endpoints[0]
+    pool.record_success(endpoint, 1.0)
+    pool.record_success(endpoint, 0.0)
+    assert endpoint.latency == 0.5
+
+    # A request abandoned after losing a hedge race only ever raises the estimate
+    pool.record_abandoned(endpoint, 0.1)
+    assert endpoint.latency == 0.5
+    pool.record_abandoned(endpoint, 1.5)
+    assert endpoint.latency == 1.0
+
+
+def test_hedge_delay_follows_the_p95_of_real_requests():
+    pool = EndpointPool(["http://a"], initial_hedge_delay=2.0, min_hedge_delay=0.05)
+    endpoint = pool.endpoints[0]
+    for _ in range(19):
+        pool.record_success(endpoint, 0.1)
+    assert pool.hedge_delay() == 2.0
+
+    pool.record_success(endpoint, 0.1)
+    assert pool.hedge_delay() == 0.1
+
+    # Probes do not count
+    for _ in range(10):
+        pool.record_success(endpoint, 5.0, probe=True)
+    assert pool.hedge_delay() == 0.1
+
+    for _ in range(2):
+        pool.record_success(endpoint, 0.9)
+    assert pool.hedge_delay() == 0.9
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from intent_batcher import IntentBatcher
+
+
+class FakeLLM:
+    """classify_batch stand-in that records every batch and answers each message with its own intent."""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.batches = []
+        self.delay = delay
+        self.error = error
+
+    async def classify_batch(self, messages):
+        self.batches.append(list(messages))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [{"intent": message} for message in messages]
+
+
+def test_burst_is_classified_in_one_request():
+    async def scenario():
+        llm = FakeLLM()
+        batcher = IntentBatcher(llm.classify_batch, window=0.02)
+        messages = [f"message {i}" for i in range(5)]
+
+        results = await asyncio.gather(*(batcher.classify(message) for message in messages))
+
+        assert llm.batches == [messages]
+        # Every caller gets the result for its own message
+        assert [result["intent"] for result in results] == messages
+        assert batcher.stats() == {"batches": 1, "messages": 5, "mean_batch_size": 5.0}
+
+    asyncio.run(scenario())
+
+
+def test_full_batch_is_sent_before_the_window_ends():
+    async def scenario():
+        llm = FakeLLM()
+        batcher = IntentBatcher(llm.classify_batch, window=10.0, max_batch=3)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.classify(str(i)) for i in range(3))), timeout=1.0)
+
+        assert llm.batches == [["0", "1", "2"]]
+        assert [result["intent"] for result in results] == ["0", "1", "2"]
+
+    asyncio.run(scenario())
+
+
+def test_messages_after_a_flush_start_a_new_batch():
+    async def scenario():
+        llm = FakeLLM()
+        batcher = IntentBatcher(llm.classify_batch, window=0.01)
+
+        await asyncio.gather(batcher.classify("a"), batcher.classify("b"))
+        await batcher.classify("c")
+
+        assert llm.batches == [["a", "b"], ["c"]]
+        assert batcher.stats()["mean_batch_size"] == 1.5
+
+    asyncio.run(scenario())
+
+
+def test_failed_request_fails_every_caller_in_the_batch():
+    async def scenario():
+        llm = FakeLLM(error=ConnectionError("LLM unreachable"))
+        batcher = IntentBatcher(llm.classify_batch, window=0.01)
+
+        results = await asyncio.gather(batcher.classify("a"), batcher.classify("b"), return_exceptions=True)
+
+        assert all(isinstance(result, ConnectionError) for result in results)
+        # Failed requests are not counted as answered batches
+        assert batcher.stats()["batches"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_is_left_out_of_the_batch():
+    async def scenario():
+        llm = FakeLLM()
+        batcher = IntentBatcher(llm.classify_batch, window=0.02)
+
+        abandoned = asyncio.ensure_future(batcher.classify("abandoned"))
+        kept = asyncio.ensure_future(batcher.classify("kept"))
+        await asyncio.sleep(0)
+        abandoned.cancel()
+
+        assert (await kept)["intent"] == "kept"
+        assert llm.batches == [["kept"]]
+        with pytest.raises(asyncio.CancelledError):
+            await abandoned
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+import intent_cache as intent_cache_module
+from intent_cache import IntentCache, normalize_message
+from intent_rules import intent_result
+
+BLOB_A = "Y3XBOEfW77JAon9Kl-pRDy0kRWTgqjxzjYEv0yMfO24"
+BLOB_B = "AAAAbbbbCCCCddddEEEEffffGGGGhhhhIIIIjjjjKKK"
+
+
+def test_normalization_ignores_case_punctuation_and_values():
+    key_a, values_a = normalize_message(f"Could you  fetch {BLOB_A} for me?!")
+    key_b, values_b = normalize_message(f"could you fetch {BLOB_B} for me")
+    assert key_a == key_b == "could you fetch __blob0__ for me"
+    assert values_a == [("__blob0__", BLOB_A)]
+    assert values_b == [("__blob0__", BLOB_B)]
+
+
+def test_hit_fills_in_the_new_message_values():
+    cache = IntentCache()
+    cache.put(f"could you fetch {BLOB_A} for me", intent_result("download_blob", 0.9, blob_id=BLOB_A))
+
+    result = cache.get(f"Could you fetch {BLOB_B} for me?")
+    assert result["intent"] == "download_blob"
+    assert result["extracted_data"]["blob_id"] == BLOB_B
+    assert cache.get("something else entirely") is None
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1, "expirations": 0, "hit_rate": 0.5}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = IntentCache(max_entries=2)
+    cache.put("first message", intent_result("help", 0.9))
+    cache.put("second message", intent_result("help", 0.9))
+    assert cache.get("first message") is not None
+
+    cache.put("third message", intent_result("help", 0.9))
+    assert cache.get("second message") is None
+    assert cache.get("first message") is not None
+    assert cache.get("third message") is not None
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(intent_cache_module.time, "time", lambda: now[0])
+    cache = IntentCache(ttl=60)
+    cache.put("what is walrus", intent_result("help", 0.9))
+
+    now[0] += 59
+    assert cache.get("what is walrus") is not None
+    now[0] += 2
+    assert cache.get("what is walrus") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "intents.db")
+    cache = IntentCache(path=path)
+    cache.put(f"grab {BLOB_A} please", intent_result("download_blob", 0.9, blob_id=BLOB_A))
+    cache.put("forget me", intent_result("help", 0.9))
+
+    restarted = IntentCache(path=path)
+    assert restarted.get(f"grab {BLOB_B} please")["extracted_data"]["blob_id"] == BLOB_B
+    assert restarted.get("forget me") is not None
+
+
+def test_database_writes_run_off_the_event_loop(tmp_path, monkeypatch):
+    path = str(tmp_path / "intents.db")
+    cache = IntentCache(max_entries=2, path=path)
+    write_threads = []
+    original_write = IntentCache._write_pending
+
+    def recording_write(self):
+        write_threads.append(threading.get_ident())
+        original_write(self)
+
+    monkeypatch.setattr(IntentCache, "_write_pending", recording_write)
+
+    async def scenario():
+        for number in range(5):
+            cache.put(f"message {number}", intent_result("help", 0.9))
+        await cache.flush()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert write_threads
+    assert loop_thread not in write_threads
+
+    # Evictions were written too: only the two newest entries are on disk
+    restarted = IntentCache(max_entries=10, path=path)
+    assert restarted.stats()["entries"] == 2
+    assert restarted.get("message 4") is not None
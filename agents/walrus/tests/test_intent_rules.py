@@ -0,0 +1,64 @@
+import pytest
+
+from intent_rules import IntentRules
+
+
+@pytest.mark.parametrize("message, intent", [
+    ("/download Y3XBOEfW77JAon9Kl-pRDy0kRWTgqjxzjYEv0yMfO24", "download_blob"),
+    ("/upload meeting notes", "upload_text"),
+    ("/upload", "upload_file"),
+    ("help", "help"),
+    ("/help", "help"),
+    ("list", "list_blobs"),
+    ("/list 2", "list_blobs"),
+    ("https://example.com/file.mp3", "upload_file"),
+    ("Y3XBOEfW77JAon9Kl-pRDy0kRWTgqjxzjYEv0yMfO24", "download_blob"),
+    ("please download Y3XBOEfW77JAon9Kl-pRDy0kRWTgqjxzjYEv0yMfO24", "download_blob"),
+    ("upload text: remember the milk", "upload_text"),
+    ("show my blobs", "list_blobs"),
+    ("list my uploads", "list_blobs"),
+    ("can I see my stored files", "list_blobs"),
+    ("what can you do", "help"),
+    ("which commands do you support", "help"),
+])
+def test_rules_classify(message, intent):
+    result = IntentRules().match(message)
+    assert result is not None
+    assert result["intent"] == intent
+
+
+@pytest.mark.parametrize("message", [
+    # Nouns shared with listing, but another action
+    "upload my files",
+    "save my files please",
+    "store my uploads",
+    "download my files",
+    "delete my blobs",
+    "upload these commands",
+    # No request to see anything
+    "my files are corrupted",
+    "run these commands",
+    # Start like a bare command word
+    "listen to this song",
+    "helpful tips for the walrus network",
+    # Asks to upload a text without giving it
+    "upload this text please",
+    "save the following text",
+    "store text now",
+])
+def test_rules_leave_near_misses_to_the_llm(message):
+    rules = IntentRules()
+    assert rules.match(message) is None
+    assert rules.stats()["rule_hits"] == 0
+
+
+@pytest.mark.parametrize("message, text", [
+    ("upload text: remember the milk", "remember the milk"),
+    ("store this text: please", "please"),
+    ("save text remember the milk", "remember the milk"),
+    ("please upload the following text:\nline one\nline two", "line one\nline two"),
+])
+def test_upload_text_phrase_extracts_the_text(message, text):
+    result = IntentRules().match(message)
+    assert result["intent"] == "upload_text"
+    assert result["extracted_data"]["description"] == text
@@ -0,0 +1,21 @@
+import os
+
+from local_intent_model import LocalIntentClassifier, load_model
+
+TEXTS = ["upload this file", "upload my document", "download blob abc", "download that blob"]
+INTENTS = ["upload", "upload", "download", "download"]
+
+
+def test_saved_weights_load_back_unchanged(tmp_path):
+    model = LocalIntentClassifier.train(TEXTS, INTENTS, epochs=50)
+    path = os.path.join(tmp_path, "intent_model.npz")
+    model.save(path)
+
+    loaded = load_model(path)
+    assert loaded.labels == model.labels
+    assert loaded.predict("upload a file") == model.predict("upload a file")
+
+
+def test_missing_weights_disable_the_classifier(tmp_path):
+    # Nothing is trained in its place
+    assert load_model(os.path.join(tmp_path, "missing.npz")) is None
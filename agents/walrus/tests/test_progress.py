@@ -0,0 +1,45 @@
+import asyncio
+import os
+
+
+def test_download_reports_stage_and_bytes(walrus, monkeypatch):
+    monkeypatch.setattr(walrus, "PROGRESS_INTERVAL", 0)
+    monkeypatch.setattr(walrus, "STREAM_CHUNK_SIZE", 1024)
+    updates = []
+
+    async def progress(text):
+        updates.append(text)
+
+    async def scenario():
+        payload = os.urandom(3000)
+        upload = await walrus._upload_resource(payload, "application/octet-stream")
+        return await walrus._download_blob(upload.blob_id, progress=progress)
+
+    result = asyncio.run(scenario())
+
+    assert result.success, result.error
+    assert result.size == 3000
+    assert updates[0].startswith("📥 Downloading blob")
+    transferred = [update for update in updates if "Downloading from Walrus" in update]
+    assert transferred
+    assert transferred[-1].endswith("of 2.9 KB (100%)")
+
+
+def test_each_result_is_delivered_when_ready(walrus):
+    delivered = []
+
+    async def on_result(result):
+        delivered.append(result)
+
+    async def scenario():
+        content = [
+            {"type": "text", "text": "first note"},
+            {"type": "text", "text": "second note"},
+        ]
+        intent = {"intent": "upload_text", "extracted_data": {}}
+        return await walrus.handle_walrus_operation(content, intent, on_result=on_result)
+
+    results = asyncio.run(scenario())
+
+    assert len(results) == 2
+    assert sorted(id(result) for result in delivered) == sorted(id(result) for result in results)
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from text_packer import PackedRef, TextPacker, parse_packed_id
+
+
+class ContainerStore:
+    def __init__(self, fail: bool = False):
+        self.containers = []
+        self.fail = fail
+
+    async def put_blob(self, data: bytes) -> str:
+        if self.fail:
+            raise ConnectionError("publisher went away")
+        self.containers.append(data)
+        return f"container{len(self.containers)}"
+
+
+def test_texts_within_the_window_share_one_container():
+    async def scenario():
+        store = ContainerStore()
+        packer = TextPacker(store.put_blob, window=0.02)
+        ids = await asyncio.gather(packer.add(b"alpha"), packer.add(b"beta"), packer.add(b"gamma"))
+
+        assert store.containers == [b"alphabetagamma"]
+        assert ids == ["container1:0:5", "container1:5:4", "container1:9:5"]
+        assert (packer.containers, packer.packed) == (1, 3)
+
+    asyncio.run(scenario())
+
+
+def test_a_window_holding_one_text_stores_a_plain_blob():
+    async def scenario():
+        store = ContainerStore()
+        packer = TextPacker(store.put_blob, window=0.01)
+        assert await packer.add(b"alone") == "container1"
+        # The next text opens a new window
+        assert await packer.add(b"later") == "container2"
+
+    asyncio.run(scenario())
+
+
+def test_full_container_is_stored_before_the_window_ends():
+    async def scenario():
+        store = ContainerStore()
+        packer = TextPacker(store.put_blob, window=10, max_container_bytes=8)
+        ids = await asyncio.wait_for(asyncio.gather(
+            packer.add(b"1234"), packer.add(b"5678"), packer.add(b"abc"), packer.add(b"defgh")
+        ), timeout=1)
+
+        # The third text would overflow the first container, so it starts the next one
+        assert store.containers == [b"12345678", b"abcdefgh"]
+        assert ids == ["container1:0:4", "container1:4:4", "container2:0:3", "container2:3:5"]
+
+    asyncio.run(scenario())
+
+
+def test_failed_container_fails_every_text_in_it():
+    async def scenario():
+        packer = TextPacker(ContainerStore(fail=True).put_blob, window=0.01)
+        results = await asyncio.gather(packer.add(b"one"), packer.add(b"two"), return_exceptions=True)
+        assert all(isinstance(result, ConnectionError) for result in results)
+
+    asyncio.run(scenario())
+
+
+def test_flush_stores_pending_texts_right_away():
+    async def scenario():
+        store = ContainerStore()
+        packer = TextPacker(store.put_blob, window=10)
+        pending = asyncio.ensure_future(packer.add(b"queued"))
+        await asyncio.sleep(0)
+        await packer.flush()
+        assert store.containers == [b"queued"]
+        assert await pending == "container1"
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("blob_id, expected", [
+    ("abc:10:20", PackedRef("abc", 10, 20)),
+    ("Y3XBOEfW77JAon9Kl-pRDy0kRWTgqjxzjYEv0yMfO24", None),
+    ("abc:10", None),
+    (":1:2", None),
+    ("abc:-1:2", None),
+    ("abc:x:2", None),
+])
+def test_parse_packed_id(blob_id, expected):
+    assert parse_packed_id(blob_id) == expected
+
+
+def test_packed_texts_download_through_their_sub_ids(walrus, walrus_client, monkeypatch):
+    monkeypatch.setattr(walrus, "text_packer", TextPacker(walrus._put_single_blob, window=0.02))
+
+    async def scenario():
+        texts = ["first note", "second, longer note", "third"]
+        uploads = await asyncio.gather(*(walrus._upload_text(text) for text in texts))
+        refs = [parse_packed_id(upload.blob_id) for upload in uploads]
+        assert all(refs) and len({ref.container_id for ref in refs}) == 1
+        assert len(walrus_client.blobs) == 1
+
+        for upload, text in zip(uploads, texts):
+            data, mime_type = await walrus._download_blob_data(upload.blob_id)
+            assert data == text.encode("utf-8")
+            assert mime_type.startswith("text/plain")
+            metadata = await walrus._get_blob_metadata(upload.blob_id)
+            assert metadata.size == len(text)
+
+        # Ranges stay inside the packed text
+        data, _ = await walrus._download_blob_data(uploads[1].blob_id, offset=8, length=100)
+        assert data == texts[1].encode("utf-8")[8:]
+
+    asyncio.run(scenario())
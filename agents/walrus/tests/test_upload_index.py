@@ -0,0 +1,82 @@
+import asyncio
+import os
+
+import upload_index as upload_index_module
+from upload_index import UploadIndex
+
+
+def test_repeat_upload_is_served_from_the_index(walrus, walrus_client):
+    async def scenario():
+        payload = os.urandom(3000)
+        first = await walrus._upload_resource(payload, "application/octet-stream")
+        second = await walrus._upload_resource(payload, "application/octet-stream")
+        assert second.blob_id == first.blob_id
+        assert walrus_client.puts == 1
+
+    asyncio.run(scenario())
+
+
+def test_expired_entry_triggers_a_real_put(walrus, walrus_client):
+    async def scenario():
+        payload = os.urandom(3000)
+        first = await walrus._upload_resource(payload, "application/octet-stream")
+        assert walrus_client.puts == 1
+
+        # Another upload reports that the blob's end epoch has been reached
+        walrus_client.epoch += 1
+        await walrus._upload_resource(os.urandom(3000), "application/octet-stream")
+        assert walrus_client.puts == 2
+
+        again = await walrus._upload_resource(payload, "application/octet-stream")
+        assert walrus_client.puts == 3
+        assert again.blob_id == first.blob_id
+        assert walrus_client.end_epochs[first.blob_id] == walrus_client.epoch + 1
+
+        # The fresh copy is reused again
+        await walrus._upload_resource(payload, "application/octet-stream")
+        assert walrus_client.puts == 3
+
+    asyncio.run(scenario())
+
+
+def test_chunked_upload_expires_with_its_earliest_part(walrus, walrus_client, monkeypatch):
+    monkeypatch.setattr(walrus, "CHUNKED_UPLOAD_THRESHOLD", 2048)
+    monkeypatch.setattr(walrus.chunked_uploader, "part_size", 1024)
+
+    async def scenario():
+        payload = os.urandom(5000)
+        # The first part was stored before, for fewer epochs than the rest
+        await walrus._put_single_blob(payload[:1024])
+        walrus_client.storage_epochs = 5
+
+        upload = await walrus._upload_resource(payload, "application/octet-stream")
+        assert walrus.upload_index.get(upload.sha256) == upload.blob_id
+
+        walrus.upload_index.observe_epoch(walrus_client.epoch + 1)
+        assert walrus.upload_index.get(upload.sha256) is None
+
+
+def test_index_advances_the_epoch_with_wall_clock_time(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(upload_index_module.time, "time", lambda: now[0])
+    index = UploadIndex(str(tmp_path / "uploads.db"), epoch_seconds=100)
+
+    index.observe_epoch(5)
+    index.record_blob("blob", 7)
+    index.put("digest", "blob", 10, index.end_epoch(["blob"]))
+    assert index.get("digest") == "blob"
+
+    now[0] += 150
+    assert index.current_epoch() == 6
+    assert index.get("digest") == "blob"
+
+    now[0] += 100
+    assert index.current_epoch() == 7
+    assert index.get("digest") is None
+
+
+def test_entries_without_a_known_end_epoch_are_not_reused(tmp_path):
+    index = UploadIndex(str(tmp_path / "uploads.db"))
+    index.observe_epoch(5)
+    index.put("digest", "blob", 10, index.end_epoch(["unrecorded"]))
+    assert index.get("digest") is None
@@ -0,0 +1,116 @@
+"""
+Packing of small text uploads into shared container blobs.
+
+Every Walrus blob carries a fixed storage and latency overhead that dwarfs a
+short text. When packing is enabled, small texts arriving within a short
+window are concatenated into one container blob instead of being uploaded one
+by one. Each text gets back a sub-ID naming the container and its byte range:
+
+    <container_blob_id>:<offset>:<length>
+
+Walrus blob IDs are URL-safe base64, so the colons cannot clash with a real
+blob ID. Downloads resolve a sub-ID with a range read of the container. A
+window that ends up holding a single text is stored as a plain blob and its
+ordinary blob ID is returned.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+
+@dataclass
+class PackedRef:
+    """Location of a packed text inside its container blob."""
+    container_id: str
+    offset: int
+    length: int
+
+    def __str__(self) -> str:
+        return f"{self.container_id}:{self.offset}:{self.length}"
+
+
+def parse_packed_id(blob_id: str) -> Optional[PackedRef]:
+    """Split a sub-ID into its container and byte range; None for ordinary blob IDs."""
+    parts = blob_id.split(":")
+    if len(parts) != 3 or not parts[0] or not parts[1].isdigit() or not parts[2].isdigit():
+        return None
+    return PackedRef(parts[0], int(parts[1]), int(parts[2]))
+
+
+class TextPacker:
+    """
+    Coalesces small payloads into container blobs.
+
+    The first payload added after a flush starts a `window`-second timer;
+    everything added before it fires goes into the same container. A container
+    is stored early once it reaches `max_container_bytes`.
+    """
+
+    def __init__(
+        self,
+        put_blob: Callable[[bytes], Awaitable[str]],
+        window: float = 0.05,
+        max_container_bytes: int = 1024 * 1024,
+    ):
+        self._put_blob = put_blob
+        self.window = window
+        self.max_container_bytes = max_container_bytes
+        self.containers = 0
+        self.packed = 0
+
+        self._pending: List[Tuple[bytes, "asyncio.Future[str]"]] = []
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._storing: Set["asyncio.Task"] = set()
+
+    async def add(self, data: bytes) -> str:
+        """Queue a payload for the current container and return its ID once the container is stored."""
+        loop = asyncio.get_running_loop()
+        if self._pending and self._pending_bytes + len(data) > self.max_container_bytes:
+            self._flush()
+
+        future = loop.create_future()
+        self._pending.append((data, future))
+        self._pending_bytes += len(data)
+
+        if self._pending_bytes >= self.max_container_bytes:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Hand the pending payloads to a background task that stores them as one container."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_bytes = self._pending, [], 0
+        if batch:
+            task = asyncio.ensure_future(self._store(batch))
+            self._storing.add(task)
+            task.add_done_callback(self._storing.discard)
+
+    async def _store(self, batch: List[Tuple[bytes, "asyncio.Future[str]"]]) -> None:
+        try:
+            container_id = await self._put_blob(b"".join(data for data, _ in batch))
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.containers += 1
+        self.packed += len(batch)
+        offset = 0
+        for data, future in batch:
+            if not future.done():
+                ref = PackedRef(container_id, offset, len(data))
+                future.set_result(container_id if len(batch) == 1 else str(ref))
+            offset += len(data)
+
+    async def flush(self) -> None:
+        """Store the pending payloads now and wait until every container in flight is stored."""
+        self._flush()
+        if self._storing:
+            await asyncio.gather(*self._storing, return_exceptions=True)
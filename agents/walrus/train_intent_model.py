@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Train and evaluate the offline intent classifier.
+
+Reports k-fold cross-validated accuracy, how many messages the model answers
+at the confidence threshold (and how accurately), and prediction latency.
+With --compare-llm the same examples are also classified by the GPT-4o path
+for an accuracy and latency comparison (needs OPENAI_API_KEY). With --save the
+model trained on all examples is written to the file the agent loads
+(WALRUS_LOCAL_INTENT_MODEL_PATH, intent_model.npz next to this script by default).
+
+    python train_intent_model.py --save
+    python train_intent_model.py --compare-llm
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from typing import List, Sequence, Tuple
+
+from local_intent_model import DEFAULT_MODEL_PATH, LocalIntentClassifier, load_examples
+
+DEFAULT_EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intent_examples.jsonl")
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def cross_validate(texts: List[str], intents: List[str], folds: int, threshold: float,
+                   seed: int) -> None:
+    order = list(range(len(texts)))
+    random.Random(seed).shuffle(order)
+
+    predictions: List[Tuple[str, float, str]] = []
+    latencies: List[float] = []
+    for fold in range(folds):
+        held_out = set(order[fold::folds])
+        model = LocalIntentClassifier.train([texts[i] for i in order if i not in held_out],
+                                            [intents[i] for i in order if i not in held_out])
+        for i in held_out:
+            started = time.perf_counter()
+            intent, confidence = model.predict(texts[i])
+            latencies.append((time.perf_counter() - started) * 1000)
+            predictions.append((intent, confidence, intents[i]))
+
+    correct = sum(predicted == expected for predicted, _, expected in predictions)
+    confident = [(predicted, expected) for predicted, confidence, expected in predictions if confidence >= threshold]
+    confident_correct = sum(predicted == expected for predicted, expected in confident)
+
+    print(f"Local model ({folds}-fold cross-validation, {len(texts)} examples)")
+    print(f"  accuracy:            {correct / len(predictions):.1%}")
+    print(f"  answered at >= {threshold:.2f}: {len(confident) / len(predictions):.1%} of messages")
+    if confident:
+        print(f"  accuracy when answered: {confident_correct / len(confident):.1%}")
+    print(f"  latency:             mean {statistics.mean(latencies):.3f} ms, p95 {_percentile(latencies, 0.95):.3f} ms")
+
+
+async def compare_llm(texts: List[str], intents: List[str]) -> None:
+    from intent_detection import classify_with_llm
+
+    correct = 0
+    failures = 0
+    latencies: List[float] = []
+    for text, expected in zip(texts, intents):
+        started = time.perf_counter()
+        result = await classify_with_llm(text)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if result is None:
+            failures += 1
+        elif result.get("intent") == expected:
+            correct += 1
+
+    print(f"LLM path ({len(texts)} examples)")
+    print(f"  accuracy:            {correct / len(texts):.1%} ({failures} failed calls)")
+    print(f"  latency:             mean {statistics.mean(latencies):.0f} ms, p95 {_percentile(latencies, 0.95):.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--examples", default=DEFAULT_EXAMPLES, help="JSON-lines file of labeled examples")
+    parser.add_argument("--save", action="store_true", help="save the model trained on all examples")
+    parser.add_argument("--output", default=os.getenv("WALRUS_LOCAL_INTENT_MODEL_PATH") or DEFAULT_MODEL_PATH,
+                        help="where --save writes the model (default: %(default)s)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("WALRUS_LOCAL_INTENT_THRESHOLD", "0.95")))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare-llm", action="store_true", help="also classify the examples with GPT-4o")
+    args = parser.parse_args()
+
+    texts, intents = load_examples(args.examples)
+    cross_validate(texts, intents, args.folds, args.threshold, args.seed)
+
+    if args.save:
+        started = time.perf_counter()
+        LocalIntentClassifier.train(texts, intents).save(args.output)
+        print(f"Saved model trained on all examples to {args.output} ({time.perf_counter() - started:.2f} s)")
+
+    if args.compare_llm:
+        asyncio.run(compare_llm(texts, intents))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Content-hash deduplication index for Walrus uploads.
+
+Maps the sha256 of uploaded bytes to the blob ID Walrus returned, so repeat
+uploads of identical content are answered locally without a publisher PUT.
+
+Walrus only stores a blob until its end epoch, so the index also records the
+end epoch of every stored blob and forgets uploads once any blob they are
+made of has expired. The current epoch is not queried from the chain: it is
+taken from publisher responses (`registeredEpoch` of newly created blobs) and
+advanced by wall-clock time in between, `epoch_seconds` per epoch.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+
+class UploadIndex:
+    """SQLite-backed sha256 -> blob_id index whose entries expire with their blobs."""
+
+    def __init__(self, path: str, epoch_seconds: float = 24 * 60 * 60):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.epoch_seconds = epoch_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS uploads (
+                    sha256 TEXT PRIMARY KEY,
+                    blob_id TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL DEFAULT (strftime('%s', 'now')),
+                    end_epoch INTEGER
+                )
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(uploads)")}
+            if "end_epoch" not in columns:
+                # Indexes written before expiry was tracked; their entries count as expired
+                self._conn.execute("ALTER TABLE uploads ADD COLUMN end_epoch INTEGER")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    blob_id TEXT PRIMARY KEY,
+                    end_epoch INTEGER NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS epoch_clock (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    epoch INTEGER NOT NULL,
+                    observed_at REAL NOT NULL
+                )
+                """
+            )
+
+    def _current_epoch(self) -> Optional[int]:
+        row = self._conn.execute("SELECT epoch, observed_at FROM epoch_clock WHERE id = 0").fetchone()
+        if row is None:
+            return None
+        epoch, observed_at = row
+        return epoch + int(max(0.0, time.time() - observed_at) // self.epoch_seconds)
+
+    def current_epoch(self) -> Optional[int]:
+        """Best estimate of the current Walrus epoch, or None before any was observed."""
+        with self._lock:
+            return self._current_epoch()
+
+    def observe_epoch(self, epoch: int) -> None:
+        """
+        Record the current epoch as reported by the publisher.
+
+        The clock is re-anchored only when the report disagrees with the
+        estimate, so it keeps the time an epoch was first seen.
+        """
+        with self._lock, self._conn:
+            if self._current_epoch() == epoch:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO epoch_clock (id, epoch, observed_at) VALUES (0, ?, ?)",
+                (epoch, time.time()),
+            )
+            self._conn.execute("DELETE FROM blobs WHERE end_epoch <= ?", (epoch,))
+
+    def record_blob(self, blob_id: str, end_epoch: int) -> None:
+        """Record the epoch at which Walrus stops storing a blob."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blobs (blob_id, end_epoch) VALUES (?, ?)",
+                (blob_id, end_epoch),
+            )
+
+    def end_epoch(self, blob_ids: Iterable[str]) -> Optional[int]:
+        """The earliest end epoch of the given blobs, or None if any of them is unknown."""
+        blob_ids = set(blob_ids)
+        if not blob_ids:
+            return None
+        with self._lock:
+            rows = [
+                self._conn.execute("SELECT end_epoch FROM blobs WHERE blob_id = ?", (blob_id,)).fetchone()
+                for blob_id in blob_ids
+            ]
+        if any(row is None for row in rows):
+            return None
+        return min(row[0] for row in rows)
+
+    def get(self, sha256: str) -> Optional[str]:
+        """
+        Return the blob ID previously stored for this content hash, if it is still stored.
+
+        Entries whose end epoch has passed, or is unknown, are dropped so the
+        content gets uploaded again.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT blob_id, end_epoch FROM uploads WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            if row is None:
+                return None
+            blob_id, end_epoch = row
+            current = self._current_epoch()
+            if end_epoch is None or current is None or current >= end_epoch:
+                self._conn.execute("DELETE FROM uploads WHERE sha256 = ?", (sha256,))
+                return None
+        return blob_id
+
+    def put(self, sha256: str, blob_id: str, size: int, end_epoch: Optional[int]) -> None:
+        """Record the blob ID for a content hash and the epoch at which its storage ends."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads (sha256, blob_id, size, end_epoch) VALUES (?, ?, ?, ?)",
+                (sha256, blob_id, size, end_epoch),
+            )
@@ -3,17 +3,33 @@ Walrus blob storage operations.
 
 Requirements
 ------------
-pip install walrus-python requests python-dotenv
+pip install aiohttp python-dotenv
 # + uagents if you run the full agent
 """
 
+import asyncio
 import base64
+import hashlib
 import os
 import tempfile
-from typing import Any, List, Dict
-import requests
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional, Union
+import aiohttp
 from dotenv import load_dotenv
-from walrus import WalrusClient
+
+from async_walrus_client import AsyncWalrusClient, WalrusRequestError
+from blob_compression import MAGIC, compress_blob, encoding_for, is_compressible_mime, iter_decompressed, parse_header
+from blob_cache import BlobCache
+from blob_catalog import BlobCatalog
+from chunked_upload import INDEX_PREFIX, ChunkedIndex, ChunkedUploader, is_chunked_index, parse_index
+from mime_sniffer import DEFAULT_MIME_TYPE, SNIFF_BYTES, is_audio_mime, sniff_mime_type
+from progress import ProgressCallback, TransferProgress, report
+from results import BlobListResult, BlobMetadata, DownloadResult, OperationError, UploadResult, format_size
+from text_packer import TextPacker, parse_packed_id
+from upload_index import UploadIndex
 
 load_dotenv("../.env")
 
@@ -21,193 +37,824 @@ load_dotenv("../.env")
 PUBLISHER_URL = os.getenv("WALRUS_PUBLISHER_URL", "https://publisher.walrus-testnet.walrus.space")
 AGGREGATOR_URL = os.getenv("WALRUS_AGGREGATOR_URL", "https://aggregator.walrus-testnet.walrus.space")
 
-client = WalrusClient(publisher_base_url=PUBLISHER_URL, aggregator_base_url=AGGREGATOR_URL)
+# Optional comma-separated endpoint lists; requests fail over between them
+PUBLISHER_URLS = [url.strip() for url in os.getenv("WALRUS_PUBLISHER_URLS", PUBLISHER_URL).split(",") if url.strip()]
+AGGREGATOR_URLS = [url.strip() for url in os.getenv("WALRUS_AGGREGATOR_URLS", AGGREGATOR_URL).split(",") if url.strip()]
+
+# Endpoint health probing and hedged blob reads
+HEALTH_PROBE_INTERVAL = float(os.getenv("WALRUS_HEALTH_PROBE_INTERVAL", "30"))
+HEDGED_READS = os.getenv("WALRUS_HEDGED_READS", "true").lower() == "true"
+HEDGE_INITIAL_DELAY = float(os.getenv("WALRUS_HEDGE_INITIAL_DELAY", "2"))
+
+# Streaming upload limits
+MAX_UPLOAD_BYTES = int(os.getenv("WALRUS_MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+STREAM_CHUNK_SIZE = int(os.getenv("WALRUS_STREAM_CHUNK_SIZE", str(64 * 1024)))
+
+# HTTP connection pool, timeouts and concurrency limits
+HTTP_CONNECT_TIMEOUT = float(os.getenv("WALRUS_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.getenv("WALRUS_READ_TIMEOUT", "60"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("WALRUS_MAX_CONNECTIONS", "32"))
+MAX_CONCURRENT_UPLOADS = int(os.getenv("WALRUS_MAX_CONCURRENT_UPLOADS", "4"))
+MAX_CONCURRENT_DOWNLOADS = int(os.getenv("WALRUS_MAX_CONCURRENT_DOWNLOADS", "8"))
+
+# How many items of one chat message are processed in parallel
+MESSAGE_CONCURRENCY = int(os.getenv("WALRUS_MESSAGE_CONCURRENCY", "4"))
+
+# Batch REST endpoints: items processed in parallel and the largest accepted batch
+BATCH_CONCURRENCY = int(os.getenv("WALRUS_BATCH_CONCURRENCY", "16"))
+BATCH_MAX_ITEMS = int(os.getenv("WALRUS_BATCH_MAX_ITEMS", "1000"))
+
+# Local cache for downloaded blobs (immutable by ID, so entries never go stale)
+CACHE_DIR = os.getenv("WALRUS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "walrus-agent-cache"))
+CACHE_MAX_BYTES = int(os.getenv("WALRUS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Inputs larger than this are uploaded as resumable parts plus an index blob
+CHUNKED_UPLOAD_THRESHOLD = int(os.getenv("WALRUS_CHUNKED_UPLOAD_THRESHOLD", str(16 * 1024 * 1024)))
+CHUNK_PART_SIZE = int(os.getenv("WALRUS_CHUNK_PART_SIZE", str(8 * 1024 * 1024)))
+CHUNK_UPLOAD_RETRIES = int(os.getenv("WALRUS_CHUNK_UPLOAD_RETRIES", "3"))
+
+# Optional packing of small texts arriving within PACK_WINDOW seconds into one container blob
+PACK_TEXT_UPLOADS = os.getenv("WALRUS_PACK_TEXT_UPLOADS", "false").lower() == "true"
+PACK_WINDOW = float(os.getenv("WALRUS_PACK_WINDOW", "0.05"))
+PACK_MAX_TEXT_BYTES = int(os.getenv("WALRUS_PACK_MAX_TEXT_BYTES", "4096"))
+PACK_MAX_CONTAINER_BYTES = int(os.getenv("WALRUS_PACK_MAX_CONTAINER_BYTES", str(1024 * 1024)))
+
+# Compression of text-like uploads ("gzip", "zstd" or "none"); smaller inputs are stored as-is
+COMPRESSION = encoding_for(os.getenv("WALRUS_COMPRESSION", "gzip"))
+COMPRESSION_LEVEL = int(os.getenv("WALRUS_COMPRESSION_LEVEL", "6"))
+COMPRESS_MIN_BYTES = int(os.getenv("WALRUS_COMPRESS_MIN_BYTES", "512"))
+
+# Blobs shown per page of the list_blobs reply
+LIST_PAGE_SIZE = int(os.getenv("WALRUS_LIST_PAGE_SIZE", "10"))
+
+# Minimum seconds between "bytes transferred" chat updates during an upload
+PROGRESS_INTERVAL = float(os.getenv("WALRUS_PROGRESS_INTERVAL", "2"))
+
+# Persistent agent state (upload dedup index, blob catalog, chunked upload manifests)
+DATA_DIR = os.getenv("WALRUS_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".walrus_data"))
+
+# Length of a Walrus epoch (1 day on testnet, 2 weeks on mainnet); dedup entries expire with their blobs
+EPOCH_SECONDS = float(os.getenv("WALRUS_EPOCH_SECONDS", str(24 * 60 * 60)))
+
+client = AsyncWalrusClient(
+    publisher_urls=PUBLISHER_URLS,
+    aggregator_urls=AGGREGATOR_URLS,
+    connect_timeout=HTTP_CONNECT_TIMEOUT,
+    read_timeout=HTTP_READ_TIMEOUT,
+    max_connections=HTTP_MAX_CONNECTIONS,
+    max_concurrent_uploads=MAX_CONCURRENT_UPLOADS,
+    max_concurrent_downloads=MAX_CONCURRENT_DOWNLOADS,
+    hedged_reads=HEDGED_READS,
+    initial_hedge_delay=HEDGE_INITIAL_DELAY,
+)
+blob_cache = BlobCache(CACHE_DIR, CACHE_MAX_BYTES)
+upload_index = UploadIndex(os.path.join(DATA_DIR, "uploads.db"), EPOCH_SECONDS)
+blob_catalog = BlobCatalog(os.path.join(DATA_DIR, "catalog.db"))
+
+
+OperationResult = Union[UploadResult, DownloadResult, OperationError]
+
+
+def _elapsed_ms(started: float) -> float:
+    """Milliseconds since a time.perf_counter() reading."""
+    return (time.perf_counter() - started) * 1000
+
+
+def _blob_url(blob_id: str) -> str:
+    """Return the Walruscan URL for a blob; packed texts link to their container."""
+    packed = parse_packed_id(blob_id)
+    return f"https://walruscan.com/testnet/blob/{packed.container_id if packed else blob_id}"
+
+
+def _extract_blob_id(response: Dict[str, Any]) -> str:
+    """Read the blob ID from either publisher response shape."""
+    if "newlyCreated" in response:
+        return response["newlyCreated"]["blobObject"]["blobId"]
+    if "alreadyCertified" in response:
+        return response["alreadyCertified"]["blobId"]
+    raise ValueError(f"Unexpected publisher response: {response}")
+
+
+def _record_stored_blob(response: Dict[str, Any]) -> str:
+    """Read the blob ID from a publisher response and remember the epoch its storage ends."""
+    blob_id = _extract_blob_id(response)
+    if "newlyCreated" in response:
+        blob_object = response["newlyCreated"]["blobObject"]
+        end_epoch = blob_object.get("storage", {}).get("endEpoch")
+        if blob_object.get("registeredEpoch") is not None:
+            upload_index.observe_epoch(int(blob_object["registeredEpoch"]))
+    else:
+        end_epoch = response["alreadyCertified"].get("endEpoch")
+    if end_epoch is not None:
+        upload_index.record_blob(blob_id, int(end_epoch))
+    return blob_id
+
+
+async def _put_single_blob(data: bytes) -> str:
+    """Upload bytes to Walrus in one PUT and return the blob ID."""
+    return _record_stored_blob(await client.put_blob(data))
+
+
+chunked_uploader = ChunkedUploader(
+    put_blob=_put_single_blob,
+    manifest_dir=os.path.join(DATA_DIR, "manifests"),
+    part_size=CHUNK_PART_SIZE,
+    max_retries=CHUNK_UPLOAD_RETRIES,
+    concurrency=MAX_CONCURRENT_UPLOADS,
+)
+text_packer = TextPacker(_put_single_blob, PACK_WINDOW, PACK_MAX_CONTAINER_BYTES) if PACK_TEXT_UPLOADS else None
+
+
+async def _compress_for_upload(data: bytes) -> Optional[bytes]:
+    """Compress bytes off the event loop; None when compression is off or does not pay."""
+    if COMPRESSION is None or len(data) < COMPRESS_MIN_BYTES:
+        return None
+    compressed = await asyncio.to_thread(compress_blob, data, COMPRESSION, COMPRESSION_LEVEL)
+    # Compressed blobs are always stored as a single blob
+    if compressed is None or len(compressed) > CHUNKED_UPLOAD_THRESHOLD:
+        return None
+    return compressed
+
+
+# Bytes of an upload that must be seen to tell whether it needs escaping
+ESCAPE_PREFIX_BYTES = max(len(MAGIC), len(INDEX_PREFIX))
+
+
+def _needs_escape(prefix: bytes) -> bool:
+    """
+    Whether raw data starts like a compression header or a chunked-upload
+    index and would be misread on download.
+
+    Such data is stored as a one-part chunked upload instead: the blob handed
+    out is then a genuine index, and parts are always read back as-is.
+    """
+    return prefix.startswith(MAGIC) or is_chunked_index(prefix)
+
+
+async def _put_blob_bytes(data: bytes, pack: bool = False, compress: bool = False) -> tuple[str, str, bool]:
+    """
+    Upload bytes to Walrus unless identical content was uploaded before.
+
+    Inputs above CHUNKED_UPLOAD_THRESHOLD are uploaded in resumable parts.
+    With `pack`, inputs up to PACK_MAX_TEXT_BYTES are packed into a shared
+    container blob when packing is enabled, and get a sub-ID back.
+    With `compress`, other inputs are stored compressed when that saves space.
+    Inputs that would be misread as a header or index on download are stored behind an index.
+    Returns the blob ID, the content sha256 and whether it was served from the
+    dedup index; index entries are only reused until their blobs expire.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    blob_id = upload_index.get(digest)
+    if blob_id:
+        return blob_id, digest, True
+
+    escape = _needs_escape(data)
+    # A packing window holding a single text stores it as a plain blob, so escaped data is not packed
+    if pack and text_packer is not None and len(data) <= PACK_MAX_TEXT_BYTES and not escape:
+        blob_id = await text_packer.add(data)
+        packed = parse_packed_id(blob_id)
+        stored = [packed.container_id if packed else blob_id]
+    elif compress and (compressed := await _compress_for_upload(data)) is not None:
+        blob_id = await _put_single_blob(compressed)
+        stored = [blob_id]
+    elif len(data) > CHUNKED_UPLOAD_THRESHOLD or escape:
+        blob_id, parts = await chunked_uploader.upload_bytes(data, always_index=escape)
+        stored = [blob_id] + [part.blob_id for part in parts]
+    else:
+        blob_id = await _put_single_blob(data)
+        stored = [blob_id]
+    upload_index.put(digest, blob_id, len(data), upload_index.end_epoch(stored))
+    return blob_id, digest, False
+
+
+def _resolve_mime_type(declared: Optional[str], prefix: bytes) -> str:
+    """Use the declared MIME type unless it is missing or generic, otherwise sniff the content."""
+    declared = (declared or "").split(";")[0].strip().lower()
+    if declared and declared != DEFAULT_MIME_TYPE:
+        return declared
+    return sniff_mime_type(prefix)
+
+
+def _catalog_upload(result: UploadResult, sender: Optional[str], description: Optional[str]) -> UploadResult:
+    """Record a successful upload in the blob catalog."""
+    if result.success:
+        blob_catalog.add(result.blob_id, result.sha256, result.size, result.mime_type,
+                         description=description, sender=sender)
+    return result
 
 
-def _save_to_temp(data: bytes, suffix: str) -> str:
-    """Write bytes to a temporary file and return the path."""
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    tmp.write(data)
-    tmp.close()
-    return tmp.name
+class UploadTooLargeError(ValueError):
+    """Raised when a streamed upload exceeds MAX_UPLOAD_BYTES."""
 
 
-def _upload_file_from_url(url: str) -> str:
-    """Download file from URL and upload to Walrus."""
+class _BoundedStream:
+    """
+    Async iterator over an HTTP body (a fetched URL or an incoming request)
+    that is handed to the publisher PUT as-is, so the upload is relayed chunk
+    by chunk without buffering the whole file. Raises UploadTooLargeError once
+    more than `max_bytes` are read, and reports the bytes read to `transfer`.
+    """
+
+    def __init__(self, content: aiohttp.StreamReader, max_bytes: int, chunk_size: int,
+                 transfer: Optional[TransferProgress] = None):
+        self._content = content
+        self._max_bytes = max_bytes
+        self._chunk_size = chunk_size
+        self._transfer = transfer
+        self.bytes_read = 0
+        self.sha256 = hashlib.sha256()
+        self.prefix = b""
+        # The HTTP client wraps errors raised mid-upload, so keep the original
+        self.error: Optional[UploadTooLargeError] = None
+
+    async def __aiter__(self):
+        async for chunk in self._content.iter_chunked(self._chunk_size):
+            self.bytes_read += len(chunk)
+            if self.bytes_read > self._max_bytes:
+                self.error = UploadTooLargeError(
+                    f"File exceeds the maximum upload size of {self._max_bytes} bytes"
+                )
+                raise self.error
+            self.sha256.update(chunk)
+            if len(self.prefix) < SNIFF_BYTES:
+                self.prefix += chunk[:SNIFF_BYTES - len(self.prefix)]
+            if self._transfer is not None:
+                await self._transfer.update(self.bytes_read)
+            yield chunk
+
+
+async def _prepend(head: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield bytes already read from a stream, then the rest of it."""
+    if head:
+        yield head
+    async for chunk in chunks:
+        yield chunk
+
+
+async def _put_stream(content: aiohttp.StreamReader, content_length: Optional[int],
+                      resume_key: Optional[str], mime_type: Optional[str] = None,
+                      progress: Optional[ProgressCallback] = None) -> UploadResult:
+    """
+    Upload an HTTP body stream to Walrus without buffering it.
+
+    Bodies of known size up to CHUNKED_UPLOAD_THRESHOLD go out as one streamed
+    PUT; larger or unsized ones, and bodies that would be misread as a header
+    or index on download, are uploaded in parts, resuming a previous attempt with the
+    same `resume_key`. Bytes relayed so far are reported to
+    `progress` every PROGRESS_INTERVAL seconds. Raises on failure.
+    """
+    # Reject early when the source announces its size
+    if content_length is not None and content_length > MAX_UPLOAD_BYTES:
+        raise UploadTooLargeError(
+            f"File is {content_length} bytes, the maximum upload size is {MAX_UPLOAD_BYTES} bytes"
+        )
+
+    transfer = TransferProgress(progress, "Uploading to Walrus", content_length, PROGRESS_INTERVAL)
+    reader = _BoundedStream(content, MAX_UPLOAD_BYTES, STREAM_CHUNK_SIZE, transfer)
+    chunks = reader.__aiter__()
+    head = await _read_prefix(chunks, ESCAPE_PREFIX_BYTES)
+    escape = _needs_escape(head)
+    body = _prepend(head, chunks)
+    if content_length is not None and content_length <= CHUNKED_UPLOAD_THRESHOLD and not escape:
+        try:
+            blob_id = _record_stored_blob(await client.put_blob(body))
+        except Exception:
+            if reader.error:
+                raise reader.error
+            raise
+        stored = [blob_id]
+    else:
+        blob_id, parts, _, _ = await chunked_uploader.upload_stream(resume_key, body, always_index=escape)
+        stored = [blob_id] + [part.blob_id for part in parts]
+
+    # Remember the content hash so re-uploads of the same bytes skip the PUT while the blobs are stored
+    digest = reader.sha256.hexdigest()
+    upload_index.put(digest, blob_id, reader.bytes_read, upload_index.end_epoch(stored))
+    return UploadResult(success=True, blob_id=blob_id, blob_url=_blob_url(blob_id), size=reader.bytes_read,
+                        mime_type=_resolve_mime_type(mime_type, reader.prefix), sha256=digest)
+
+
+async def _upload_file_from_url(url: str, sender: Optional[str] = None, description: Optional[str] = None,
+                                progress: Optional[ProgressCallback] = None) -> UploadResult:
+    """Stream a file from URL straight into a Walrus upload."""
+    started = time.perf_counter()
     try:
         print(f"[walrus-agent] Fetching file from: {url}")
-        with requests.get(url, stream=True, timeout=30) as r:
+        await report(progress, f"📥 Fetching {url}...")
+        async with client.http_session().get(url) as r:
             r.raise_for_status()
-            # Infer an extension, default to .bin
-            suffix = os.path.splitext(url)[-1] or ".bin"
-            path = _save_to_temp(r.content, suffix)
-        
-        response = client.put_blob_from_file(path)
-        os.remove(path)
+            result = await _put_stream(r.content, r.content_length, f"url:{url}",
+                                       r.headers.get("Content-Type"), progress)
         
-        blob_id = response['newlyCreated']['blobObject']['blobId']
-        blob_url = f"https://walruscan.com/testnet/blob/{blob_id}"
+        result.elapsed_ms = _elapsed_ms(started)
+        return _catalog_upload(result, sender, description or url)
         
-        return f"""✅ **File Uploaded Successfully!**
+    except UploadTooLargeError as exc:
+        error = str(exc)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        error = f"Could not download file from URL: {exc}"
+    except Exception as exc:
+        error = str(exc)
+    return UploadResult(success=False, error=error, elapsed_ms=_elapsed_ms(started))
 
-📋 **Details:**
-• **Blob ID:** `{blob_id}`
-• **View at:** {blob_url}"""
-        
-    except requests.exceptions.RequestException as exc:
-        return f"""❌ **Upload Failed**
 
-Could not download file from URL: {exc}"""
+async def _upload_bytes(data: bytes, kind: str, mime_type: Optional[str] = None,
+                        sender: Optional[str] = None, description: Optional[str] = None) -> UploadResult:
+    """Upload in-memory bytes to Walrus, deduplicating by content hash and compressing text-like data."""
+    started = time.perf_counter()
+    try:
+        mime_type = _resolve_mime_type(mime_type, data[:SNIFF_BYTES])
+        blob_id, digest, deduplicated = await _put_blob_bytes(data, pack=kind == "text",
+                                                              compress=is_compressible_mime(mime_type))
+        result = UploadResult(success=True, blob_id=blob_id, blob_url=_blob_url(blob_id),
+                              size=len(data), kind=kind, mime_type=mime_type,
+                              sha256=digest, deduplicated=deduplicated, elapsed_ms=_elapsed_ms(started))
+        return _catalog_upload(result, sender, description)
     except Exception as exc:
-        return f"""❌ **Upload Failed**
-
-Error: {exc}"""
+        return UploadResult(success=False, kind=kind, error=str(exc), elapsed_ms=_elapsed_ms(started))
 
 
-def _upload_resource(data: bytes, mime_type: str) -> str:
+async def _upload_resource(data: bytes, mime_type: str, sender: Optional[str] = None,
+                           description: Optional[str] = None,
+                           progress: Optional[ProgressCallback] = None) -> UploadResult:
     """Upload resource data to Walrus."""
+    await report(progress, f"📤 Uploading {format_size(len(data))} {mime_type} file to Walrus...")
+    return await _upload_bytes(data, "file", mime_type, sender, description)
+
+
+async def _upload_text(text: str, sender: Optional[str] = None, description: Optional[str] = None) -> UploadResult:
+    """Upload text to Walrus as a UTF-8 blob."""
+    return await _upload_bytes(text.encode('utf-8'), "text", None, sender, description)
+
+
+def _list_blobs(sender: Optional[str], page: int = 1) -> BlobListResult:
+    """Return one page of the blobs a sender uploaded, newest first."""
+    page = max(page, 1)
+    entries, total = blob_catalog.list(sender, limit=LIST_PAGE_SIZE, offset=(page - 1) * LIST_PAGE_SIZE)
+    return BlobListResult(entries=entries, page=page, page_size=LIST_PAGE_SIZE, total=total)
+
+
+class BlobStream:
+    """
+    Chunked view of a blob body, read from the local cache or directly from
+    the aggregator response.
+
+    The first SNIFF_BYTES are fetched eagerly so `mime_type` is known before the
+    rest of the blob is transferred; iterate with `async for` to consume the body,
+    or await `read()` to collect it into a single buffer.
+    """
+
+    def __init__(self, blob_id: str, chunks: AsyncIterator[bytes], first_chunk: bytes,
+                 size: Optional[int], cached: bool = False, mime_type: Optional[str] = None):
+        self.blob_id = blob_id
+        self.size = size
+        self.cached = cached
+        self._chunks = chunks
+        self.prefix = first_chunk
+        self.mime_type = mime_type or sniff_mime_type(first_chunk)
+
+    async def __aiter__(self):
+        if self.prefix:
+            yield self.prefix
+        async for chunk in self._chunks:
+            yield chunk
+
+    async def read(self) -> bytes:
+        buffer = bytearray()
+        async for chunk in self:
+            buffer += chunk
+        return bytes(buffer)
+
+
+async def _read_prefix(chunks: AsyncIterator[bytes], size: int) -> bytes:
+    """Read whole chunks until at least `size` bytes (or the whole body) are buffered."""
+    prefix = b""
+    while len(prefix) < size:
+        chunk = await anext(chunks, b"")
+        if not chunk:
+            break
+        prefix += chunk
+    return prefix
+
+
+async def _iter_file(f: BinaryIO, chunk_size: int):
+    """Yield a file's contents in chunks, reading off the event loop."""
+    while True:
+        chunk = await asyncio.to_thread(f.read, chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _iter_response(response: aiohttp.ClientResponse, chunk_size: int):
+    """Yield an HTTP response body in chunks."""
+    async for chunk in response.content.iter_chunked(chunk_size):
+        yield chunk
+
+
+async def _iter_and_cache(blob_id: str, chunks: AsyncIterator[bytes]):
+    """
+    Pass chunks through while writing them to the blob cache; commit only when complete.
+
+    Cache file I/O runs in a worker thread so a slow disk never stalls the event loop.
+    """
+    writer = await asyncio.to_thread(blob_cache.writer, blob_id)
     try:
-        # Determine file extension from mime type
-        ext_map = {
-            "audio/": ".audio",
-            "image/": ".image", 
-            "video/": ".video",
-            "text/": ".txt",
-            "application/pdf": ".pdf",
-            "application/json": ".json",
-        }
-        
-        suffix = ".bin"  # default
-        for prefix, ext in ext_map.items():
-            if mime_type.startswith(prefix):
-                suffix = ext
-                break
-        
-        path = _save_to_temp(data, suffix)
-        response = client.put_blob_from_file(path)
-        os.remove(path)
-        
-        blob_id = response['newlyCreated']['blobObject']['blobId']
-        blob_url = f"https://walruscan.com/testnet/blob/{blob_id}"
-        
-        return f"""✅ **File Uploaded Successfully!**
+        async for chunk in chunks:
+            await asyncio.to_thread(writer.write, chunk)
+            yield chunk
+    except BaseException:
+        writer.abort()
+        raise
+    await asyncio.to_thread(writer.commit)
 
-📋 **Details:**
-• **Blob ID:** `{blob_id}`
-• **View at:** {blob_url}"""
-        
+
+@asynccontextmanager
+async def _open_raw_blob_stream(blob_id: str, count: bool = True) -> AsyncIterator[BlobStream]:
+    """
+    Open a streaming download of a single stored blob, served from the local cache when possible.
+
+    `count` says whether the cache lookup is recorded in the hit/miss stats;
+    each logical download is counted once, not each blob read to serve it.
+    """
+    cached_file = blob_cache.open(blob_id, count)
+    if cached_file is not None:
+        with cached_file:
+            size = os.fstat(cached_file.fileno()).st_size
+            chunks = _iter_file(cached_file, STREAM_CHUNK_SIZE)
+            try:
+                first_chunk = await _read_prefix(chunks, SNIFF_BYTES)
+                yield BlobStream(blob_id, chunks, first_chunk, size, cached=True)
+            finally:
+                await chunks.aclose()
+        return
+
+    async with AsyncExitStack() as stack:
+        try:
+            response = await stack.enter_async_context(client.open_blob(blob_id))
+            size = response.content_length
+            chunks = _iter_response(response, STREAM_CHUNK_SIZE)
+            if size is None or size <= blob_cache.max_bytes:
+                chunks = _iter_and_cache(blob_id, chunks)
+            # Closing the generator aborts any partially written cache entry
+            stack.push_async_callback(chunks.aclose)
+
+            first_chunk = await _read_prefix(chunks, SNIFF_BYTES)
+        except Exception as exc:
+            raise Exception(f"Download failed: {exc}") from exc
+
+        yield BlobStream(blob_id, chunks, first_chunk, size)
+
+
+async def _iter_decompressed_blob(blob_id: str, count: bool = True):
+    """Yield the original bytes of a compressed blob."""
+    async with _open_raw_blob_stream(blob_id, count) as stream:
+        async for chunk in iter_decompressed(stream):
+            yield chunk
+
+
+async def _iter_chunked_blob(blob_id: str, index_data: bytes):
+    """Yield the parts listed in a chunked-upload index in order, verifying their hashes."""
+    index = parse_index(index_data)
+    total = hashlib.sha256()
+    for number, part in enumerate(index.parts, start=1):
+        part_hash = hashlib.sha256()
+        async with _open_raw_blob_stream(part.blob_id, count=False) as stream:
+            async for chunk in stream:
+                part_hash.update(chunk)
+                total.update(chunk)
+                yield chunk
+        if part_hash.hexdigest() != part.sha256:
+            raise Exception(f"Part {number} of {blob_id} does not match its checksum")
+    if total.hexdigest() != index.sha256:
+        raise Exception(f"Reassembled {blob_id} does not match its checksum")
+
+
+class RangeNotSatisfiableError(ValueError):
+    """Raised when a requested byte range starts at or past the end of the blob."""
+
+
+@dataclass
+class _BlobLayout:
+    """
+    What serving a byte range needs: total size, MIME type, for chunked blobs
+    the part index, and whether the stored blob is compressed.
+    """
+    size: Optional[int]
+    mime_type: str
+    index: Optional[ChunkedIndex] = None
+    encoding: Optional[str] = None
+
+
+# Blobs are immutable, so layouts never go stale; keep the most recent ones
+LAYOUT_CACHE_ENTRIES = 1024
+_layouts: "OrderedDict[str, _BlobLayout]" = OrderedDict()
+
+
+def _content_range_total(response: aiohttp.ClientResponse) -> Optional[int]:
+    """Total blob size from a `Content-Range: bytes a-b/total` header."""
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+async def _slice_chunks(chunks: AsyncIterator[bytes], skip: int, limit: Optional[int]):
+    """Drop the first `skip` bytes of a chunk stream and stop after `limit` more."""
+    async for chunk in chunks:
+        if skip:
+            if len(chunk) <= skip:
+                skip -= len(chunk)
+                continue
+            chunk, skip = chunk[skip:], 0
+        if limit is not None:
+            chunk = chunk[:limit]
+            limit -= len(chunk)
+        if chunk:
+            yield chunk
+        if limit == 0:
+            return
+
+
+async def _read_blob_head(blob_id: str) -> tuple[bytes, Optional[int]]:
+    """Return the first SNIFF_BYTES of a stored blob and its total size, via a range read."""
+    # A probe, not a download, so it stays out of the cache stats
+    cached_file = blob_cache.open(blob_id, count=False)
+    if cached_file is not None:
+        with cached_file:
+            return await asyncio.to_thread(cached_file.read, SNIFF_BYTES), os.fstat(cached_file.fileno()).st_size
+
+    try:
+        async with client.open_blob(blob_id, byte_range=(0, SNIFF_BYTES - 1)) as response:
+            if response.status == 206:
+                return await response.read(), _content_range_total(response)
+            # The aggregator ignored the range: keep the prefix and drop the rest of the body
+            chunks = _iter_response(response, SNIFF_BYTES)
+            try:
+                prefix = await _read_prefix(chunks, SNIFF_BYTES)
+            finally:
+                await chunks.aclose()
+            return prefix[:SNIFF_BYTES], response.content_length
+    except WalrusRequestError as exc:
+        if exc.status == 416:
+            # No byte satisfies the range: the blob is empty
+            return b"", 0
+        raise
+
+
+async def _blob_layout(blob_id: str) -> _BlobLayout:
+    """Look up a blob's size, MIME type and part index without downloading its body."""
+    layout = _layouts.get(blob_id)
+    if layout is not None:
+        _layouts.move_to_end(blob_id)
+        return layout
+
+    packed = parse_packed_id(blob_id)
+    index = None
+    encoding = None
+    if packed is not None:
+        # The sub-ID carries the size; the catalog usually knows the MIME type
+        size = packed.length
+        prefix = b""
+        if not blob_catalog.mime_type(blob_id):
+            head_end = packed.offset + min(packed.length, SNIFF_BYTES)
+            chunks = _iter_stored_range(packed.container_id, packed.offset, head_end)
+            prefix = b"".join([chunk async for chunk in chunks])
+    else:
+        prefix, size = await _read_blob_head(blob_id)
+        if is_chunked_index(prefix):
+            async with _open_raw_blob_stream(blob_id, count=False) as stream:
+                index = parse_index(await stream.read())
+            size = index.size
+            prefix = (await _read_blob_head(index.parts[0].blob_id))[0] if index.parts else b""
+        elif (header := parse_header(prefix)) is not None:
+            # The header carries the original size; sniff the decompressed bytes if needed
+            size = header.size
+            encoding = header.encoding_name
+            prefix = b""
+            if not blob_catalog.mime_type(blob_id):
+                chunks = _iter_decompressed_blob(blob_id, count=False)
+                try:
+                    prefix = await _read_prefix(chunks, SNIFF_BYTES)
+                finally:
+                    await chunks.aclose()
+
+    mime_type = blob_catalog.mime_type(blob_id) or sniff_mime_type(prefix)
+    layout = _BlobLayout(size=size, mime_type=mime_type, index=index, encoding=encoding)
+    _layouts[blob_id] = layout
+    while len(_layouts) > LAYOUT_CACHE_ENTRIES:
+        _layouts.popitem(last=False)
+    return layout
+
+
+async def _iter_stored_range(blob_id: str, start: int, end: Optional[int], count: bool = False):
+    """
+    Yield bytes [start, end) of a single stored blob; `end` None means to the end.
+
+    The cache lookup is recorded in the hit/miss stats only with `count`.
+    """
+    limit = None if end is None else end - start
+    if limit == 0:
+        return
+    cached_file = blob_cache.open(blob_id, count)
+    if cached_file is not None:
+        with cached_file:
+            await asyncio.to_thread(cached_file.seek, start)
+            async for chunk in _slice_chunks(_iter_file(cached_file, STREAM_CHUNK_SIZE), 0, limit):
+                yield chunk
+        return
+
+    async with client.open_blob(blob_id, byte_range=(start, None if end is None else end - 1)) as response:
+        # A 200 carries the whole blob, so skip to the start ourselves
+        skip = 0 if response.status == 206 else start
+        async for chunk in _slice_chunks(_iter_response(response, STREAM_CHUNK_SIZE), skip, limit):
+            yield chunk
+
+
+async def _iter_chunked_range(index: ChunkedIndex, start: int, end: Optional[int]):
+    """Yield bytes [start, end) of a chunked blob, range-reading only the parts that overlap."""
+    part_start = 0
+    count = True
+    for part in index.parts:
+        part_end = part_start + part.size
+        if part_end > start and (end is None or part_start < end):
+            local_start = max(start - part_start, 0)
+            local_end = None if end is None or end >= part_end else end - part_start
+            # The range read counts once in the cache stats, on its first part
+            async for chunk in _iter_stored_range(part.blob_id, local_start, local_end, count):
+                yield chunk
+            count = False
+        part_start = part_end
+        if end is not None and part_start >= end:
+            return
+
+
+@asynccontextmanager
+async def _open_blob_range(blob_id: str, offset: int, length: Optional[int]) -> AsyncIterator[BlobStream]:
+    """Open a streaming download of `length` bytes of a blob starting at `offset`."""
+    if offset < 0 or (length is not None and length < 0):
+        raise ValueError("offset and length must not be negative")
+
+    try:
+        layout = await _blob_layout(blob_id)
     except Exception as exc:
-        return f"""❌ **Upload Failed**
+        raise Exception(f"Download failed: {exc}") from exc
 
-Error: {exc}"""
+    # No byte starts at or after the end; only an empty blob may be read from offset 0
+    if layout.size is not None and offset >= layout.size and (offset or layout.size):
+        raise RangeNotSatisfiableError(f"Offset {offset} is past the end of the blob ({layout.size} bytes)")
 
+    end = None if length is None else offset + length
+    if layout.size is not None:
+        end = layout.size if end is None else min(end, layout.size)
 
-def _download_blob_data(blob_id: str) -> tuple[bytes, str]:
-    """Download blob data from Walrus and return bytes and mime type."""
+    packed = parse_packed_id(blob_id)
+    if packed is not None:
+        chunks = _iter_stored_range(packed.container_id, packed.offset + offset, packed.offset + end, count=True)
+    elif layout.index is not None:
+        chunks = _iter_chunked_range(layout.index, offset, end)
+    elif layout.encoding is not None:
+        # Compressed blobs cannot be range-read, so decompress from the start and slice
+        chunks = _slice_chunks(_iter_decompressed_blob(blob_id), offset, None if end is None else end - offset)
+    else:
+        chunks = _iter_stored_range(blob_id, offset, end, count=True)
     try:
-        # Create a temporary file for download
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".downloaded")
-        tmp.close()
-        
-        client.get_blob_as_file(blob_id, tmp.name)
-        
-        # Read the file data
-        with open(tmp.name, 'rb') as f:
-            blob_data = f.read()
-        
-        # Try to determine mime type from file extension and content
-        mime_type = "application/octet-stream"  # default
-        
-        # Check file extension first
-        import mimetypes
-        file_extension = os.path.splitext(tmp.name)[1]
-        if file_extension:
-            detected_mime = mimetypes.guess_type(f"file{file_extension}")[0]
-            if detected_mime:
-                mime_type = detected_mime
-        
-        # If still default, try to detect from blob_id or content
-        if mime_type == "application/octet-stream":
-            # Check if blob_id contains audio file extensions
-            if any(ext in blob_id.lower() for ext in ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.aac']):
-                mime_type = "audio/mpeg"  # Default audio type
-            elif '.webm' in blob_id.lower():
-                mime_type = "audio/webm"  # WebM audio
-            # Check file magic bytes for common audio formats
-            elif blob_data.startswith(b'ID3') or blob_data.startswith(b'\xff\xfb'):
-                mime_type = "audio/mpeg"  # MP3
-            elif blob_data.startswith(b'RIFF'):
-                mime_type = "audio/wav"   # WAV
-            elif blob_data.startswith(b'ftyp'):
-                mime_type = "audio/mp4"   # M4A
-            elif blob_data.startswith(b'\x1a\x45\xdf\xa3'):
-                mime_type = "audio/webm"  # WebM (Matroska container)
-        
-        # Clean up the temporary file
-        os.remove(tmp.name)
-        
-        return blob_data, mime_type
-        
+        yield BlobStream(blob_id, chunks, b"", None if end is None else end - offset,
+                         mime_type=layout.mime_type)
+    finally:
+        await chunks.aclose()
+
+
+@asynccontextmanager
+async def _open_blob_stream(blob_id: str, offset: int = 0, length: Optional[int] = None) -> AsyncIterator[BlobStream]:
+    """
+    Open a streaming download of a blob, served from the local cache when possible.
+
+    Blobs uploaded in parts are reassembled transparently from their index,
+    packed texts are range-read from their container, and compressed blobs
+    are decompressed on the fly.
+    With `offset`/`length` only that byte range is transferred; `mime_type`
+    and `size` then describe the whole blob's type and the range's length.
+    The MIME type comes from the blob catalog for blobs uploaded here, and is
+    sniffed from the first bytes otherwise.
+    """
+    if offset or length is not None or parse_packed_id(blob_id):
+        async with _open_blob_range(blob_id, offset, length) as stream:
+            yield stream
+        return
+
+    catalog_mime_type = blob_catalog.mime_type(blob_id)
+    async with _open_raw_blob_stream(blob_id) as stream:
+        header = parse_header(stream.prefix)
+        if header is not None:
+            chunks = iter_decompressed(stream)
+            try:
+                first_chunk = await _read_prefix(chunks, SNIFF_BYTES)
+                yield BlobStream(blob_id, chunks, first_chunk, header.size, cached=stream.cached,
+                                 mime_type=catalog_mime_type)
+            finally:
+                await chunks.aclose()
+            return
+        if not is_chunked_index(stream.prefix):
+            stream.mime_type = catalog_mime_type or stream.mime_type
+            yield stream
+            return
+        try:
+            index_data = await stream.read()
+            size = parse_index(index_data).size
+        except Exception as exc:
+            raise Exception(f"Download failed: {exc}")
+
+    chunks = _iter_chunked_blob(blob_id, index_data)
+    try:
+        first_chunk = await _read_prefix(chunks, SNIFF_BYTES)
+        yield BlobStream(blob_id, chunks, first_chunk, size, mime_type=catalog_mime_type)
+    finally:
+        await chunks.aclose()
+
+
+async def _download_blob_data(blob_id: str, offset: int = 0, length: Optional[int] = None,
+                              progress: Optional[ProgressCallback] = None) -> tuple[bytes, str]:
+    """
+    Download blob data (or a byte range of it) from Walrus and return bytes and mime type.
+
+    Bytes received so far are reported to `progress` every PROGRESS_INTERVAL seconds.
+    """
+    async with _open_blob_stream(blob_id, offset, length) as stream:
+        transfer = TransferProgress(progress, "Downloading from Walrus", stream.size, PROGRESS_INTERVAL)
+        buffer = bytearray()
+        try:
+            async for chunk in stream:
+                buffer += chunk
+                await transfer.update(len(buffer))
+        except Exception as exc:
+            raise Exception(f"Download failed: {exc}")
+        return bytes(buffer), stream.mime_type
+
+
+async def _get_blob_metadata(blob_id: str) -> BlobMetadata:
+    """Look up a blob's size and MIME type, reading only its first bytes."""
+    started = time.perf_counter()
+    try:
+        layout = await _blob_layout(blob_id)
+        return BlobMetadata(success=True, blob_id=blob_id, size=layout.size, mime_type=layout.mime_type,
+                            chunked=layout.index is not None, encoding=layout.encoding, elapsed_ms=_elapsed_ms(started))
     except Exception as exc:
-        raise Exception(f"Download failed: {exc}")
+        return BlobMetadata(success=False, blob_id=blob_id, error=str(exc), elapsed_ms=_elapsed_ms(started))
 
 
-async def _download_blob(blob_id: str, ctx=None) -> str:
-    """Download blob from Walrus."""
+async def _download_blob(blob_id: str, ctx=None, progress: Optional[ProgressCallback] = None) -> DownloadResult:
+    """Download blob from Walrus, transcribing it when it is audio."""
+    started = time.perf_counter()
     try:
         # Download blob data
-        blob_data, mime_type = _download_blob_data(blob_id)
-        
-        # Get file size
-        file_size = len(blob_data)
-        
-        # Format file size nicely
-        if file_size > 1024 * 1024:
-            file_size_str = f"{file_size / (1024 * 1024):.1f} MB"
-        elif file_size > 1024:
-            file_size_str = f"{file_size / 1024:.1f} KB"
-        else:
-            file_size_str = f"{file_size} bytes"
-        
-        result = f"""✅ **Blob Downloaded Successfully!**
-
-📋 **Details:**
-• **Blob ID:** `{blob_id}`
-• **File Size:** {file_size_str}
-• **MIME Type:** {mime_type}"""
+        await report(progress, f"📥 Downloading blob `{blob_id}`...")
+        blob_data, mime_type = await _download_blob_data(blob_id, progress=progress)
         
         # Check if it's an audio file and trigger transcription
-        is_audio = (
-            mime_type.startswith("audio/") or 
-            any(ext in blob_id.lower() for ext in ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.aac', '.webm']) or
-            blob_data.startswith(b'ID3') or  # MP3
-            blob_data.startswith(b'\xff\xfb') or  # MP3
-            blob_data.startswith(b'RIFF') or  # WAV
-            blob_data.startswith(b'ftyp') or  # M4A
-            blob_data.startswith(b'\x1a\x45\xdf\xa3')  # WebM
-        )
+        is_audio = is_audio_mime(mime_type)
         
+        transcription = None
         if ctx and is_audio:
-            result += f"""
-
-🎵 **Audio File Detected!**
-Requesting transcription..."""
-            
             # Import here to avoid circular imports
             from agent_communication import request_audio_transcription
-            transcription_result = await request_audio_transcription(ctx, blob_data, mime_type, blob_id)
-            if transcription_result:
-                result += transcription_result
+            await report(progress, f"🎙️ Downloaded {format_size(len(blob_data))} of {mime_type} audio, "
+                                   f"transcription pending...")
+            transcription = await request_audio_transcription(ctx, blob_data, mime_type, blob_id)
         
-        return result
+        return DownloadResult(success=True, blob_id=blob_id, size=len(blob_data), mime_type=mime_type,
+                              is_audio=is_audio, transcription=transcription,
+                              elapsed_ms=_elapsed_ms(started))
         
     except Exception as exc:
-        return f"❌ **Download Failed**\n\nError: {exc}"
+        return DownloadResult(success=False, blob_id=blob_id, error=str(exc), elapsed_ms=_elapsed_ms(started))
+
+
+async def _gather_bounded(coros: List[Awaitable[Any]], limit: int) -> List[Any]:
+    """Await coroutines concurrently, at most `limit` at a time, returning results in input order."""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(coro: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await coro
+
+    return list(await asyncio.gather(*(run(coro) for coro in coros)))
 
 
-async def handle_walrus_operation(content: List[Dict[str, Any]], intent_result: Dict[str, Any], ctx=None) -> str:
+async def _done(result: OperationResult) -> OperationResult:
+    """Wrap an already known result so it goes through the same delivery as the operations."""
+    return result
+
+
+async def handle_walrus_operation(content: List[Dict[str, Any]], intent_result: Dict[str, Any], ctx=None,
+                                  sender: Optional[str] = None, progress: Optional[ProgressCallback] = None,
+                                  on_result: Optional[Callable[[OperationResult], Awaitable[None]]] = None
+                                  ) -> List[OperationResult]:
     """
-    Accepts ChatMessage `content` list and intent result, returns the operation result.
+    Accepts ChatMessage `content` list and intent result, returns one result per operation.
+    Uploads are recorded in the blob catalog under `sender`.
+
+    Status lines (stage started, bytes transferred, transcription pending) go to
+    `progress`, and each result is passed to `on_result` as soon as its own
+    operation finishes, so a slow upload does not hold back the others.
     
     Supports:
       • {"type": "resource", "mime_type": "...", "contents": <base64>} - Upload file
@@ -217,7 +864,14 @@ async def handle_walrus_operation(content: List[Dict[str, Any]], intent_result:
     """
     
     intent = intent_result.get("intent", "unknown")
-    extracted_data = intent_result.get("extracted_data", {})
+    extracted_data = intent_result.get("extracted_data") or {}
+    description = extracted_data.get("description")
+
+    async def deliver(operation: Awaitable[OperationResult]) -> OperationResult:
+        result = await operation
+        if on_result is not None:
+            await on_result(result)
+        return result
     
     # Handle download operation
     if intent == "download_blob":
@@ -230,67 +884,45 @@ async def handle_walrus_operation(content: List[Dict[str, Any]], intent_result:
                     break
         
         if blob_id:
-            return await _download_blob(blob_id, ctx)
+            return [await deliver(_download_blob(blob_id, ctx, progress))]
         else:
-            return """❌ **No Valid Blob ID Provided**
-
-Please use the format: `/download <blob_id>`"""
+            error = OperationError("No Valid Blob ID Provided", "Please use the format: `/download <blob_id>`")
+            return [await deliver(_done(error))]
     
-    # Handle upload operations
-    results = []
+    # Handle upload operations: collect one upload per item, in input order
+    operations = []
     
-    # Handle attached files
     for item in content:
         if item.get("type") == "resource":
             # Upload attached file
             data = base64.b64decode(item["contents"])
-            results.append(_upload_resource(data, item["mime_type"]))
-    
-    # Handle text content based on intent
-    for item in content:
-        if item.get("type") == "text":
+            operations.append(deliver(_upload_resource(data, item["mime_type"], sender, description, progress)))
+        
+        elif item.get("type") == "text":
+            # Handle text content based on intent
             text = item["text"].strip()
+            url = extracted_data.get("url")
             
             if text.startswith(("http://", "https://")):
                 # Upload from URL
-                results.append(_upload_file_from_url(text))
+                operations.append(deliver(_upload_file_from_url(text, sender, description, progress)))
+            elif url and url in text:
+                # A phrasing such as "upload https://..." with the URL extracted by intent detection
+                operations.append(deliver(_upload_file_from_url(url, sender, description, progress)))
             elif intent == "upload_text" or (intent == "upload_file" and not text.startswith(("http://", "https://"))):
                 # Upload as text blob (but skip if it's just a URL)
                 if text and not text.startswith(("http://", "https://")):
-                    try:
-                        blob_data = text.encode('utf-8')
-                        response = client.put_blob(data=blob_data)
-                        blob_id = response['newlyCreated']['blobObject']['blobId']
-                        blob_url = f"https://walruscan.com/testnet/blob/{blob_id}"
-                        results.append(f"""✅ **Text Uploaded Successfully!**
-
-📋 **Details:**
-• **Blob ID:** `{blob_id}`
-• **View at:** {blob_url}""")
-                    except Exception as exc:
-                        results.append(f"""❌ **Text Upload Failed**
-
-Error: {exc}""")
+                    operations.append(deliver(_upload_text(text, sender, description)))
+    
+    # Run the uploads concurrently; results keep the order of the items
+    results = await _gather_bounded(operations, MESSAGE_CONCURRENCY)
     
     # If no content but intent is upload_text, try to use extracted data
     if not results and intent == "upload_text":
-        description = extracted_data.get("description")
         if description:
-            try:
-                blob_data = description.encode('utf-8')
-                response = client.put_blob(data=blob_data)
-                blob_id = response['newlyCreated']['blobObject']['blobId']
-                blob_url = f"https://walruscan.com/testnet/blob/{blob_id}"
-                results.append(f"""✅ **Text Uploaded Successfully!**
-
-📋 **Details:**
-• **Blob ID:** `{blob_id}`
-• **View at:** {blob_url}""")
-            except Exception as exc:
-                results.append(f"""❌ **Text Upload Failed**
-
-Error: {exc}""")
+            results.append(await deliver(_upload_text(description, sender)))
     
-    return "\n\n".join(results) if results else """❌ **No Valid Content Found**
-
-Please provide a file, URL, or text to upload.""" 
\ No newline at end of file
+    if not results:
+        error = OperationError("No Valid Content Found", "Please provide a file, URL, or text to upload.")
+        results.append(await deliver(_done(error)))
+    return results 
\ No newline at end of file
@@ -6,11 +6,14 @@ import os
 import json
 import asyncio
 import base64
+import time
 import requests
-from typing import Any
+from typing import Any, Awaitable, Callable, Optional
 from dotenv import load_dotenv
 from web3 import Web3
 
+from results import TranscriptionResult, TransactionResult
+
 # Load environment variables from multiple possible locations
 load_dotenv("../.env")  # agents/.env
 load_dotenv("../../.env")  # root .env
@@ -59,9 +62,23 @@ def load_abi():
 
 CONTRACT_ABI = load_abi()
 
+# Async callback sending a status line to the user while a long request runs
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+
+async def report_progress(progress: Optional[ProgressCallback], text: str) -> None:
+    """Send a status update if a callback is set; a failed send never fails the request."""
+    if progress is None:
+        return
+    try:
+        await progress(text)
+    except Exception as e:
+        print(f"⚠️  Could not send progress update: {e}")
+
 # Walrus agent communication for blob transcription
-async def send_audio_to_voice_agent(ctx, audio_hash: str) -> str:
+async def send_audio_to_voice_agent(ctx, audio_hash: str) -> TranscriptionResult:
     """Send blob ID to Walrus agent for transcription via voice-to-text agent."""
+    started = time.perf_counter()
     try:
         # Import the shared models from local shared_models
         from shared_models import BlobTranscriptionRequest, BlobTranscriptionResponse
@@ -80,14 +97,16 @@ async def send_audio_to_voice_agent(ctx, audio_hash: str) -> str:
             timeout=60
         )
         
+        elapsed_ms = (time.perf_counter() - started) * 1000
         if response and hasattr(response, 'success') and response.success:
-            return f"✅ Transcription: {response.transcript}"
+            return TranscriptionResult(success=True, transcript=response.transcript, elapsed_ms=elapsed_ms)
         else:
             error_msg = getattr(response, 'error_message', 'Unknown error')
-            return f"❌ Transcription failed: {error_msg}"
+            return TranscriptionResult(success=False, error=error_msg, elapsed_ms=elapsed_ms)
             
     except Exception as e:
-        return f"❌ Error communicating with Walrus agent: {e}"
+        return TranscriptionResult(success=False, error=f"Error communicating with Walrus agent: {e}",
+                                   elapsed_ms=(time.perf_counter() - started) * 1000)
 
 async def validate_transcription_with_llm(question_prompt: str, transcription: str) -> tuple[bool, str]:
     """
@@ -146,9 +165,13 @@ Your response:"""
     except Exception as e:
         return False, f"Error during GPT-4o validation: {e}"
 
-async def validate_answer_transaction(question_id: int, answer_index: int, is_valid: bool) -> str:
+async def validate_answer_transaction(question_id: int, answer_index: int, is_valid: bool,
+                                      progress: Optional[ProgressCallback] = None) -> TransactionResult:
     """
     Submit a transaction to validate an answer on the blockchain.
+
+    The transaction hash is reported to `progress` as soon as it is sent,
+    before waiting for the receipt.
     
     Args:
         question_id: ID of the question
@@ -156,11 +179,12 @@ async def validate_answer_transaction(question_id: int, answer_index: int, is_va
         is_valid: Whether the answer is valid or not
         
     Returns:
-        String with transaction result or error message
+        TransactionResult with the transaction details or error message
     """
+    started = time.perf_counter()
     try:
         if not PRIVATE_KEY:
-            return "❌ Private key not configured. Set PRIVATE_KEY in environment variables."
+            return TransactionResult(success=False, is_valid=is_valid, error="Private key not configured. Set PRIVATE_KEY in environment variables.")
         
         # Create account from private key
         account = w3.eth.account.from_key(PRIVATE_KEY)
@@ -174,21 +198,21 @@ async def validate_answer_transaction(question_id: int, answer_index: int, is_va
             
             # Verify we're on Worldcoin mainnet (chain ID 480)
             if chain_id != 480:
-                return f"❌ Wrong network! Connected to chain ID {chain_id}, but need Worldcoin mainnet (chain ID 480). Please check your RPC URL."
+                return TransactionResult(success=False, is_valid=is_valid, error=f"Wrong network! Connected to chain ID {chain_id}, but need Worldcoin mainnet (chain ID 480). Please check your RPC URL.")
             else:
                 print(f"✅ Connected to Worldcoin mainnet (chain ID 480)")
                 
         except Exception as e:
             print(f"🔍 Debug: Could not get chain ID: {e}")
-            return f"❌ Failed to verify network connection: {e}"
+            return TransactionResult(success=False, is_valid=is_valid, error=f"Failed to verify network connection: {e}")
         
         # Check if the address is an AI validator
         try:
             is_validator = contract.functions.isAIValidator(address).call()
             if not is_validator:
-                return f"❌ Address {address} is not authorized as an AI validator on the contract."
+                return TransactionResult(success=False, is_valid=is_valid, error=f"Address {address} is not authorized as an AI validator on the contract.")
         except Exception as e:
-            return f"❌ Error checking AI validator status: {e}"
+            return TransactionResult(success=False, is_valid=is_valid, error=f"Error checking AI validator status: {e}")
         
         # Build the transaction
         function_call = contract.functions.validateAnswer(question_id, answer_index, is_valid)
@@ -198,13 +222,13 @@ async def validate_answer_transaction(question_id: int, answer_index: int, is_va
             gas_estimate = function_call.estimate_gas({'from': address})
             gas_limit = int(gas_estimate * 1.2)  # Add 20% buffer
         except Exception as e:
-            return f"❌ Gas estimation failed: {e}"
+            return TransactionResult(success=False, is_valid=is_valid, error=f"Gas estimation failed: {e}")
         
         # Get current gas price
         try:
             gas_price = w3.eth.gas_price
         except Exception as e:
-            return f"❌ Failed to get gas price: {e}"
+            return TransactionResult(success=False, is_valid=is_valid, error=f"Failed to get gas price: {e}")
         
         # Get nonce - use actual account nonce but handle carefully
         try:
@@ -214,7 +238,7 @@ async def validate_answer_transaction(question_id: int, answer_index: int, is_va
             
             # Validate nonce is reasonable
             if nonce > 1000000:  # Sanity check - if nonce is > 1M, something is wrong
-                return f"❌ Nonce value too high: {nonce}. This suggests a network or account issue."
+                return TransactionResult(success=False, is_valid=is_valid, error=f"Nonce value too high: {nonce}. This suggests a network or account issue.")
             
             print(f"🔍 Debug: Account nonce: {nonce} (type: {type(nonce)})")
             
@@ -222,7 +246,7 @@ async def validate_answer_transaction(question_id: int, answer_index: int, is_va
             nonce = int(str(nonce))
             
         except Exception as e:
-            return f"❌ Failed to get nonce: {e}"
+            return TransactionResult(success=False, is_valid=is_valid, error=f"Failed to get nonce: {e}")
         
         # SIMPLE APPROACH: Build transaction with minimal parameters
         print(f"🔧 Using simple transaction building approach")
@@ -257,6 +281,7 @@ async def validate_answer_transaction(question_id: int, answer_index: int, is_va
                 signed_txn = w3.eth.account.sign_transaction(test_transaction, PRIVATE_KEY)
                 tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
                 print(f"✅ Transaction sent successfully: {tx_hash.hex()}")
+                await report_progress(progress, f"🔗 Transaction submitted: `{tx_hash.hex()}`, waiting for confirmation...")
                 break
                 
             except Exception as e:
@@ -273,25 +298,29 @@ async def validate_answer_transaction(question_id: int, answer_index: int, is_va
                     print(f"🔧 RLP error detected, trying with nonce 0")
                 elif attempt == max_retries - 1:
                     # Last attempt failed
-                    return f"❌ Failed to send transaction after {max_retries} attempts: {e}\n🔍 Final transaction details: {test_transaction}"
+                    return TransactionResult(success=False, is_valid=is_valid, error=f"Failed to send transaction after {max_retries} attempts: {e}\n🔍 Final transaction details: {test_transaction}")
                 else:
-                    # Other error - wait and retry
-                    import time
-                    time.sleep(1)
+                    # Other error - wait and retry without blocking the event loop
+                    await asyncio.sleep(1)
                     continue
         
         # Wait for transaction receipt
         receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
         
-        if receipt.status == 1:
-            return f"✅ Transaction successful!\n🔗 TX Hash: {tx_hash.hex()}\n📊 Gas Used: {receipt.gasUsed}\n💰 Gas Price: {receipt.effectiveGasPrice} wei\n📝 Answer marked as {'VALID' if is_valid else 'INVALID'}"
-        else:
-            return f"❌ Transaction failed!\n🔗 TX Hash: {tx_hash.hex()}\n📊 Gas Used: {receipt.gasUsed}"
+        return TransactionResult(
+            success=receipt.status == 1,
+            is_valid=is_valid,
+            tx_hash=tx_hash.hex(),
+            gas_used=receipt.gasUsed,
+            gas_price=receipt.effectiveGasPrice,
+            error=None if receipt.status == 1 else "Transaction failed",
+            elapsed_ms=(time.perf_counter() - started) * 1000
+        )
             
     except Exception as e:
-        return f"❌ Transaction error: {e}"
+        return TransactionResult(success=False, is_valid=is_valid, error=f"Transaction error: {e}")
 
-async def validate_unanswered_questions(ctx) -> str:
+async def validate_unanswered_questions(ctx, progress: Optional[ProgressCallback] = None) -> str:
     """Validate unanswered questions by checking for answers that need validation."""
     try:
         # First, get all open questions
@@ -328,13 +357,10 @@ async def validate_unanswered_questions(ctx) -> str:
         total_answers = question_result[6]    # total answers
         
         # Send audio to voice-to-text agent
-        transcription_result = await send_audio_to_voice_agent(ctx, audio_hash)
-        # Clean up transcription_result to extract just the text (remove emoji and prefix)
-        transcription_result_clean = transcription_result
-        if transcription_result.startswith("✅ Transcription: "):
-            transcription_result_clean = transcription_result.replace("✅ Transcription: ", "").strip()
-        elif transcription_result.startswith("❌"):
-            transcription_result_clean = ""
+        await report_progress(progress, f"🎙️ Transcribing answer {answer_index} of question {question_id}...")
+        transcription = await send_audio_to_voice_agent(ctx, audio_hash)
+        transcription_result_clean = transcription.transcript.strip() if transcription.success else ""
+        await report_progress(progress, "🤖 Transcription ready, validating it with GPT-4o...")
         llm_valid, llm_reason = await validate_transcription_with_llm(question_prompt, transcription_result_clean)
         
         # Format the LLM validation result with better styling
@@ -365,20 +391,26 @@ async def validate_unanswered_questions(ctx) -> str:
 {transcription_result_clean}
 {llm_result_text}"""
         
+        # The validation is ready before the transaction confirms, so send it right away
+        if progress is not None:
+            await report_progress(progress, result_text + "\n\n⏳ Submitting the validation to the blockchain...")
+        
         # Submit transaction to blockchain
-        transaction_result = await validate_answer_transaction(question_id, answer_index, llm_valid)
+        transaction_result = await validate_answer_transaction(question_id, answer_index, llm_valid, progress)
         
-        result_text += f"""
-
-🔗 **Blockchain Transaction:**
-{transaction_result}"""
+        transaction_text = f"""🔗 **Blockchain Transaction:**
+{transaction_result.to_markdown()}"""
         
-        return result_text
+        if progress is not None:
+            # The verdict already went out, so the final reply only adds the transaction
+            return transaction_text
+        return f"{result_text}\n\n{transaction_text}"
         
     except Exception as e:
         return f"❌ Error in validation process: {e}"
 
-async def validate_specific_answer(ctx, question_id: int, answer_index: int) -> str:
+async def validate_specific_answer(ctx, question_id: int, answer_index: int,
+                                   progress: Optional[ProgressCallback] = None) -> str:
     """Validate a specific answer by question ID and answer index."""
     try:
         # Get question details
@@ -406,14 +438,10 @@ async def validate_specific_answer(ctx, question_id: int, answer_index: int) ->
         status_text = status_map.get(status, "Unknown")
         
         # Send audio to voice-to-text agent
-        transcription_result = await send_audio_to_voice_agent(ctx, audio_hash)
-        
-        # Clean up transcription_result to extract just the text
-        transcription_result_clean = transcription_result
-        if transcription_result.startswith("✅ Transcription: "):
-            transcription_result_clean = transcription_result.replace("✅ Transcription: ", "").strip()
-        elif transcription_result.startswith("❌"):
-            transcription_result_clean = ""
+        await report_progress(progress, f"🎙️ Transcribing answer {answer_index} of question {question_id}...")
+        transcription = await send_audio_to_voice_agent(ctx, audio_hash)
+        transcription_result_clean = transcription.transcript.strip() if transcription.success else ""
+        await report_progress(progress, "🤖 Transcription ready, validating it with GPT-4o...")
         
         llm_valid, llm_reason = await validate_transcription_with_llm(question_prompt, transcription_result_clean)
         
@@ -451,7 +479,7 @@ async def validate_specific_answer(ctx, question_id: int, answer_index: int) ->
     except Exception as e:
         return f"❌ Error in validation process: {e}"
 
-async def summarize_valid_answers(ctx, question_id: int) -> str:
+async def summarize_valid_answers(ctx, question_id: int, progress: Optional[ProgressCallback] = None) -> str:
     """Summarize all valid answers for a specific question using GPT-4o."""
     try:
         # Get question details
@@ -475,24 +503,20 @@ async def summarize_valid_answers(ctx, question_id: int) -> str:
         
         # Transcribe all valid answers
         transcriptions = []
-        for answer_index in valid_answer_indices:
+        for count, answer_index in enumerate(valid_answer_indices, 1):
             answer = all_answers[answer_index]
             audio_hash = answer[1]
             provider = answer[0]
             
             # Send audio to voice-to-text agent
-            transcription_result = await send_audio_to_voice_agent(ctx, audio_hash)
-            
-            # Clean up transcription_result
-            transcription_clean = transcription_result
-            if transcription_result.startswith("✅ Transcription: "):
-                transcription_clean = transcription_result.replace("✅ Transcription: ", "").strip()
-            elif transcription_result.startswith("❌"):
-                transcription_clean = "Transcription failed"
+            transcription = await send_audio_to_voice_agent(ctx, audio_hash)
+            transcription_clean = transcription.transcript.strip() if transcription.success else "Transcription failed"
             
             transcriptions.append(f"Answer {answer_index} (Provider: {provider}): {transcription_clean}")
+            await report_progress(progress, f"🎵 Transcribed {count}/{len(valid_answer_indices)}: {transcriptions[-1]}")
         
         # Use GPT-4o to create a summary
+        await report_progress(progress, "🤖 All answers transcribed, summarizing them with GPT-4o...")
         summary = await create_summary_with_gpt4o(question_prompt, transcriptions)
         
         result_text = f"""📊 **Summary of Valid Answers for Question {question_id}**
@@ -673,13 +697,15 @@ def get_available_functions() -> str:
     return f"📋 Available read functions:\n" + "\n".join([f"• {func}" for func in READ_FUNCTIONS])
 
 
-async def handle_blockchain_request(ctx, function_name: str, *args) -> str:
+async def handle_blockchain_request(ctx, function_name: str, *args,
+                                    progress: Optional[ProgressCallback] = None) -> str:
     """
     Handle blockchain requests.
     
     Args:
         function_name: Name of the function to call
         *args: Arguments to pass to the function
+        progress: Optional async callback receiving status updates during validations and summaries
         
     Returns:
         String with the result
@@ -695,11 +721,11 @@ async def handle_blockchain_request(ctx, function_name: str, *args) -> str:
     elif function_name.lower().startswith("validate "):
         parts = function_name.lower().split()
         if len(parts) == 2 and parts[1] == "next":
-            return await validate_unanswered_questions(ctx)
+            return await validate_unanswered_questions(ctx, progress)
         elif len(parts) == 3 and parts[1].isdigit() and parts[2].isdigit():
             question_id = int(parts[1])
             answer_index = int(parts[2])
-            return await validate_specific_answer(ctx, question_id, answer_index)
+            return await validate_specific_answer(ctx, question_id, answer_index, progress)
         else:
             return "❌ Invalid validate command. Use 'validate next' or 'validate <question_id> <answer_index>'"
     
@@ -707,7 +733,7 @@ async def handle_blockchain_request(ctx, function_name: str, *args) -> str:
         parts = function_name.lower().split()
         if len(parts) == 3 and parts[1] == "valid" and parts[2].isdigit():
             question_id = int(parts[2])
-            return await summarize_valid_answers(ctx, question_id)
+            return await summarize_valid_answers(ctx, question_id, progress)
         else:
             return "❌ Invalid summarize command. Use 'summarize valid <question_id>'"
     
@@ -61,9 +61,12 @@ async def handle_message(ctx: Context, sender: str, msg: ChatMessage):
         await ctx.send(sender, _chat("Please provide a function name to call. Type 'help' for available functions."))
         return
     
-    # Handle the blockchain request
+    async def send_progress(text: str) -> None:
+        await ctx.send(sender, _chat(text))
+
+    # Handle the blockchain request, streaming status updates while it runs
     try:
-        result = await handle_blockchain_request(ctx, user_message)
+        result = await handle_blockchain_request(ctx, user_message, progress=send_progress)
         await ctx.send(sender, _chat(result))
     except Exception as e:
         error_msg = f"❌ Error processing request: {str(e)}"
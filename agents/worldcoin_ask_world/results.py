@@ -0,0 +1,42 @@
+"""
+Typed results returned by the blockchain operations.
+
+Callers read fields directly; markdown is rendered only when replying over chat.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class TranscriptionResult:
+    """Transcript of an answer's audio blob, fetched through the Walrus agent."""
+    success: bool
+    transcript: str = ""
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    def to_markdown(self) -> str:
+        if self.success:
+            return f"✅ Transcription: {self.transcript}"
+        return f"❌ Transcription failed: {self.error}"
+
+
+@dataclass
+class TransactionResult:
+    """Outcome of submitting a validateAnswer transaction."""
+    success: bool
+    is_valid: bool = False
+    tx_hash: str = ""
+    gas_used: Optional[int] = None
+    gas_price: Optional[int] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    def to_markdown(self) -> str:
+        if self.success:
+            return (f"✅ Transaction successful!\n🔗 TX Hash: {self.tx_hash}\n📊 Gas Used: {self.gas_used}\n"
+                    f"💰 Gas Price: {self.gas_price} wei\n📝 Answer marked as {'VALID' if self.is_valid else 'INVALID'}")
+        if self.tx_hash:
+            return f"❌ Transaction failed!\n🔗 TX Hash: {self.tx_hash}\n📊 Gas Used: {self.gas_used}"
+        return f"❌ {self.error}"
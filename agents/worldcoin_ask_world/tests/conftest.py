@@ -0,0 +1,26 @@
+import os
+import sys
+
+AGENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The agents are flat script directories sharing module names (results,
+# shared_models, config), so each test module is imported with its own agent
+# first on the path and without another agent's copies of those modules
+SHARED_MODULES = ("results", "shared_models", "config")
+
+
+def _use_agent_modules() -> None:
+    if AGENT_DIR in sys.path:
+        sys.path.remove(AGENT_DIR)
+    sys.path.insert(0, AGENT_DIR)
+    for name in SHARED_MODULES:
+        module = sys.modules.get(name)
+        if module is not None and os.path.dirname(os.path.abspath(getattr(module, "__file__", "") or "")) != AGENT_DIR:
+            del sys.modules[name]
+
+
+def pytest_pycollect_makemodule(module_path, parent):
+    _use_agent_modules()
+
+
+_use_agent_modules()
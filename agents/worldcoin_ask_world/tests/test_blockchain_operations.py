@@ -0,0 +1,124 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import blockchain_operations
+
+
+class FakeTxHash(bytes):
+    def hex(self) -> str:
+        return "0x" + super().hex()
+
+
+class FakeEth:
+    """Stands in for w3.eth; `send_errors` are raised by the first send attempts."""
+
+    def __init__(self, send_errors=()):
+        self.chain_id = 480
+        self.gas_price = 1_000
+        self.sent = 0
+        self._send_errors = list(send_errors)
+        self.account = SimpleNamespace(
+            from_key=lambda key: SimpleNamespace(address="0x00000000000000000000000000000000000000aa"),
+            sign_transaction=lambda transaction, key: SimpleNamespace(raw_transaction=b"signed"),
+        )
+
+    def get_transaction_count(self, address):
+        return 7
+
+    def send_raw_transaction(self, raw):
+        if self._send_errors:
+            raise self._send_errors.pop(0)
+        self.sent += 1
+        return FakeTxHash(b"\x12\x34")
+
+    def wait_for_transaction_receipt(self, tx_hash, timeout):
+        return SimpleNamespace(status=1, gasUsed=21_000, effectiveGasPrice=1_000)
+
+
+class FakeFunctions:
+    def isAIValidator(self, address):
+        return SimpleNamespace(call=lambda: True)
+
+    def validateAnswer(self, question_id, answer_index, is_valid):
+        return SimpleNamespace(estimate_gas=lambda tx: 50_000, _encode_transaction_data=lambda: "0x")
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    def install(send_errors=()):
+        eth = FakeEth(send_errors)
+        monkeypatch.setattr(blockchain_operations, "w3", SimpleNamespace(eth=eth))
+        monkeypatch.setattr(blockchain_operations, "contract", SimpleNamespace(functions=FakeFunctions()))
+        monkeypatch.setattr(blockchain_operations, "PRIVATE_KEY", "0x01")
+        return eth
+    return install
+
+
+def test_validate_answer_transaction_submits_and_reports_hash(chain):
+    eth = chain()
+    updates = []
+
+    async def progress(text):
+        updates.append(text)
+
+    result = asyncio.run(blockchain_operations.validate_answer_transaction(3, 1, True, progress))
+
+    assert result.success, result.error
+    assert result.tx_hash == "0x1234"
+    assert result.gas_used == 21_000
+    assert result.elapsed_ms > 0
+    assert eth.sent == 1
+    assert any("0x1234" in update for update in updates)
+
+
+def test_validate_answer_transaction_retries_without_blocking(chain, monkeypatch):
+    eth = chain(send_errors=[RuntimeError("replacement transaction underpriced")])
+
+    def blocking_sleep(seconds):
+        raise AssertionError("time.sleep blocks the event loop")
+
+    monkeypatch.setattr(time, "sleep", blocking_sleep)
+    result = asyncio.run(blockchain_operations.validate_answer_transaction(3, 1, False))
+
+    assert result.success, result.error
+    assert not result.is_valid
+    assert eth.sent == 1
+
+
+def test_validate_next_sends_the_verdict_once(chain, monkeypatch):
+    chain()
+    answer = (4, 0, "0x00000000000000000000000000000000000000bb", "blob-123", 1_700_000_000)
+    question = (4, "0x0", "What is the capital of France?", 3, 0, 1, 2, 0, 0, 0, True)
+    monkeypatch.setattr(blockchain_operations.contract.functions, "getOpenQuestions",
+                        lambda: SimpleNamespace(call=lambda: [4]), raising=False)
+    monkeypatch.setattr(blockchain_operations.contract.functions, "getNextUnvalidatedAnswer",
+                        lambda: SimpleNamespace(call=lambda: answer), raising=False)
+    monkeypatch.setattr(blockchain_operations.contract.functions, "getQuestion",
+                        lambda question_id: SimpleNamespace(call=lambda: question), raising=False)
+
+    async def transcribe(ctx, audio_hash):
+        return blockchain_operations.TranscriptionResult(success=True, transcript="Paris")
+
+    async def validate(prompt, transcript):
+        return True, "Paris is the capital of France"
+
+    monkeypatch.setattr(blockchain_operations, "send_audio_to_voice_agent", transcribe)
+    monkeypatch.setattr(blockchain_operations, "validate_transcription_with_llm", validate)
+    updates = []
+
+    async def progress(text):
+        updates.append(text)
+
+    final = asyncio.run(blockchain_operations.validate_unanswered_questions(None, progress))
+
+    messages = updates + [final]
+    assert sum("AI Validation Result" in message for message in messages) == 1
+    assert "Transaction successful" in final
+    assert "AI Validation Result" not in final
+
+    # Without progress updates the reply carries everything
+    full = asyncio.run(blockchain_operations.validate_unanswered_questions(None))
+    assert "AI Validation Result" in full and "Transaction successful" in full